@@ -5,5 +5,15 @@
 # * If neither is available, we raise -> ProviderError.
 
 from .manager import AgentManager, EmbeddingManager
+from .registry import provider_registry
+from .limiter import provider_limiters
+from .cache import embedding_cache, llm_response_cache
 
-__all__ = ["AgentManager", "EmbeddingManager"]
+__all__ = [
+    "AgentManager",
+    "EmbeddingManager",
+    "provider_registry",
+    "provider_limiters",
+    "embedding_cache",
+    "llm_response_cache",
+]
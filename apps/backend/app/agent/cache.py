@@ -0,0 +1,443 @@
+import json
+import time
+import hashlib
+import logging
+import unicodedata
+import numpy as np
+
+from collections import OrderedDict
+from datetime import datetime, timezone
+from datetime import timedelta
+from typing import Any, Dict, Hashable, List, Mapping, Optional, Type
+from sqlalchemy import delete, select
+from sqlalchemy.exc import SQLAlchemyError
+
+from ..core import settings, AsyncSessionLocal
+from ..models import EmbeddingCacheEntry, LLMResponseCacheEntry
+
+logger = logging.getLogger(__name__)
+
+# Embeddings are persisted as little-endian float32 regardless of what the
+# provider hands back; that is plenty of precision for cosine similarity.
+EMBEDDING_DTYPE = np.dtype("<f4")
+# The cache tables are pruned at startup and after this many writes.
+PRUNE_EVERY = 500
+
+
+def embedding_to_bytes(vector: Any) -> bytes:
+    """
+    Serializes an embedding into a compact float32 blob.
+    """
+    return np.asarray(vector, dtype=EMBEDDING_DTYPE).reshape(-1).tobytes()
+
+
+def embedding_from_bytes(blob: bytes) -> np.ndarray:
+    """
+    Deserializes a float32 blob written by `embedding_to_bytes`.
+    """
+    return np.frombuffer(blob, dtype=EMBEDDING_DTYPE)
+
+
+async def prune_table(
+    model: Type[EmbeddingCacheEntry] | Type[LLMResponseCacheEntry],
+    max_rows: int,
+    expired_before: Optional[datetime] = None,
+) -> int:
+    """
+    Deletes the rows of a cache table created before `expired_before`, then
+    all but the newest `max_rows` (0 keeps every row). Returns the number of
+    rows deleted.
+    """
+    deleted = 0
+    async with AsyncSessionLocal() as session:
+        if expired_before is not None:
+            result = await session.execute(
+                delete(model).where(model.created_at < expired_before)
+            )
+            deleted += result.rowcount
+        if max_rows > 0:
+            # Compared in SQL rather than through a bound datetime: SQLite
+            # stores server-default and Python timestamps in different
+            # formats. Fewer rows than `max_rows` make the cutoff NULL.
+            cutoff = (
+                select(model.created_at)
+                .order_by(model.created_at.desc())
+                .offset(max_rows - 1)
+                .limit(1)
+                .scalar_subquery()
+            )
+            result = await session.execute(
+                delete(model).where(model.created_at < cutoff)
+            )
+            deleted += result.rowcount
+        await session.commit()
+    return deleted
+
+
+class LRUCache:
+    """
+    Bounded in-memory mapping that evicts the least recently used entry.
+    """
+
+    def __init__(self, max_entries: int) -> None:
+        self.max_entries = max_entries
+        self._data: OrderedDict[Hashable, Any] = OrderedDict()
+
+    def get(self, key: Hashable) -> Any | None:
+        try:
+            self._data.move_to_end(key)
+        except KeyError:
+            return None
+        return self._data[key]
+
+    def set(self, key: Hashable, value: Any) -> None:
+        if self.max_entries <= 0:
+            return
+        self._data[key] = value
+        self._data.move_to_end(key)
+        while len(self._data) > self.max_entries:
+            self._data.popitem(last=False)
+
+    def clear(self) -> None:
+        self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+class EmbeddingCache:
+    """
+    Content-addressed embedding cache.
+
+    Entries are keyed by (provider, model, sha256 of the normalized text) and
+    live in an in-process LRU, backed by the `embedding_cache` table so they
+    survive restarts and are shared between workers. `prune` bounds the
+    table to the newest `max_rows` entries.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = settings.EMBEDDING_CACHE_SIZE,
+        persist: bool = settings.EMBEDDING_CACHE_PERSIST,
+        max_rows: int = settings.EMBEDDING_CACHE_DB_SIZE,
+    ) -> None:
+        self._memory = LRUCache(max_entries)
+        self.persist = persist
+        self.max_rows = max_rows
+        self.hits = 0
+        self.misses = 0
+        self._writes = 0
+
+    @staticmethod
+    def normalize(text: str) -> str:
+        """
+        Normalizes unicode and collapses whitespace so cosmetic differences
+        don't produce distinct cache entries.
+        """
+        return " ".join(unicodedata.normalize("NFC", text).split())
+
+    def make_key(self, provider: str, model: str, text: str) -> str:
+        digest = hashlib.sha256()
+        for part in (provider or "", model or "", self.normalize(text)):
+            digest.update(part.encode("utf-8"))
+            digest.update(b"\x00")
+        return digest.hexdigest()
+
+    async def get(self, provider: str, model: str, text: str) -> Optional[np.ndarray]:
+        """
+        Returns the cached embedding for the text or None on a miss.
+        """
+        key = self.make_key(provider, model, text)
+        vector = self._memory.get(key)
+        if vector is None and self.persist:
+            vector = await self._load(key)
+            if vector is not None:
+                self._memory.set(key, vector)
+
+        if vector is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return vector
+
+    async def set(self, provider: str, model: str, text: str, vector: Any) -> np.ndarray:
+        """
+        Stores the embedding and returns it as a flat float32 array.
+        """
+        key = self.make_key(provider, model, text)
+        blob = embedding_to_bytes(vector)
+        vector = embedding_from_bytes(blob)
+        self._memory.set(key, vector)
+        if self.persist:
+            await self._store(key, provider, model, vector.shape[0], blob)
+        return vector
+
+    async def get_many(
+        self, provider: str, model: str, texts: List[str]
+    ) -> List[Optional[np.ndarray]]:
+        """
+        Batched `get`: memory misses are resolved with a single query.
+        """
+        keys = [self.make_key(provider, model, text) for text in texts]
+        vectors = [self._memory.get(key) for key in keys]
+        missing = [key for key, vector in zip(keys, vectors) if vector is None]
+        if missing and self.persist:
+            loaded = await self._load_many(missing)
+            for i, key in enumerate(keys):
+                if vectors[i] is None and key in loaded:
+                    vectors[i] = loaded[key]
+                    self._memory.set(key, vectors[i])
+
+        for vector in vectors:
+            if vector is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return vectors
+
+    async def set_many(
+        self, provider: str, model: str, texts: List[str], vectors: Any
+    ) -> List[np.ndarray]:
+        """
+        Batched `set`: all entries are persisted in one transaction.
+        """
+        entries = []
+        stored = []
+        for text, vector in zip(texts, vectors):
+            key = self.make_key(provider, model, text)
+            blob = embedding_to_bytes(vector)
+            vector = embedding_from_bytes(blob)
+            self._memory.set(key, vector)
+            stored.append(vector)
+            entries.append(
+                EmbeddingCacheEntry(
+                    cache_key=key,
+                    provider=provider,
+                    model=model,
+                    dimension=vector.shape[0],
+                    vector=blob,
+                )
+            )
+        if self.persist and entries:
+            await self._store_entries(entries)
+        return stored
+
+    def stats(self) -> Dict[str, int]:
+        return {"hits": self.hits, "misses": self.misses, "size": len(self._memory)}
+
+    async def prune(self) -> None:
+        """
+        Trims the `embedding_cache` table to the newest `max_rows` entries.
+        """
+        if not self.persist:
+            return
+        try:
+            deleted = await prune_table(EmbeddingCacheEntry, self.max_rows)
+        except SQLAlchemyError as e:
+            logger.warning(f"embedding cache pruning failed: {e}")
+            return
+        if deleted:
+            logger.info(f"Pruned {deleted} embedding cache entries")
+
+    async def _load(self, key: str) -> Optional[np.ndarray]:
+        try:
+            async with AsyncSessionLocal() as session:
+                blob = await session.scalar(
+                    select(EmbeddingCacheEntry.vector).where(
+                        EmbeddingCacheEntry.cache_key == key
+                    )
+                )
+        except SQLAlchemyError as e:
+            logger.warning(f"embedding cache lookup failed: {e}")
+            return None
+        return embedding_from_bytes(blob) if blob is not None else None
+
+    async def _load_many(self, keys: List[str]) -> Dict[str, np.ndarray]:
+        try:
+            async with AsyncSessionLocal() as session:
+                rows = await session.execute(
+                    select(EmbeddingCacheEntry.cache_key, EmbeddingCacheEntry.vector).where(
+                        EmbeddingCacheEntry.cache_key.in_(set(keys))
+                    )
+                )
+        except SQLAlchemyError as e:
+            logger.warning(f"embedding cache lookup failed: {e}")
+            return {}
+        return {key: embedding_from_bytes(blob) for key, blob in rows}
+
+    async def _store(
+        self, key: str, provider: str, model: str, dimension: int, blob: bytes
+    ) -> None:
+        await self._store_entries(
+            [
+                EmbeddingCacheEntry(
+                    cache_key=key,
+                    provider=provider,
+                    model=model,
+                    dimension=dimension,
+                    vector=blob,
+                )
+            ]
+        )
+
+    async def _store_entries(self, entries: List[EmbeddingCacheEntry]) -> None:
+        try:
+            async with AsyncSessionLocal() as session:
+                for entry in entries:
+                    await session.merge(entry)
+                await session.commit()
+        except SQLAlchemyError as e:
+            # A concurrent writer may have stored the same key; the in-memory
+            # entry is already set so this is never fatal.
+            logger.warning(f"embedding cache write failed: {e}")
+            return
+        self._writes += len(entries)
+        if self._writes >= PRUNE_EVERY:
+            self._writes = 0
+            await self.prune()
+
+
+class LLMResponseCache:
+    """
+    Cache of strategy outputs for deterministic prompts.
+
+    Entries are keyed by (provider, model, generation options, strategy,
+    sha256 of the prompt) and expire after `ttl` seconds. They live in an
+    in-process LRU, backed by the `llm_response_cache` table so duplicate
+    ingests are answered without a generation even after a restart. `prune`
+    deletes expired rows and bounds the table to the newest `max_rows`.
+    Callers are responsible for only caching deterministic requests.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = settings.LLM_CACHE_SIZE,
+        ttl: int = settings.LLM_CACHE_TTL,
+        persist: bool = settings.LLM_CACHE_PERSIST,
+        max_rows: int = settings.LLM_CACHE_DB_SIZE,
+    ) -> None:
+        self._memory = LRUCache(max_entries)
+        self.ttl = ttl
+        self.persist = persist
+        self.max_rows = max_rows
+        self.hits = 0
+        self.misses = 0
+        self._writes = 0
+
+    @staticmethod
+    def make_key(
+        provider: str,
+        model: str,
+        opts: Mapping[str, Any],
+        strategy: str,
+        prompt: str,
+    ) -> str:
+        digest = hashlib.sha256()
+        for part in (
+            provider or "",
+            model or "",
+            json.dumps(opts, sort_keys=True, default=str),
+            strategy,
+            prompt,
+        ):
+            digest.update(part.encode("utf-8"))
+            digest.update(b"\x00")
+        return digest.hexdigest()
+
+    async def get(self, key: str) -> Any | None:
+        """
+        Returns the cached, unexpired response for `key` or None on a miss.
+        """
+        entry = self._memory.get(key)
+        if entry is not None and entry[0] < time.monotonic():
+            entry = None
+        if entry is None and self.persist:
+            entry = await self._load(key)
+            if entry is not None:
+                self._memory.set(key, entry)
+
+        if entry is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return json.loads(entry[1])
+
+    async def set(
+        self, key: str, provider: str, model: str, strategy: str, response: Any
+    ) -> None:
+        """
+        Stores a JSON-serializable response.
+        """
+        try:
+            payload = json.dumps(response)
+        except (TypeError, ValueError) as e:
+            logger.warning(f"LLM response not cached, not JSON-serializable: {e}")
+            return
+        self._memory.set(key, (time.monotonic() + self.ttl, payload))
+        if self.persist:
+            await self._store(
+                LLMResponseCacheEntry(
+                    cache_key=key,
+                    provider=provider or "",
+                    model=model or "",
+                    strategy=strategy,
+                    response=payload,
+                    created_at=datetime.now(timezone.utc),
+                )
+            )
+
+    def stats(self) -> Dict[str, int]:
+        return {"hits": self.hits, "misses": self.misses, "size": len(self._memory)}
+
+    async def prune(self) -> None:
+        """
+        Deletes expired `llm_response_cache` rows and trims the table to the
+        newest `max_rows` entries.
+        """
+        if not self.persist:
+            return
+        expired_before = datetime.now(timezone.utc) - timedelta(seconds=self.ttl)
+        try:
+            deleted = await prune_table(
+                LLMResponseCacheEntry, self.max_rows, expired_before
+            )
+        except SQLAlchemyError as e:
+            logger.warning(f"LLM response cache pruning failed: {e}")
+            return
+        if deleted:
+            logger.info(f"Pruned {deleted} LLM response cache entries")
+
+    async def _load(self, key: str) -> Optional[tuple[float, str]]:
+        try:
+            async with AsyncSessionLocal() as session:
+                row = await session.get(LLMResponseCacheEntry, key)
+        except SQLAlchemyError as e:
+            logger.warning(f"LLM response cache lookup failed: {e}")
+            return None
+        if row is None:
+            return None
+        created_at = row.created_at
+        if created_at.tzinfo is None:
+            # SQLite drops the timezone; timestamps are written in UTC.
+            created_at = created_at.replace(tzinfo=timezone.utc)
+        age = (datetime.now(timezone.utc) - created_at).total_seconds()
+        if age >= self.ttl:
+            return None
+        return time.monotonic() + self.ttl - age, row.response
+
+    async def _store(self, entry: LLMResponseCacheEntry) -> None:
+        try:
+            async with AsyncSessionLocal() as session:
+                await session.merge(entry)
+                await session.commit()
+        except SQLAlchemyError as e:
+            logger.warning(f"LLM response cache write failed: {e}")
+            return
+        self._writes += 1
+        if self._writes >= PRUNE_EVERY:
+            self._writes = 0
+            await self.prune()
+
+
+embedding_cache = EmbeddingCache()
+llm_response_cache = LLMResponseCache()
@@ -0,0 +1,364 @@
+import time
+import random
+import asyncio
+import logging
+import numpy as np
+
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+
+from ..core import settings
+from .exceptions import ProviderOverloadedError
+from .providers.base import Provider, EmbeddingProvider
+
+logger = logging.getLogger(__name__)
+
+# HTTP statuses providers use for "slow down": rate limited, overloaded
+# (Ollama answers 503 when its own queue is full), and Anthropic-style 529.
+_OVERLOAD_STATUSES = {429, 503, 529}
+_OVERLOAD_MARKERS = (
+    "rate limit",
+    "too many requests",
+    "overloaded",
+    "resource_exhausted",
+    "server busy",
+)
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Rough token count (about four characters per token) used for the
+    tokens-per-minute budget.
+    """
+    return len(text) // 4 + 1
+
+
+def _overload_details(error: BaseException) -> Tuple[bool, Optional[float]]:
+    """
+    Returns whether `error` (or an exception it wraps) is a rate-limit or
+    overload response, and the server's Retry-After in seconds if it sent
+    one.
+    """
+    seen = set()
+    while error is not None and id(error) not in seen:
+        seen.add(id(error))
+        status = getattr(error, "status_code", None) or getattr(error, "code", None)
+        message = str(error).lower()
+        if status in _OVERLOAD_STATUSES or any(m in message for m in _OVERLOAD_MARKERS):
+            retry_after = None
+            response = getattr(error, "response", None)
+            headers = getattr(response, "headers", None)
+            if headers is not None:
+                try:
+                    retry_after = float(headers.get("retry-after"))
+                except (TypeError, ValueError):
+                    pass
+            return True, retry_after
+        error = error.__cause__ or error.__context__
+    return False, None
+
+
+class _TokenBucket:
+    """
+    Continuously refilled budget of `per_minute` units. Reservations may
+    overdraw the bucket; the caller then waits until it is refilled, so
+    callers are admitted in reservation order.
+    """
+
+    def __init__(self, per_minute: int) -> None:
+        self.capacity = float(per_minute)
+        self.rate = per_minute / 60.0
+        self._level = self.capacity
+        self._updated = time.monotonic()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._level = min(self.capacity, self._level + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def reserve(self, amount: float) -> float:
+        """
+        Takes `amount` units and returns how long to wait before using them.
+        """
+        self._refill()
+        # A single request larger than the whole budget would never fit.
+        self._level -= min(amount, self.capacity)
+        return 0.0 if self._level >= 0 else -self._level / self.rate
+
+    def charge(self, amount: float) -> None:
+        """
+        Takes `amount` units after the fact (e.g. generated tokens).
+        """
+        self._refill()
+        self._level -= min(amount, self.capacity)
+
+
+class ProviderLimiter:
+    """
+    Admission control for the calls to one provider/model.
+
+    - At most `limit` calls are in flight. The limit adapts AIMD-style: it
+      is halved whenever the provider answers with a rate-limit/overload
+      error, and grows back by about one per `limit` successful calls up to
+      `max_concurrency`. Overload responses also pause new calls for an
+      exponentially growing backoff (or the server's Retry-After).
+    - Optional requests-per-minute and tokens-per-minute token buckets.
+    - Callers beyond the concurrency limit wait in a queue of at most
+      `max_queue`; when it is full, or a caller has waited `queue_timeout`
+      seconds, `ProviderOverloadedError` is raised straight away instead of
+      piling more work onto a saturated backend.
+
+    With PROVIDER_ASYNC_CLIENTS off, provider calls run in the threadpool and
+    cannot be interrupted: a call cancelled by a timeout gives up its slot
+    while the request keeps running on the backend until it finishes.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        max_concurrency: int,
+        rpm: int = 0,
+        tpm: int = 0,
+        max_queue: int = settings.LLM_MAX_QUEUE,
+        queue_timeout: float = settings.LLM_QUEUE_TIMEOUT,
+        max_backoff: float = 60.0,
+    ) -> None:
+        self.name = name
+        self.max_concurrency = max(1, max_concurrency)
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.max_backoff = max_backoff
+        self._limit = float(self.max_concurrency)
+        self._requests = _TokenBucket(rpm) if rpm > 0 else None
+        self._tokens = _TokenBucket(tpm) if tpm > 0 else None
+        self._condition = asyncio.Condition()
+        self._in_flight = 0
+        self._waiting = 0
+        self._paused_until = 0.0
+        self._backoff = 0.0
+        self._completed = 0
+        self._failed = 0
+        self._throttled = 0
+        self._rejected = 0
+
+    @property
+    def limit(self) -> int:
+        return max(1, int(self._limit))
+
+    def _can_start(self, now: float) -> bool:
+        return now >= self._paused_until and self._in_flight < self.limit
+
+    async def acquire(self, tokens: int = 0) -> None:
+        """
+        Waits for a slot and for the rate budgets.
+
+        Raises:
+            ProviderOverloadedError: If the wait queue is full or the wait
+                exceeded `queue_timeout`
+        """
+        if self._waiting >= self.max_queue and not self._can_start(time.monotonic()):
+            self._rejected += 1
+            raise ProviderOverloadedError(
+                f"{self.name}: {self._waiting} calls already waiting, try again later"
+            )
+
+        deadline = time.monotonic() + self.queue_timeout
+        self._waiting += 1
+        try:
+            async with self._condition:
+                while True:
+                    now = time.monotonic()
+                    if self._can_start(now):
+                        break
+                    remaining = deadline - now
+                    if remaining <= 0:
+                        self._rejected += 1
+                        raise ProviderOverloadedError(
+                            f"{self.name}: no slot available after {self.queue_timeout}s"
+                        )
+                    if now < self._paused_until:
+                        remaining = min(remaining, self._paused_until - now)
+                    try:
+                        await asyncio.wait_for(self._condition.wait(), remaining)
+                    except asyncio.TimeoutError:
+                        pass
+                self._in_flight += 1
+        finally:
+            self._waiting -= 1
+
+        delay = 0.0
+        if self._requests is not None:
+            delay = self._requests.reserve(1)
+        if self._tokens is not None and tokens:
+            delay = max(delay, self._tokens.reserve(tokens))
+        if delay > 0:
+            try:
+                await asyncio.sleep(delay)
+            except BaseException:
+                await self.release(failed=True)
+                raise
+
+    async def release(
+        self,
+        overloaded: bool = False,
+        failed: bool = False,
+        retry_after: Optional[float] = None,
+    ) -> None:
+        # The bookkeeping happens before any await, so it is not lost if the
+        # releasing task is cancelled again while waiting for the lock;
+        # waiters re-check on their own timeout in that case.
+        self._in_flight -= 1
+        if overloaded:
+            self._throttled += 1
+            now = time.monotonic()
+            # Calls that were already in flight when the first overload
+            # response arrived report it too; back off once per episode.
+            if now >= self._paused_until:
+                self._limit = max(1.0, self._limit / 2)
+                self._backoff = min(self.max_backoff, max(1.0, self._backoff * 2))
+                pause = retry_after if retry_after else self._backoff * random.uniform(0.5, 1.0)
+                self._paused_until = now + pause
+                logger.warning(
+                    f"{self.name} is overloaded; concurrency limit {self.limit}, pausing {pause:.1f}s"
+                )
+        elif failed:
+            self._failed += 1
+        else:
+            self._completed += 1
+            self._backoff /= 2
+            self._limit = min(float(self.max_concurrency), self._limit + 1.0 / self._limit)
+        async with self._condition:
+            self._condition.notify_all()
+
+    def charge(self, tokens: int) -> None:
+        """
+        Counts tokens that were only known after the call (the response).
+        """
+        if self._tokens is not None and tokens:
+            self._tokens.charge(tokens)
+
+    @asynccontextmanager
+    async def slot(self, tokens: int = 0) -> AsyncIterator[None]:
+        """
+        Holds one call slot for the duration of the block and feeds the
+        outcome back into the adaptive limit. Only calls that return (or
+        streams their consumer closed) count as completed: a timeout is
+        treated as an overload signal, and a call that was cancelled (the
+        caller's deadline passed, or a hedged duplicate won) as failed.
+        """
+        await self.acquire(tokens)
+        overloaded, failed, retry_after = False, False, None
+        try:
+            yield
+        except GeneratorExit:
+            raise
+        except asyncio.TimeoutError:
+            overloaded = True
+            raise
+        except BaseException as e:
+            overloaded, retry_after = _overload_details(e)
+            failed = not overloaded
+            raise
+        finally:
+            await self.release(overloaded=overloaded, failed=failed, retry_after=retry_after)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "name": self.name,
+            "in_flight": self._in_flight,
+            "queued": self._waiting,
+            "concurrency_limit": self.limit,
+            "max_concurrency": self.max_concurrency,
+            "paused_for": round(max(0.0, self._paused_until - time.monotonic()), 3),
+            "completed": self._completed,
+            "failed": self._failed,
+            "throttled": self._throttled,
+            "rejected": self._rejected,
+        }
+
+
+class LimiterRegistry:
+    """
+    One `ProviderLimiter` per (kind, provider, model), configured from the
+    settings, shared by every manager and request in the process.
+    """
+
+    def __init__(self) -> None:
+        self._limiters: Dict[Tuple[str, str, str], ProviderLimiter] = {}
+
+    def get(self, kind: str, provider: Optional[str], model: Optional[str]) -> ProviderLimiter:
+        key = (kind, provider or "", model or "")
+        limiter = self._limiters.get(key)
+        if limiter is None:
+            if kind == "embedding":
+                limits = (
+                    settings.EMBEDDING_MAX_CONCURRENCY,
+                    settings.EMBEDDING_RPM,
+                    settings.EMBEDDING_TPM,
+                )
+            else:
+                limits = (settings.LLM_MAX_CONCURRENCY, settings.LLM_RPM, settings.LLM_TPM)
+            max_concurrency, rpm, tpm = limits
+            limiter = ProviderLimiter(
+                "/".join(key), max_concurrency=max_concurrency, rpm=rpm, tpm=tpm
+            )
+            self._limiters[key] = limiter
+        return limiter
+
+    def stats(self) -> List[Dict[str, Any]]:
+        return [limiter.stats() for limiter in self._limiters.values()]
+
+
+provider_limiters = LimiterRegistry()
+
+
+class RateLimitedProvider(Provider):
+    """
+    Runs every call of the wrapped provider through a `ProviderLimiter`. A
+    stream holds its slot until it is exhausted or closed.
+    """
+
+    def __init__(self, provider: Provider, limiter: ProviderLimiter) -> None:
+        self.provider = provider
+        self.limiter = limiter
+
+    async def __call__(self, prompt: str, **generation_args: Any) -> str:
+        async with self.limiter.slot(estimate_tokens(prompt)):
+            response = await self.provider(prompt, **generation_args)
+        self.limiter.charge(estimate_tokens(response))
+        return response
+
+    async def stream(self, prompt: str, **generation_args: Any) -> AsyncIterator[str]:
+        async with self.limiter.slot(estimate_tokens(prompt)):
+            generated = 0
+            try:
+                async for chunk in self.provider.stream(prompt, **generation_args):
+                    generated += len(chunk)
+                    yield chunk
+            finally:
+                self.limiter.charge(generated // 4)
+
+    async def aclose(self) -> None:
+        await self.provider.aclose()
+
+
+class RateLimitedEmbeddingProvider(EmbeddingProvider):
+    """
+    `RateLimitedProvider` for embedding providers; a batch counts as one
+    request.
+    """
+
+    def __init__(self, provider: EmbeddingProvider, limiter: ProviderLimiter) -> None:
+        self.provider = provider
+        self.limiter = limiter
+
+    async def embed(self, text: str) -> list[float]:
+        async with self.limiter.slot(estimate_tokens(text)):
+            return await self.provider.embed(text)
+
+    async def embed_many(self, texts: List[str]) -> np.ndarray:
+        async with self.limiter.slot(sum(estimate_tokens(text) for text in texts)):
+            return await self.provider.embed_many(texts)
+
+    async def aclose(self) -> None:
+        await self.provider.aclose()
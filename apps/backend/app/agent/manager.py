@@ -1,15 +1,27 @@
 import os
-from typing import Dict, Any
+import numpy as np
+
+from typing import Dict, Any, AsyncIterator, List, Type
+from pydantic import BaseModel
 
 from ..core import settings
-from .strategies.wrapper import JSONWrapper, MDWrapper
+from .cache import embedding_cache, llm_response_cache
+from .registry import provider_registry
+from .limiter import (
+    RateLimitedProvider,
+    RateLimitedEmbeddingProvider,
+    provider_limiters,
+)
+from .resilience import ProviderCandidate, ResilientProvider
+from .strategies.wrapper import JSONWrapper, MDWrapper, StructuredOutputWrapper
 from .providers.base import Provider, EmbeddingProvider
 
 class AgentManager:
     def __init__(self,
                  strategy: str | None = None,
                  model: str = settings.LL_MODEL,
-                 model_provider: str = settings.LLM_PROVIDER
+                 model_provider: str = settings.LLM_PROVIDER,
+                 cache: bool = settings.LLM_CACHE_ENABLED
                  ) -> None:
         match strategy:
             case "md":
@@ -20,8 +32,10 @@ class AgentManager:
                 self.strategy = JSONWrapper()
         self.model = model
         self.model_provider = model_provider
+        self.cache = cache
 
-    async def _get_provider(self, **kwargs: Any) -> Provider:
+    @staticmethod
+    def _options(**kwargs: Any) -> Dict[str, Any]:
         # Default options for any LLM. Not all can handle them
         # (e.g. OpenAI doesn't take top_k) but each provider can make
         # best effort.
@@ -29,43 +43,136 @@ class AgentManager:
             "temperature": 0,
             "top_p": 0.9,
             "top_k": 40,
-            "num_ctx": 20000
+            "num_ctx": settings.LLM_NUM_CTX_MAX
         }
         opts.update(kwargs)
-        match self.model_provider:
+        return opts
+
+    async def _get_provider(self,
+                            model_provider: str | None = None,
+                            model: str | None = None,
+                            api_key: str | None = None,
+                            base_url: str | None = None) -> Provider:
+        # model_provider/model/api_key/base_url select a fallback provider;
+        # by default the manager's own provider is built. Providers are
+        # shared per connection; generation options are passed per call.
+        model_provider = model_provider or self.model_provider
+        model = model or self.model
+        match model_provider:
             case 'openai':
                 from .providers.openai import OpenAIProvider
-                api_key = opts.get("llm_api_key", settings.LLM_API_KEY)
-                return OpenAIProvider(model_name=self.model,
-                                      api_key=api_key,
-                                      opts=opts)
+                api_key = api_key or settings.LLM_API_KEY
+                key = provider_registry.make_key("llm", model_provider, model,
+                                                 api_key=api_key, base_url=base_url)
+                return await provider_registry.get(
+                    key, lambda: OpenAIProvider(model_name=model,
+                                                api_key=api_key,
+                                                base_url=base_url))
             case 'gemini':
                 from .providers.gemini import GeminiProvider
-                api_key = opts.get("llm_api_key", settings.LLM_API_KEY)
-                return GeminiProvider(model_name=self.model,
-                                      api_key=api_key,
-                                      opts=opts)
+                api_key = api_key or settings.LLM_API_KEY
+                key = provider_registry.make_key("llm", model_provider, model,
+                                                 api_key=api_key)
+                return await provider_registry.get(
+                    key, lambda: GeminiProvider(model_name=model,
+                                                api_key=api_key))
             case 'ollama':
                 from .providers.ollama import OllamaProvider
-                model = opts.get("model", self.model)
-                return OllamaProvider(model_name=model,
-                                      opts=opts)
+                key = provider_registry.make_key("llm", model_provider, model,
+                                                 base_url=base_url)
+                return await provider_registry.get(
+                    key, lambda: OllamaProvider(model_name=model,
+                                                host=base_url))
             case _:
                 from .providers.llama_index import LlamaIndexProvider
-                llm_api_key = opts.get("llm_api_key", settings.LLM_API_KEY)
-                llm_api_base_url = opts.get("llm_base_url", settings.LLM_BASE_URL)
-                return LlamaIndexProvider(api_key=llm_api_key,
-                                          model_name=self.model,
-                                          api_base_url=llm_api_base_url,
-                                          provider=self.model_provider,
-                                          opts=opts)
-
-    async def run(self, prompt: str, **kwargs: Any) -> Dict[str, Any]:
+                llm_api_key = api_key or settings.LLM_API_KEY
+                llm_api_base_url = base_url or settings.LLM_BASE_URL
+                key = provider_registry.make_key("llm", model_provider, model,
+                                                 api_key=llm_api_key,
+                                                 base_url=llm_api_base_url)
+                return await provider_registry.get(
+                    key, lambda: LlamaIndexProvider(api_key=llm_api_key,
+                                                    model_name=model,
+                                                    api_base_url=llm_api_base_url,
+                                                    provider=model_provider,
+                                                    opts=self._options()))
+
+    def _get_resilient_provider(self) -> ResilientProvider:
+        """
+        The manager's provider followed by the LLM_FALLBACKS chain, each
+        rate limited and built only when it is first needed.
+        """
+        targets = [{"provider": self.model_provider, "model": self.model},
+                   *settings.LLM_FALLBACKS]
+        candidates = []
+        for target in targets:
+            model_provider = target.get("provider") or self.model_provider
+            model = target.get("model") or self.model
+
+            async def factory(target=target, model_provider=model_provider,
+                              model=model) -> Provider:
+                provider = await self._get_provider(model_provider=model_provider,
+                                                    model=model,
+                                                    api_key=target.get("api_key"),
+                                                    base_url=target.get("base_url"))
+                return RateLimitedProvider(
+                    provider, provider_limiters.get("llm", model_provider, model))
+
+            candidates.append(ProviderCandidate(
+                name=f"{model_provider}/{model}",
+                factory=factory,
+                # Duplicating requests to a local model only adds to its load.
+                hedge=model_provider != "ollama"))
+        return ResilientProvider(candidates)
+
+    async def run(self,
+                  prompt: str,
+                  response_model: Type[BaseModel] | None = None,
+                  **kwargs: Any) -> Dict[str, Any]:
         """
         Run the agent with the given prompt and generation arguments.
+
+        With a `response_model`, a JSON agent asks providers that support it
+        to constrain their output to the model's JSON schema. `kwargs` are
+        provider options (see `_options`, e.g. `num_ctx` from a built prompt)
+        and are passed to the provider with the call.
         """
-        provider = await self._get_provider(**kwargs)
-        return await self.strategy(prompt, provider, **kwargs)
+        provider = self._get_resilient_provider()
+        opts = self._options(**kwargs)
+        strategy = self.strategy
+        strategy_name = type(strategy).__name__
+        if (response_model is not None and settings.LLM_STRUCTURED_OUTPUT
+                and isinstance(strategy, JSONWrapper)):
+            strategy = StructuredOutputWrapper(response_model)
+            strategy_name = f"{type(strategy).__name__}:{response_model.__name__}"
+        if not self.cache or opts.get("temperature") != 0:
+            return await strategy(prompt, provider, opts=opts)
+
+        # temperature 0 is deterministic, so an identical request can be
+        # answered from the cache.
+        key = llm_response_cache.make_key(
+            self.model_provider, self.model, opts, strategy_name, prompt
+        )
+        response = await llm_response_cache.get(key)
+        if response is None:
+            response = await strategy(prompt, provider, opts=opts)
+            # The key names the primary model; an answer from a fallback is
+            # not cached, or it would keep being served as the primary's.
+            if provider.answered_by is provider.candidates[0]:
+                await llm_response_cache.set(
+                    key, self.model_provider, self.model, strategy_name, response
+                )
+        return response
+
+    async def stream(self, prompt: str, **kwargs: Any) -> AsyncIterator[str]:
+        """
+        Stream the raw model output for the given prompt as it is generated.
+        No strategy is applied to the streamed text; callers post-process the
+        complete response (e.g. with `MDWrapper.format`).
+        """
+        provider = self._get_resilient_provider()
+        async for token in provider.stream(prompt, opts=self._options(**kwargs)):
+            yield token
 
 class EmbeddingManager:
     def __init__(self,
@@ -74,6 +181,14 @@ class EmbeddingManager:
         self._model = model
         self._model_provider = model_provider
 
+    @property
+    def model(self) -> str:
+        return self._model
+
+    @property
+    def model_provider(self) -> str:
+        return self._model_provider
+
     async def _get_embedding_provider(
         self, **kwargs: Any
     ) -> EmbeddingProvider:
@@ -81,25 +196,78 @@ class EmbeddingManager:
             case 'openai':
                 from .providers.openai import OpenAIEmbeddingProvider
                 api_key = kwargs.get("openai_api_key", settings.EMBEDDING_API_KEY)
-                return OpenAIEmbeddingProvider(api_key=api_key, embedding_model=self._model)
+                key = provider_registry.make_key("embedding", self._model_provider,
+                                                 self._model, api_key=api_key)
+                return await provider_registry.get(
+                    key, lambda: OpenAIEmbeddingProvider(api_key=api_key,
+                                                         embedding_model=self._model))
             case 'gemini':
                 from .providers.gemini import GeminiEmbeddingProvider
                 api_key = kwargs.get("gemini_api_key", settings.EMBEDDING_API_KEY)
-                return GeminiEmbeddingProvider(api_key=api_key, embedding_model=self._model)
+                key = provider_registry.make_key("embedding", self._model_provider,
+                                                 self._model, api_key=api_key)
+                return await provider_registry.get(
+                    key, lambda: GeminiEmbeddingProvider(api_key=api_key,
+                                                         embedding_model=self._model))
             case 'ollama':
                 from .providers.ollama import OllamaEmbeddingProvider
                 model = kwargs.get("embedding_model", self._model)
-                return OllamaEmbeddingProvider(embedding_model=model)
+                key = provider_registry.make_key("embedding", self._model_provider, model)
+                return await provider_registry.get(
+                    key, lambda: OllamaEmbeddingProvider(embedding_model=model))
             case _:
                 from .providers.llama_index import LlamaIndexEmbeddingProvider
                 embed_api_key = kwargs.get("embedding_api_key", settings.EMBEDDING_API_KEY)
-                return LlamaIndexEmbeddingProvider(api_key=embed_api_key,
-                                                   provider=self._model_provider,
-                                                   embedding_model=self._model)
+                key = provider_registry.make_key("embedding", self._model_provider,
+                                                 self._model, api_key=embed_api_key,
+                                                 base_url=settings.EMBEDDING_BASE_URL)
+                return await provider_registry.get(
+                    key, lambda: LlamaIndexEmbeddingProvider(api_key=embed_api_key,
+                                                             provider=self._model_provider,
+                                                             embedding_model=self._model))
+
+    async def _get_limited_embedding_provider(self, **kwargs: Any) -> EmbeddingProvider:
+        provider = await self._get_embedding_provider(**kwargs)
+        return RateLimitedEmbeddingProvider(
+            provider,
+            provider_limiters.get("embedding", self._model_provider, self._model),
+        )
 
-    async def embed(self, text: str, **kwargs: Any) -> list[float]:
+    async def embed(self, text: str, **kwargs: Any) -> np.ndarray:
         """
-        Get the embedding for the given text.
+        Get the embedding for the given text, served from the embedding
+        cache when the same text was embedded by the same model before.
         """
-        provider = await self._get_embedding_provider(**kwargs)
-        return await provider.embed(text)
+        cached = await embedding_cache.get(self._model_provider, self._model, text)
+        if cached is not None:
+            return cached
+        provider = await self._get_limited_embedding_provider(**kwargs)
+        embedding = await provider.embed(text)
+        return await embedding_cache.set(
+            self._model_provider, self._model, text, embedding
+        )
+
+    async def embed_many(self, texts: List[str], **kwargs: Any) -> np.ndarray:
+        """
+        Get embeddings for several texts as a matrix with one row per text.
+        Cache misses are embedded together in a single provider round trip.
+        """
+        if not texts:
+            return np.empty((0, 0), dtype=np.float32)
+        vectors = await embedding_cache.get_many(
+            self._model_provider, self._model, texts
+        )
+        missing = list(dict.fromkeys(t for t, v in zip(texts, vectors) if v is None))
+        if missing:
+            provider = await self._get_limited_embedding_provider(**kwargs)
+            embeddings = await provider.embed_many(missing)
+            computed = dict(
+                zip(
+                    missing,
+                    await embedding_cache.set_many(
+                        self._model_provider, self._model, missing, embeddings
+                    ),
+                )
+            )
+            vectors = [v if v is not None else computed[t] for t, v in zip(texts, vectors)]
+        return np.vstack(vectors)
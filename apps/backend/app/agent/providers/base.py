@@ -1,15 +1,52 @@
-from typing import Any
+import httpx
+import asyncio
+import numpy as np
+
+from typing import Any, AsyncIterator, List
 from abc import ABC, abstractmethod
 
 
+class HTTPTransports:
+    """
+    The sync and async connection pools of a provider whose SDK builds its
+    own httpx clients but has no public way to close them. The provider
+    passes `sync`/`async_` into the SDK client (as httpx's `transport`) and
+    closes them in its `aclose`.
+    """
+
+    def __init__(self) -> None:
+        self.sync = httpx.HTTPTransport()
+        self.async_ = httpx.AsyncHTTPTransport()
+
+    async def aclose(self) -> None:
+        self.sync.close()
+        await self.async_.aclose()
+
+
 class Provider(ABC):
     """
     Abstract base class for providers.
     """
 
+    # Generation options (temperature, num_ctx, ...) are passed per call as
+    # the `opts` generation argument and override those given to the
+    # constructor, so one provider instance serves every option set.
     @abstractmethod
     async def __call__(self, prompt: str, **generation_args: Any) -> str: ...
 
+    async def stream(self, prompt: str, **generation_args: Any) -> AsyncIterator[str]:
+        """
+        Yield the response incrementally as the model generates it.
+
+        Providers without a streaming API yield the whole response once.
+        """
+        yield await self(prompt, **generation_args)
+
+    async def aclose(self) -> None:
+        """
+        Release network resources (HTTP connection pools) held by the provider.
+        """
+
 
 class EmbeddingProvider(ABC):
     """
@@ -18,3 +55,20 @@ class EmbeddingProvider(ABC):
 
     @abstractmethod
     async def embed(self, text: str) -> list[float]: ...
+
+    async def embed_many(self, texts: List[str]) -> np.ndarray:
+        """
+        Embed several texts, returning one row per text.
+
+        Providers with a native batch API should override this; the
+        fallback issues one `embed` call per text concurrently.
+        """
+        embeddings = await asyncio.gather(*(self.embed(text) for text in texts))
+        return np.vstack(
+            [np.asarray(e, dtype=np.float32).reshape(-1) for e in embeddings]
+        )
+
+    async def aclose(self) -> None:
+        """
+        Release network resources (HTTP connection pools) held by the provider.
+        """
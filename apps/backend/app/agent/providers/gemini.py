@@ -1,17 +1,30 @@
 import os
 import logging
+import numpy as np
 
 from google.genai import Client, types
-from typing import Any, Dict
+from typing import Any, AsyncIterator, Dict, List, Optional
 from fastapi.concurrency import run_in_threadpool
 
 from ..exceptions import ProviderError
-from .base import Provider, EmbeddingProvider
+from .base import HTTPTransports, Provider, EmbeddingProvider
 from ...core import settings
 
 logger = logging.getLogger(__name__)
 
 
+def _make_client(api_key: str, transports: HTTPTransports) -> Client:
+    # google-genai has no public close(), so the client runs on transports
+    # the provider owns (this also keeps it on httpx rather than aiohttp).
+    return Client(
+        api_key=api_key,
+        http_options=types.HttpOptions(
+            client_args={"transport": transports.sync},
+            async_client_args={"transport": transports.async_},
+        ),
+    )
+
+
 class GeminiProvider(Provider):
     def __init__(
         self,
@@ -24,39 +37,101 @@ class GeminiProvider(Provider):
         api_key = api_key or settings.LLM_API_KEY or os.getenv("GEMINI_API_KEY")
         if not api_key:
             raise ProviderError("Gemini API key is missing")
-        self._client = Client(api_key=api_key)
+        self._transports = HTTPTransports()
+        self._client = _make_client(api_key, self._transports)
         self.model = model_name
         self.opts = opts
         self.instructions = ""
 
+    async def aclose(self) -> None:
+        await self._transports.aclose()
+
+    def _config(self, options: Dict[str, Any]) -> types.GenerateContentConfig:
+        return types.GenerateContentConfig(
+            system_instruction=self.instructions,
+            thinking_config=types.ThinkingConfig(thinking_budget=8000),
+            **options,
+        )
+
     def _generate_sync(self, prompt: str, options: Dict[str, Any]) -> str:
         try:
             response = self._client.models.generate_content(
                 model=self.model,
                 contents=prompt,
-                config=types.GenerateContentConfig(
-                    system_instruction=self.instructions,
-                    thinking_config=types.ThinkingConfig(thinking_budget=8000),
-                    **options,
-                ),
+                config=self._config(options),
             )
             return response.text
         except Exception as e:
             raise ProviderError(f"Gemini - error generating response: {e}")
 
-    async def __call__(self, prompt: str, **generation_args: Any) -> str:
+    async def _generate_async(self, prompt: str, options: Dict[str, Any]) -> str:
+        try:
+            response = await self._client.aio.models.generate_content(
+                model=self.model,
+                contents=prompt,
+                config=self._config(options),
+            )
+            return response.text
+        except Exception as e:
+            raise ProviderError(f"Gemini - error generating response: {e}") from e
+
+    def _options(self, json_schema: Optional[Dict[str, Any]] = None,
+                 opts: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        opts = {**self.opts, **(opts or {})}
+        options = {
+            "temperature": opts.get("temperature", 0),
+            "top_p": opts.get("top_p", 0.9),
+            "top_k": opts.get("top_k", 40),
+            # num_ctx is sized to each prompt for local models; Gemini's output
+            # budget also covers thinking tokens, so it keeps the full default.
+            "max_output_tokens": opts.get("max_output_tokens", 20000),
+        }
+        if json_schema is not None:
+            options["response_mime_type"] = "application/json"
+            options["response_json_schema"] = json_schema
+        return options
+
+    async def __call__(
+        self,
+        prompt: str,
+        json_schema: Optional[Dict[str, Any]] = None,
+        opts: Optional[Dict[str, Any]] = None,
+        **generation_args: Any,
+    ) -> str:
         if generation_args:
             logger.warning(
                 f"GeminiProvider - generation_args not used {generation_args}"
             )
-        myopts = {
-            "temperature": self.opts.get("temperature", 0),
-            "top_p": self.opts.get("top_p", 0.9),
-            "top_k": self.opts.get("top_k", 40),
-            "max_output_tokens": self.opts.get("num_ctx", 20000),
-        }
+        myopts = self._options(json_schema, opts)
+        if settings.PROVIDER_ASYNC_CLIENTS:
+            return await self._generate_async(prompt, myopts)
         return await run_in_threadpool(self._generate_sync, prompt, myopts)
 
+    async def stream(
+        self,
+        prompt: str,
+        json_schema: Optional[Dict[str, Any]] = None,
+        opts: Optional[Dict[str, Any]] = None,
+        **generation_args: Any,
+    ) -> AsyncIterator[str]:
+        if not settings.PROVIDER_ASYNC_CLIENTS:
+            yield await self(prompt, json_schema=json_schema, opts=opts, **generation_args)
+            return
+        if generation_args:
+            logger.warning(
+                f"GeminiProvider - generation_args not used {generation_args}"
+            )
+        try:
+            async for chunk in await self._client.aio.models.generate_content_stream(
+                model=self.model,
+                contents=prompt,
+                config=self._config(self._options(json_schema, opts)),
+            ):
+                if chunk.text:
+                    yield chunk.text
+        except Exception as e:
+            raise ProviderError(f"Gemini - error generating response: {e}") from e
+
 
 class GeminiEmbeddingProvider(EmbeddingProvider):
     def __init__(
@@ -67,15 +142,36 @@ class GeminiEmbeddingProvider(EmbeddingProvider):
         api_key = api_key or settings.EMBEDDING_API_KEY or os.getenv("GEMINI_API_KEY")
         if not api_key:
             raise ProviderError("Gemini API key is missing")
-        self._client = Client(api_key=api_key)
+        self._transports = HTTPTransports()
+        self._client = _make_client(api_key, self._transports)
         self._model = embedding_model
 
+    async def aclose(self) -> None:
+        await self._transports.aclose()
+
+    async def _embed_content(self, contents: str | List[str]) -> types.EmbedContentResponse:
+        if settings.PROVIDER_ASYNC_CLIENTS:
+            return await self._client.aio.models.embed_content(
+                contents=contents, model=self._model
+            )
+        return await run_in_threadpool(
+            self._client.models.embed_content, contents=contents, model=self._model
+        )
+
     async def embed(self, text: str) -> list[float]:
         try:
-            response = await run_in_threadpool(
-                self._client.models.embed_content, contents=text, model=self._model
-            )
+            response = await self._embed_content(text)
             return response.embeddings[0].values
 
         except Exception as e:
             raise ProviderError(f"Gemini - error generating embedding: {e}") from e
+
+    async def embed_many(self, texts: List[str]) -> np.ndarray:
+        try:
+            response = await self._embed_content(texts)
+            return np.asarray(
+                [embedding.values for embedding in response.embeddings],
+                dtype=np.float32,
+            )
+        except Exception as e:
+            raise ProviderError(f"Gemini - error generating embedding: {e}") from e
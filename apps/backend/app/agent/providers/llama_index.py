@@ -1,6 +1,8 @@
+import json
 import logging
+import numpy as np
 
-from typing import Any, Dict, List
+from typing import Any, AsyncIterator, Dict, List, Optional
 from fastapi.concurrency import run_in_threadpool
 from llama_index.core.base.embeddings.base import BaseEmbedding
 from llama_index.core.base.llms.base import BaseLLM
@@ -42,41 +44,98 @@ class LlamaIndexProvider(Provider):
         self._provider = provider
         if not provider:
             raise ValueError("Provider string is required")
-        provider_obj, self._modname, self._classname = _get_real_provider(provider)
-        if not issubclass(provider_obj, BaseLLM):
+        self._provider_obj, self._modname, self._classname = _get_real_provider(provider)
+        if not issubclass(self._provider_obj, BaseLLM):
             raise TypeError("LLM provider must be e.g. a llama_index.llms.* class - a subclass of llama_index.core.base.llms.base.BaseLLM")
+        # LlamaIndex integrations take their options in the constructor, so
+        # one is built for each distinct set of options passed per call.
+        self._clients: Dict[str, BaseLLM] = {}
+        self._client = self._client_for(None)
 
+    def _client_for(self, opts: Optional[Dict[str, Any]]) -> BaseLLM:
+        opts = {**self.opts, **(opts or {})}
+        key = json.dumps(opts, sort_keys=True, default=str)
+        client = self._clients.get(key)
+        if client is not None:
+            return client
         # This doesn't work on 100% of the LlamaIndex LLM integrations, but it's a fairly reliable pattern,
         # and works for the important ones such as OpenAILike.
-        kwargs_for_provider = {'model':model_name,
-                               'model_name':model_name,
-                               'api_key':api_key,
-                               'token':api_key,
+        kwargs_for_provider = {'model':self._model,
+                               'model_name':self._model,
+                               'api_key':self._api_key,
+                               'token':self._api_key,
                                'is_chat_model':False,
                                'is_function_calling_model':False}
-        if api_base_url:
+        if self._api_base_url:
             kwargs_for_provider['base_url'] = \
-                kwargs_for_provider['api_base'] = api_base_url
+                kwargs_for_provider['api_base'] = self._api_base_url
         kwargs_for_provider.update(opts)
         kwargs_for_provider['context_window'] = \
             kwargs_for_provider['max_tokens'] = kwargs_for_provider.get('num_ctx', 20000)
-        self._client = provider_obj(**kwargs_for_provider)
+        client = self._clients[key] = self._provider_obj(**kwargs_for_provider)
+        return client
 
-    def _generate_sync(self, prompt: str, **options) -> str:
+    def _generate_sync(self, prompt: str, client: Optional[BaseLLM] = None) -> str:
         """
         Generate a response from the model.
         """
         try:
-            cr = self._client.complete(prompt)
+            cr = (client or self._client).complete(prompt)
             return cr.text
         except Exception as e:
             logger.error(f"llama_index sync error: {e}")
             raise ProviderError(f"llama_index - Error generating response: {e}") from e
 
-    async def __call__(self, prompt: str, **generation_args: Any) -> str:
+    async def _generate_async(self, prompt: str, client: BaseLLM) -> str:
+        """
+        Generate a response through the integration's async API, falling back
+        to the sync client for integrations that don't implement one.
+        """
+        try:
+            cr = await client.acomplete(prompt)
+            return cr.text
+        except NotImplementedError:
+            return await run_in_threadpool(self._generate_sync, prompt, client)
+        except Exception as e:
+            logger.error(f"llama_index async error: {e}")
+            raise ProviderError(f"llama_index - Error generating response: {e}") from e
+
+    # There is no common structured-output API across LlamaIndex integrations,
+    # so `json_schema` is not used; the prompt already describes the schema.
+    async def __call__(self, prompt: str, json_schema: Optional[Dict[str, Any]] = None,
+                       opts: Optional[Dict[str, Any]] = None,
+                       **generation_args: Any) -> str:
         if generation_args:
             logger.warning(f"LlamaIndexProvider ignoring generation_args: {generation_args}")
-        return await run_in_threadpool(self._generate_sync, prompt)
+        client = self._client_for(opts)
+        if settings.PROVIDER_ASYNC_CLIENTS:
+            return await self._generate_async(prompt, client)
+        return await run_in_threadpool(self._generate_sync, prompt, client)
+
+    async def stream(self, prompt: str, json_schema: Optional[Dict[str, Any]] = None,
+                     opts: Optional[Dict[str, Any]] = None,
+                     **generation_args: Any) -> AsyncIterator[str]:
+        if not settings.PROVIDER_ASYNC_CLIENTS:
+            yield await self(prompt, opts=opts, **generation_args)
+            return
+        if generation_args:
+            logger.warning(f"LlamaIndexProvider ignoring generation_args: {generation_args}")
+        client = self._client_for(opts)
+        try:
+            responses = await client.astream_complete(prompt)
+        except NotImplementedError:
+            yield await run_in_threadpool(self._generate_sync, prompt, client)
+            return
+        except Exception as e:
+            logger.error(f"llama_index streaming error: {e}")
+            raise ProviderError(f"llama_index - Error generating response: {e}") from e
+        try:
+            async for response in responses:
+                if response.delta:
+                    yield response.delta
+        except Exception as e:
+            logger.error(f"llama_index streaming error: {e}")
+            raise ProviderError(f"llama_index - Error generating response: {e}") from e
 
 class LlamaIndexEmbeddingProvider(EmbeddingProvider):
     def __init__(
@@ -115,7 +174,32 @@ class LlamaIndexEmbeddingProvider(EmbeddingProvider):
         Generate an embedding for the given text.
         """
         try:
+            if settings.PROVIDER_ASYNC_CLIENTS:
+                try:
+                    return await self._client.aget_text_embedding(text)
+                except NotImplementedError:
+                    pass
             return await run_in_threadpool(self._client.get_text_embedding, text)
         except Exception as e:
             logger.error(f"llama_index embedding error: {e}")
             raise ProviderError(f"llama_index - Error generating embedding: {e}") from e
+
+    async def embed_many(self, texts: List[str]) -> np.ndarray:
+        """
+        Generate embeddings for all texts using the integration's batching.
+        """
+        try:
+            embeddings = None
+            if settings.PROVIDER_ASYNC_CLIENTS:
+                try:
+                    embeddings = await self._client.aget_text_embedding_batch(texts)
+                except NotImplementedError:
+                    pass
+            if embeddings is None:
+                embeddings = await run_in_threadpool(
+                    self._client.get_text_embedding_batch, texts
+                )
+            return np.asarray(embeddings, dtype=np.float32)
+        except Exception as e:
+            logger.error(f"llama_index embedding error: {e}")
+            raise ProviderError(f"llama_index - Error generating embedding: {e}") from e
@@ -1,11 +1,12 @@
 import logging
 import ollama
+import numpy as np
 
-from typing import Any, Dict, List, Optional
+from typing import Any, AsyncIterator, Dict, List, Optional
 from fastapi.concurrency import run_in_threadpool
 
 from ..exceptions import ProviderError
-from .base import Provider, EmbeddingProvider
+from .base import HTTPTransports, Provider, EmbeddingProvider
 from ...core import settings
 
 logger = logging.getLogger(__name__)
@@ -17,7 +18,9 @@ class OllamaProvider(Provider):
             opts = {}
         self.opts = opts
         self.model = model_name
-        self._client = ollama.Client(host=host) if host else ollama.Client()
+        self._transports = HTTPTransports()
+        self._client = ollama.Client(host=host, transport=self._transports.sync)
+        self._async_client = ollama.AsyncClient(host=host, transport=self._transports.async_)
         installed_ollama_models = [model_class.model for model_class in self._client.list().models]
         if model_name not in installed_ollama_models:
             try:
@@ -27,6 +30,9 @@ class OllamaProvider(Provider):
                     f"Ollama Model '{model_name}' could not be pulled. Please update your apps/backend/.env file or select from the installed models."
                 ) from e
 
+    async def aclose(self) -> None:
+        await self._transports.aclose()
+
     @staticmethod
     async def _get_installed_models(host: Optional[str] = None) -> List[str]:
         """
@@ -39,7 +45,8 @@ class OllamaProvider(Provider):
 
         return await run_in_threadpool(_list_sync)
 
-    def _generate_sync(self, prompt: str, options: Dict[str, Any]) -> str:
+    def _generate_sync(self, prompt: str, options: Dict[str, Any],
+                       format: Optional[Dict[str, Any]] = None) -> str:
         """
         Generate a response from the model.
         """
@@ -48,17 +55,62 @@ class OllamaProvider(Provider):
                 prompt=prompt,
                 model=self.model,
                 options=options,
+                format=format,
             )
             return response["response"].strip()
         except Exception as e:
             logger.error(f"ollama sync error: {e}")
             raise ProviderError(f"Ollama - Error generating response: {e}") from e
 
-    async def __call__(self, prompt: str, **generation_args: Any) -> str:
+    async def _generate_async(self, prompt: str, options: Dict[str, Any],
+                              format: Optional[Dict[str, Any]] = None) -> str:
+        """
+        Generate a response from the model without leaving the event loop.
+        """
+        try:
+            response = await self._async_client.generate(
+                prompt=prompt,
+                model=self.model,
+                options=options,
+                format=format,
+            )
+            return response["response"].strip()
+        except Exception as e:
+            logger.error(f"ollama async error: {e}")
+            raise ProviderError(f"Ollama - Error generating response: {e}") from e
+
+    async def __call__(self, prompt: str, json_schema: Optional[Dict[str, Any]] = None,
+                       opts: Optional[Dict[str, Any]] = None,
+                       **generation_args: Any) -> str:
+        if generation_args:
+            logger.warning(f"OllamaProvider ignoring generation_args {generation_args}")
+        # Ollama can handle all the options manager.py passes in.
+        myopts = {**self.opts, **(opts or {})}
+        # A JSON schema as `format` constrains generation to matching JSON.
+        if settings.PROVIDER_ASYNC_CLIENTS:
+            return await self._generate_async(prompt, myopts, json_schema)
+        return await run_in_threadpool(self._generate_sync, prompt, myopts, json_schema)
+
+    async def stream(self, prompt: str, json_schema: Optional[Dict[str, Any]] = None,
+                     opts: Optional[Dict[str, Any]] = None,
+                     **generation_args: Any) -> AsyncIterator[str]:
+        if not settings.PROVIDER_ASYNC_CLIENTS:
+            yield await self(prompt, json_schema=json_schema, opts=opts, **generation_args)
+            return
         if generation_args:
             logger.warning(f"OllamaProvider ignoring generation_args {generation_args}")
-        myopts = self.opts # Ollama can handle all the options manager.py passes in.
-        return await run_in_threadpool(self._generate_sync, prompt, myopts)
+        try:
+            async for chunk in await self._async_client.generate(
+                prompt=prompt,
+                model=self.model,
+                options={**self.opts, **(opts or {})},
+                format=json_schema,
+                stream=True,
+            ):
+                yield chunk["response"]
+        except Exception as e:
+            logger.error(f"ollama streaming error: {e}")
+            raise ProviderError(f"Ollama - Error generating response: {e}") from e
 
 
 class OllamaEmbeddingProvider(EmbeddingProvider):
@@ -68,19 +120,36 @@ class OllamaEmbeddingProvider(EmbeddingProvider):
         host: Optional[str] = None,
     ):
         self._model = embedding_model
-        self._client = ollama.Client(host=host) if host else ollama.Client()
+        self._transports = HTTPTransports()
+        self._client = ollama.Client(host=host, transport=self._transports.sync)
+        self._async_client = ollama.AsyncClient(host=host, transport=self._transports.async_)
+
+    async def aclose(self) -> None:
+        await self._transports.aclose()
+
+    async def _embed(self, input: str | List[str]) -> ollama.EmbedResponse:
+        if settings.PROVIDER_ASYNC_CLIENTS:
+            return await self._async_client.embed(input=input, model=self._model)
+        return await run_in_threadpool(self._client.embed, input=input, model=self._model)
 
     async def embed(self, text: str) -> List[float]:
         """
         Generate an embedding for the given text.
         """
         try:
-            response = await run_in_threadpool(
-                self._client.embed,
-                input=text,
-                model=self._model,
-            )
+            response = await self._embed(text)
             return response.embeddings
         except Exception as e:
             logger.error(f"ollama embedding error: {e}")
             raise ProviderError(f"Ollama - Error generating embedding: {e}") from e
+
+    async def embed_many(self, texts: List[str]) -> np.ndarray:
+        """
+        Generate embeddings for all texts in a single request.
+        """
+        try:
+            response = await self._embed(texts)
+            return np.asarray(response.embeddings, dtype=np.float32)
+        except Exception as e:
+            logger.error(f"ollama embedding error: {e}")
+            raise ProviderError(f"Ollama - Error generating embedding: {e}") from e
@@ -1,8 +1,9 @@
 import os
 import logging
+import numpy as np
 
-from openai import OpenAI
-from typing import Any, Dict
+from openai import OpenAI, AsyncOpenAI
+from typing import Any, AsyncIterator, Dict, List, Optional
 from fastapi.concurrency import run_in_threadpool
 
 from ..exceptions import ProviderError
@@ -14,17 +15,23 @@ logger = logging.getLogger(__name__)
 
 class OpenAIProvider(Provider):
     def __init__(self, api_key: str | None = None, model_name: str = settings.LL_MODEL,
-                 opts: Dict[str, Any] = None):
+                 opts: Dict[str, Any] = None, base_url: str | None = None):
         if opts is None:
             opts = {}
         api_key = api_key or settings.LLM_API_KEY or os.getenv("OPENAI_API_KEY")
         if not api_key:
             raise ProviderError("OpenAI API key is missing")
-        self._client = OpenAI(api_key=api_key)
+        # base_url points the client at an OpenAI-compatible endpoint.
+        self._client = OpenAI(api_key=api_key, base_url=base_url)
+        self._async_client = AsyncOpenAI(api_key=api_key, base_url=base_url)
         self.model = model_name
         self.opts = opts
         self.instructions = ""
 
+    async def aclose(self) -> None:
+        self._client.close()
+        await self._async_client.close()
+
     def _generate_sync(self, prompt: str, options: Dict[str, Any]) -> str:
         try:
             response = self._client.responses.create(
@@ -37,19 +44,75 @@ class OpenAIProvider(Provider):
         except Exception as e:
             raise ProviderError(f"OpenAI - error generating response: {e}") from e
 
-    async def __call__(self, prompt: str, **generation_args: Any) -> str:
-        if generation_args:
-            logger.warning(f"OpenAIProvider - generation_args not used {generation_args}")
-        myopts = {
-            "temperature": self.opts.get("temperature", 0),
-            "top_p": self.opts.get("top_p", 0.9),
+    async def _generate_async(self, prompt: str, options: Dict[str, Any]) -> str:
+        try:
+            response = await self._async_client.responses.create(
+                model=self.model,
+                instructions=self.instructions,
+                input=prompt,
+                **options,
+            )
+            return response.output_text
+        except Exception as e:
+            raise ProviderError(f"OpenAI - error generating response: {e}") from e
+
+    def _options(self, json_schema: Optional[Dict[str, Any]] = None,
+                 opts: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        opts = {**self.opts, **(opts or {})}
+        options = {
+            "temperature": opts.get("temperature", 0),
+            "top_p": opts.get("top_p", 0.9),
 # top_k not currently supported by any OpenAI model - https://community.openai.com/t/does-openai-have-a-top-k-parameter/612410
 #            "top_k": generation_args.get("top_k", 40),
 # neither max_tokens
 #            "max_tokens": generation_args.get("max_length", 20000),
         }
+        if json_schema is not None:
+            # Strict mode would require every property to be listed as
+            # required and additionalProperties to be false, which pydantic's
+            # schemas (with optional fields) are not.
+            options["text"] = {
+                "format": {
+                    "type": "json_schema",
+                    "name": json_schema.get("title") or "response",
+                    "schema": json_schema,
+                    "strict": False,
+                }
+            }
+        return options
+
+    async def __call__(self, prompt: str, json_schema: Optional[Dict[str, Any]] = None,
+                       opts: Optional[Dict[str, Any]] = None,
+                       **generation_args: Any) -> str:
+        if generation_args:
+            logger.warning(f"OpenAIProvider - generation_args not used {generation_args}")
+        myopts = self._options(json_schema, opts)
+        if settings.PROVIDER_ASYNC_CLIENTS:
+            return await self._generate_async(prompt, myopts)
         return await run_in_threadpool(self._generate_sync, prompt, myopts)
 
+    async def stream(self, prompt: str, json_schema: Optional[Dict[str, Any]] = None,
+                     opts: Optional[Dict[str, Any]] = None,
+                     **generation_args: Any) -> AsyncIterator[str]:
+        if not settings.PROVIDER_ASYNC_CLIENTS:
+            yield await self(prompt, json_schema=json_schema, opts=opts, **generation_args)
+            return
+        if generation_args:
+            logger.warning(f"OpenAIProvider - generation_args not used {generation_args}")
+        try:
+            events = await self._async_client.responses.create(
+                model=self.model,
+                instructions=self.instructions,
+                input=prompt,
+                stream=True,
+                **self._options(json_schema, opts),
+            )
+            async for event in events:
+                if event.type == "response.output_text.delta":
+                    yield event.delta
+        except Exception as e:
+            raise ProviderError(f"OpenAI - error generating response: {e}") from e
+
 
 class OpenAIEmbeddingProvider(EmbeddingProvider):
     def __init__(
@@ -61,13 +124,33 @@ class OpenAIEmbeddingProvider(EmbeddingProvider):
         if not api_key:
             raise ProviderError("OpenAI API key is missing")
         self._client = OpenAI(api_key=api_key)
+        self._async_client = AsyncOpenAI(api_key=api_key)
         self._model = embedding_model
 
+    async def aclose(self) -> None:
+        self._client.close()
+        await self._async_client.close()
+
+    async def _create_embeddings(self, input: str | List[str]):
+        if settings.PROVIDER_ASYNC_CLIENTS:
+            return await self._async_client.embeddings.create(
+                input=input, model=self._model
+            )
+        return await run_in_threadpool(
+            self._client.embeddings.create, input=input, model=self._model
+        )
+
     async def embed(self, text: str) -> list[float]:
         try:
-            response = await run_in_threadpool(
-                self._client.embeddings.create, input=text, model=self._model
-            )
+            response = await self._create_embeddings(text)
             return response.data[0].embedding
         except Exception as e:
             raise ProviderError(f"OpenAI - error generating embedding: {e}") from e
+
+    async def embed_many(self, texts: List[str]) -> np.ndarray:
+        try:
+            response = await self._create_embeddings(texts)
+            data = sorted(response.data, key=lambda item: item.index)
+            return np.asarray([item.embedding for item in data], dtype=np.float32)
+        except Exception as e:
+            raise ProviderError(f"OpenAI - error generating embedding: {e}") from e
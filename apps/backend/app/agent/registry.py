@@ -0,0 +1,75 @@
+import asyncio
+import logging
+
+from typing import Callable, Dict, Hashable, Tuple, TypeVar
+from fastapi.concurrency import run_in_threadpool
+
+from .providers.base import Provider, EmbeddingProvider
+
+logger = logging.getLogger(__name__)
+
+P = TypeVar("P", Provider, EmbeddingProvider)
+
+
+class ProviderRegistry:
+    """
+    Process-wide cache of provider instances.
+
+    Providers own SDK clients with their own HTTP connection pools, so
+    building one per request means a new pool (and TLS handshake) per call.
+    The registry builds one instance per connection (provider, model,
+    credentials, endpoint) and hands it out afterwards; generation options
+    such as temperature or num_ctx vary per call and are passed to the
+    provider with each request, not baked into it. `aclose` releases the
+    instances on application shutdown.
+    """
+
+    def __init__(self) -> None:
+        self._providers: Dict[Hashable, Provider | EmbeddingProvider] = {}
+        self._locks: Dict[Hashable, asyncio.Lock] = {}
+
+    @staticmethod
+    def make_key(
+        kind: str,
+        provider: str | None,
+        model: str | None,
+        api_key: str | None = None,
+        base_url: str | None = None,
+    ) -> Tuple[str, ...]:
+        return (kind, provider or "", model or "", api_key or "", base_url or "")
+
+    async def get(self, key: Hashable, factory: Callable[[], P]) -> P:
+        """
+        Returns the cached provider for `key`, building it with `factory` on
+        first use. Construction runs in the threadpool because some providers
+        do blocking I/O in `__init__` (e.g. Ollama checks installed models).
+        """
+        provider = self._providers.get(key)
+        if provider is not None:
+            return provider
+
+        lock = self._locks.setdefault(key, asyncio.Lock())
+        async with lock:
+            provider = self._providers.get(key)
+            if provider is None:
+                provider = await run_in_threadpool(factory)
+                self._providers[key] = provider
+        return provider
+
+    async def aclose(self) -> None:
+        """
+        Closes every cached provider and empties the registry.
+        """
+        providers, self._providers = self._providers, {}
+        self._locks.clear()
+        for provider in providers.values():
+            try:
+                await provider.aclose()
+            except Exception as e:
+                logger.warning(f"error closing provider {type(provider).__name__}: {e}")
+
+    def __len__(self) -> int:
+        return len(self._providers)
+
+
+provider_registry = ProviderRegistry()
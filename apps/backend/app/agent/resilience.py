@@ -0,0 +1,225 @@
+import time
+import random
+import asyncio
+import logging
+
+from collections import defaultdict, deque
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Awaitable, Callable, Deque, Dict, List, Optional
+
+from ..core import settings
+from .exceptions import ProviderError, ProviderOverloadedError
+from .providers.base import Provider
+
+logger = logging.getLogger(__name__)
+
+
+class LatencyTracker:
+    """
+    Sliding window of recent successful call durations.
+    """
+
+    def __init__(self, size: int = 200, min_samples: int = 20) -> None:
+        self.min_samples = min_samples
+        self._samples: Deque[float] = deque(maxlen=size)
+
+    def record(self, seconds: float) -> None:
+        self._samples.append(seconds)
+
+    def quantile(self, q: float) -> Optional[float]:
+        """
+        Returns the `q` quantile of the window, or None until enough calls
+        have been seen for it to mean anything.
+        """
+        if len(self._samples) < self.min_samples:
+            return None
+        samples = sorted(self._samples)
+        return samples[min(len(samples) - 1, int(q * len(samples)))]
+
+
+# Shared by all ResilientProvider instances, keyed by candidate name.
+_latencies: Dict[str, LatencyTracker] = defaultdict(LatencyTracker)
+
+
+@dataclass
+class ProviderCandidate:
+    """
+    One entry of a failover chain. `factory` builds (or fetches) the
+    provider on first use, so fallbacks cost nothing while the primary is
+    healthy. `hedge` allows duplicate requests to this provider; it makes
+    little sense for a single local model, which would only get busier.
+    """
+
+    name: str
+    factory: Callable[[], Awaitable[Provider]]
+    hedge: bool = True
+
+
+class ResilientProvider(Provider):
+    """
+    Wraps an ordered chain of providers (primary first, then fallbacks).
+
+    Each attempt has a deadline of `timeout` seconds. A failed or timed-out
+    attempt is retried up to `retries` times with full-jitter exponential
+    backoff, after which the next provider in the chain is tried. When
+    `hedge` is on and a call runs longer than the provider's recent p95
+    latency, an identical request is sent alongside it and whichever answer
+    comes first is used. A provider whose local wait queue is full
+    (`ProviderOverloadedError`) is skipped straight away.
+
+    Streams are retried and failed over only until the first chunk arrives;
+    after that the chunk stream is passed through (with `timeout` as the
+    maximum gap between chunks).
+
+    `answered_by` is the candidate that produced the last response (or the
+    current stream), so callers can tell a fallback's answer from the
+    primary's.
+    """
+
+    def __init__(
+        self,
+        candidates: List[ProviderCandidate],
+        timeout: float = settings.LLM_TIMEOUT,
+        retries: int = settings.LLM_RETRIES,
+        backoff: float = settings.LLM_RETRY_BACKOFF,
+        hedge: bool = settings.LLM_HEDGE,
+        max_backoff: float = 30.0,
+    ) -> None:
+        self.candidates = candidates
+        self.timeout = timeout
+        self.retries = max(0, retries)
+        self.backoff = backoff
+        self.hedge = hedge
+        self.max_backoff = max_backoff
+        self.answered_by: Optional[ProviderCandidate] = None
+        self._providers: Dict[str, Provider] = {}
+
+    def _delay(self, attempt: int) -> float:
+        return random.uniform(0, min(self.max_backoff, self.backoff * 2**attempt))
+
+    async def _get(
+        self, candidate: ProviderCandidate, errors: List[BaseException]
+    ) -> Optional[Provider]:
+        provider = self._providers.get(candidate.name)
+        if provider is None:
+            try:
+                provider = await candidate.factory()
+            except Exception as e:
+                logger.warning(f"LLM provider {candidate.name} unavailable: {e}")
+                errors.append(e)
+                return None
+            self._providers[candidate.name] = provider
+        return provider
+
+    @staticmethod
+    def _failed(
+        errors: List[BaseException], candidate: ProviderCandidate, attempt: int, error: BaseException
+    ) -> None:
+        logger.warning(f"LLM provider {candidate.name} attempt {attempt + 1} failed: {error}")
+        errors.append(error)
+
+    @staticmethod
+    def _exhausted(errors: List[BaseException]) -> ProviderError:
+        if len(errors) == 1 and isinstance(errors[0], ProviderError):
+            return errors[0]
+        summary = "; ".join(str(e) for e in errors[-3:]) or "no provider configured"
+        return ProviderError(f"All LLM providers failed: {summary}")
+
+    async def _call_hedged(
+        self, candidate: ProviderCandidate, provider: Provider, prompt: str, **generation_args: Any
+    ) -> str:
+        tracker = _latencies[candidate.name]
+        hedge_after = tracker.quantile(0.95) if self.hedge and candidate.hedge else None
+        started = time.monotonic()
+        pending = {asyncio.ensure_future(provider(prompt, **generation_args))}
+        try:
+            if hedge_after is not None:
+                done, _ = await asyncio.wait(pending, timeout=hedge_after)
+                if not done:
+                    logger.info(f"Hedging {candidate.name} call after {hedge_after:.2f}s")
+                    pending.add(asyncio.ensure_future(provider(prompt, **generation_args)))
+            error: BaseException | None = None
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        tracker.record(time.monotonic() - started)
+                        return task.result()
+                    error = task.exception()
+            raise error
+        finally:
+            for task in pending:
+                task.cancel()
+
+    def _timed_out(self, candidate: ProviderCandidate) -> ProviderError:
+        return ProviderError(f"{candidate.name}: no response within {self.timeout}s")
+
+    async def __call__(self, prompt: str, **generation_args: Any) -> str:
+        errors: List[BaseException] = []
+        for candidate in self.candidates:
+            provider = await self._get(candidate, errors)
+            if provider is None:
+                continue
+            for attempt in range(self.retries + 1):
+                if attempt:
+                    await asyncio.sleep(self._delay(attempt - 1))
+                try:
+                    response = await asyncio.wait_for(
+                        self._call_hedged(candidate, provider, prompt, **generation_args),
+                        self.timeout,
+                    )
+                    self.answered_by = candidate
+                    return response
+                except asyncio.TimeoutError:
+                    self._failed(errors, candidate, attempt, self._timed_out(candidate))
+                except ProviderOverloadedError as e:
+                    self._failed(errors, candidate, attempt, e)
+                    break
+                except ProviderError as e:
+                    self._failed(errors, candidate, attempt, e)
+        raise self._exhausted(errors)
+
+    async def stream(self, prompt: str, **generation_args: Any) -> AsyncIterator[str]:
+        errors: List[BaseException] = []
+        for candidate in self.candidates:
+            provider = await self._get(candidate, errors)
+            if provider is None:
+                continue
+            for attempt in range(self.retries + 1):
+                if attempt:
+                    await asyncio.sleep(self._delay(attempt - 1))
+                chunks = provider.stream(prompt, **generation_args)
+                try:
+                    first = await asyncio.wait_for(anext(chunks), self.timeout)
+                except StopAsyncIteration:
+                    self.answered_by = candidate
+                    return
+                except (asyncio.TimeoutError, ProviderError) as e:
+                    await chunks.aclose()
+                    if isinstance(e, asyncio.TimeoutError):
+                        e = self._timed_out(candidate)
+                    self._failed(errors, candidate, attempt, e)
+                    if isinstance(e, ProviderOverloadedError):
+                        break
+                    continue
+
+                self.answered_by = candidate
+                try:
+                    yield first
+                    while True:
+                        try:
+                            chunk = await asyncio.wait_for(anext(chunks), self.timeout)
+                        except StopAsyncIteration:
+                            return
+                        except asyncio.TimeoutError as e:
+                            raise ProviderError(
+                                f"{candidate.name}: stream stalled for {self.timeout}s"
+                            ) from e
+                        yield chunk
+                finally:
+                    await chunks.aclose()
+        raise self._exhausted(errors)
+
+    async def aclose(self) -> None:
+        # The wrapped providers belong to the provider registry.
+        pass
@@ -0,0 +1,284 @@
+import re
+import json
+
+from typing import Any, List, Optional, Tuple
+
+# Characters that matter to the bracket scanner outside/inside a string.
+_STRUCTURAL = re.compile(r"[{}\[\]\"']")
+_STRING_SPECIAL = {'"': re.compile(r'[\\"]'), "'": re.compile(r"[\\']")}
+_BARE_WORD = re.compile(r"[^\s,:{}\[\]\"'/]+")
+_NUMBER = re.compile(r"-?(?:0|[1-9]\d*)(?:\.\d+)?(?:[eE][+-]?\d+)?")
+_LITERALS = {
+    "true": "true",
+    "false": "false",
+    "null": "null",
+    "True": "true",
+    "False": "false",
+    "None": "null",
+}
+_ESCAPES = {
+    '"': '"',
+    "\\": "\\",
+    "/": "/",
+    "'": "'",
+    "b": "\b",
+    "f": "\f",
+    "n": "\n",
+    "r": "\r",
+    "t": "\t",
+}
+
+
+def _decode_string(raw: str) -> str:
+    """
+    Decodes the body of a single- or double-quoted string, keeping unknown
+    escapes (e.g. a Windows path's `\\d`) as literal text.
+    """
+    if "\\" not in raw:
+        return raw
+    chars: List[str] = []
+    i = 0
+    while i < len(raw):
+        char = raw[i]
+        if char == "\\" and i + 1 < len(raw):
+            escaped = raw[i + 1]
+            if escaped in _ESCAPES:
+                chars.append(_ESCAPES[escaped])
+                i += 2
+                continue
+            if escaped == "u" and re.fullmatch(r"[0-9a-fA-F]{4}", raw[i + 2 : i + 6]):
+                chars.append(chr(int(raw[i + 2 : i + 6], 16)))
+                i += 6
+                continue
+        chars.append(char)
+        i += 1
+    return "".join(chars)
+
+
+def _string_end(text: str, start: int) -> Optional[int]:
+    """
+    Returns the index of the quote closing the string opened at `start`, or
+    None if the text ends inside the string.
+    """
+    special = _STRING_SPECIAL[text[start]]
+    i = start + 1
+    while True:
+        match = special.search(text, i)
+        if match is None:
+            return None
+        if match.group() == "\\":
+            i = match.end() + 1
+            continue
+        return match.start()
+
+
+def repair_json(text: str) -> str:
+    """
+    Rewrites the JSON-like `text` that an LLM produced into valid JSON:
+
+    - single-quoted strings, unquoted keys and Python literals
+      (`True`/`False`/`None`)
+    - trailing, doubled, leading and missing commas
+    - `//` and `/* */` comments, and anything after the top-level value
+    - a truncated tail: an unterminated string value is closed, a dangling
+      key or partial literal is dropped and the open brackets are closed
+    """
+    out: List[str] = []
+    closers: List[str] = []
+    # (len(out), len(closers)) after the last complete value or opener; a
+    # truncated response is cut back to it.
+    safe: Tuple[int, int] = (0, 0)
+    i, n = 0, len(text)
+    while i < n:
+        char = text[i]
+        if (
+            out
+            and out[-1] not in "{[,:"
+            and (char in "{[\"'" or _BARE_WORD.match(char))
+        ):
+            # Two values in a row: the comma between them is missing.
+            out.append(",")
+        expecting_key = bool(closers) and closers[-1] == "}" and out[-1] in "{,"
+        if char.isspace():
+            i += 1
+        elif text.startswith("//", i):
+            newline = text.find("\n", i)
+            i = n if newline < 0 else newline + 1
+        elif text.startswith("/*", i):
+            close = text.find("*/", i + 2)
+            i = n if close < 0 else close + 2
+        elif char in "{[":
+            out.append(char)
+            closers.append("}" if char == "{" else "]")
+            safe = (len(out), len(closers))
+            i += 1
+        elif char in "}]":
+            if not closers:
+                break
+            # A key without a value, then the comma before it.
+            if out[-1] == ":":
+                del out[-2:]
+            if out[-1] == ",":
+                out.pop()
+            out.append(closers.pop())
+            safe = (len(out), len(closers))
+            i += 1
+            if not closers:
+                return "".join(out)
+        elif char == ",":
+            if out and out[-1] not in "{[,:":
+                out.append(char)
+            i += 1
+        elif char == ":":
+            out.append(char)
+            i += 1
+        elif char in "\"'":
+            end = _string_end(text, i)
+            body = text[i + 1 : n if end is None else end]
+            if end is None and body.endswith("\\"):
+                body = body[:-1]
+            if end is None and expecting_key:
+                break
+            out.append(json.dumps(_decode_string(body), ensure_ascii=False))
+            if not expecting_key:
+                safe = (len(out), len(closers))
+            if end is None:
+                break
+            i = end + 1
+        else:
+            match = _BARE_WORD.match(text, i)
+            if match is None:
+                # A stray '/' that does not start a comment.
+                i += 1
+                continue
+            word = match.group()
+            i = match.end()
+            if expecting_key:
+                out.append(json.dumps(word))
+            elif word in _LITERALS:
+                out.append(_LITERALS[word])
+            elif _NUMBER.fullmatch(word):
+                out.append(word)
+            elif i == n:
+                # Most likely a literal or number cut off mid-token.
+                break
+            else:
+                out.append(json.dumps(word))
+            if not expecting_key:
+                safe = (len(out), len(closers))
+
+    length, depth = safe
+    out = out[:length]
+    closers = closers[:depth]
+    if out and out[-1] == ",":
+        out.pop()
+    return "".join(out + closers[::-1])
+
+
+class IncrementalJSONParser:
+    """
+    Finds the first JSON object in an LLM response as it is generated.
+
+    Chunks are fed with `feed`, which scans only the new text and tracks
+    strings and bracket depth, so it can tell the moment the object is
+    complete; the caller can then stop reading the stream instead of waiting
+    for (and paying for) any trailing prose. Code fences and text around the
+    object are ignored. `result` parses the object, repairing the usual LLM
+    defects (see `repair_json`) when strict parsing fails.
+    """
+
+    def __init__(self) -> None:
+        self.text = ""
+        self.start: Optional[int] = None
+        self.end: Optional[int] = None
+        self.repaired = False
+        self._depth = 0
+        self._pos = 0
+        self._quote: Optional[str] = None
+        self._escaped = False
+
+    @property
+    def complete(self) -> bool:
+        return self.end is not None
+
+    def feed(self, chunk: str) -> bool:
+        """
+        Adds the next piece of the response. Returns True once the first
+        object is complete; later chunks are ignored.
+        """
+        if self.complete:
+            return True
+        self.text += chunk
+        text, i = self.text, self._pos
+        if self.start is None:
+            i = text.find("{", i)
+            if i < 0:
+                self._pos = len(text)
+                return False
+            self.start = i
+        while i < len(text):
+            if self._quote is not None:
+                if self._escaped:
+                    self._escaped = False
+                    i += 1
+                    continue
+                match = _STRING_SPECIAL[self._quote].search(text, i)
+                if match is None:
+                    i = len(text)
+                    break
+                i = match.end()
+                if match.group() == "\\":
+                    self._escaped = True
+                else:
+                    self._quote = None
+                continue
+            match = _STRUCTURAL.search(text, i)
+            if match is None:
+                i = len(text)
+                break
+            char = match.group()
+            i = match.end()
+            if char in "\"'":
+                self._quote = char
+            elif char in "{[":
+                self._depth += 1
+            else:
+                self._depth -= 1
+                if self._depth == 0:
+                    self.end = i
+                    break
+        self._pos = i
+        return self.complete
+
+    def result(self) -> Any:
+        """
+        Returns the parsed object.
+
+        Raises:
+            ValueError: If the response contains no JSON object
+        """
+        if self.start is None:
+            raise ValueError("no JSON object found in the response")
+        candidate = self.text[self.start : self.end]
+        try:
+            return json.loads(candidate, strict=False)
+        except json.JSONDecodeError as e:
+            repaired = repair_json(candidate)
+            try:
+                value = json.loads(repaired, strict=False)
+            except json.JSONDecodeError:
+                raise e from None
+        self.repaired = True
+        return value
+
+
+def parse_json(text: str) -> Any:
+    """
+    Parses the first JSON object in `text`; see `IncrementalJSONParser`.
+
+    Raises:
+        ValueError: If no JSON object can be recovered
+    """
+    parser = IncrementalJSONParser()
+    parser.feed(text)
+    return parser.result()
@@ -1,35 +1,87 @@
-import json
 import logging
-from typing import Any, Dict
+from typing import Any, Dict, Type
+from pydantic import BaseModel
 
 from .base import Strategy
+from .json_parser import IncrementalJSONParser
 from ..providers.base import Provider
 from ..exceptions import StrategyError
+from ...core import settings
 
 
 logger = logging.getLogger(__name__)
 
 
 class JSONWrapper(Strategy):
+    def __init__(self, stream: bool = settings.LLM_STREAM_JSON) -> None:
+        self.stream = stream
+
     async def __call__(
         self, prompt: str, provider: Provider, **generation_args: Any
     ) -> Dict[str, Any]:
         """
         Wrapper strategy to format the prompt as JSON with the help of LLM.
+
+        With `stream`, the response is parsed as it is generated and the
+        stream is closed as soon as the JSON object is complete.
         """
-        response = await provider(prompt, **generation_args)
-        response = response.replace("```", "").replace("json", "").strip()
-        logger.info(f"provider response: {response}")
+        parser = IncrementalJSONParser()
+        if self.stream:
+            chunks = provider.stream(prompt, **generation_args)
+            try:
+                async for chunk in chunks:
+                    if parser.feed(chunk):
+                        break
+            finally:
+                await chunks.aclose()
+        else:
+            parser.feed(await provider(prompt, **generation_args))
+        logger.info(f"provider response: {parser.text}")
         try:
-            return json.loads(response)
-        except json.JSONDecodeError as e:
+            response = parser.result()
+        except ValueError as e:
             logger.error(
-                f"provider returned non-JSON. parsing error: {e} - response: {response}"
+                f"provider returned non-JSON. parsing error: {e} - response: {parser.text}"
             )
             raise StrategyError(f"JSON parsing error: {e}") from e
+        if parser.repaired:
+            logger.warning("provider returned malformed JSON; parsed it after repair")
+        return response
+
+
+class StructuredOutputWrapper(JSONWrapper):
+    def __init__(
+        self,
+        response_model: Type[BaseModel],
+        stream: bool = settings.LLM_STREAM_JSON,
+    ) -> None:
+        super().__init__(stream=stream)
+        self.response_model = response_model
+        self.schema = response_model.model_json_schema(by_alias=True)
+
+    async def __call__(
+        self, prompt: str, provider: Provider, **generation_args: Any
+    ) -> Dict[str, Any]:
+        """
+        JSONWrapper that also passes the JSON schema of `response_model` to
+        the provider, so providers with a native structured-output mode
+        (Ollama, OpenAI, Gemini) can only generate matching JSON. Other
+        providers rely on the prompt alone.
+        """
+        return await super().__call__(
+            prompt, provider, json_schema=self.schema, **generation_args
+        )
 
 
 class MDWrapper(Strategy):
+    @staticmethod
+    def format(response: str) -> str:
+        """
+        Post-processes a Markdown response; also applied to streamed
+        responses once they are complete.
+        """
+        return "```md\n" + response + "```" if "```md" not in response else response
+
     async def __call__(
         self, prompt: str, provider: Provider, **generation_args: Any
     ) -> Dict[str, Any]:
@@ -40,10 +92,7 @@ class MDWrapper(Strategy):
         response = await provider(prompt, **generation_args)
         logger.info(f"provider response: {response}")
         try:
-            response = (
-                "```md\n" + response + "```" if "```md" not in response else response
-            )
-            return response
+            return self.format(response)
         except Exception as e:
             logger.error(
                 f"provider returned non-md. parsing error: {e} - response: {response}"
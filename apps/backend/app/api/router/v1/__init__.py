@@ -2,10 +2,14 @@ from fastapi import APIRouter
 
 from .job import job_router
 from .resume import resume_router
+from .task import task_router
+from .provider import provider_router
 
 v1_router = APIRouter(prefix="/api/v1", tags=["v1"])
 v1_router.include_router(resume_router, prefix="/resumes")
 v1_router.include_router(job_router, prefix="/jobs")
+v1_router.include_router(task_router, prefix="/tasks")
+v1_router.include_router(provider_router, prefix="/providers")
 
 
 __all__ = ["v1_router"]
@@ -2,13 +2,22 @@ import logging
 import traceback
 
 from uuid import uuid4
+from typing import List, Literal, Optional
 from sqlalchemy.ext.asyncio import AsyncSession
 from fastapi import APIRouter, HTTPException, Depends, Request, status, Query
 from fastapi.responses import JSONResponse
 
 from app.core import get_db_session
-from app.services import JobService, JobNotFoundError
+from app.services import (
+    JobService,
+    KeywordService,
+    JobNotFoundError,
+    ResumeNotFoundError,
+    ResumeKeywordExtractionError,
+    ingestion_queue,
+)
 from app.schemas.pydantic.job import JobUploadRequest
+from .listing import listing_response
 
 job_router = APIRouter()
 logger = logging.getLogger(__name__)
@@ -22,9 +31,15 @@ async def upload_job(
     payload: JobUploadRequest,
     request: Request,
     db: AsyncSession = Depends(get_db_session),
+    background: bool = Query(
+        False,
+        description="Queue the jobs for background processing and return a task id immediately",
+    ),
 ):
     """
     Accepts a job description as a MarkDown text and stores it in the database.
+    With `background=true` the jobs are queued instead; poll `/api/v1/tasks/{task_id}`
+    for the resulting job ids.
     """
     request_id = getattr(request.state, "request_id", str(uuid4()))
 
@@ -45,9 +60,32 @@ async def upload_job(
             detail=f"Invalid Content-Type. Only {', '.join(allowed_content_types)} is/are allowed.",
         )
 
+    if background:
+        try:
+            task_id = await ingestion_queue.enqueue_job(
+                db, payload.model_dump(mode="json")
+            )
+        except AssertionError as e:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=str(e),
+            )
+        return JSONResponse(
+            status_code=status.HTTP_202_ACCEPTED,
+            content={
+                "message": "job descriptions queued for processing",
+                "task_id": task_id,
+                "status": "queued",
+                "request": {
+                    "request_id": request_id,
+                    "payload": payload.model_dump(mode="json"),
+                },
+            },
+        )
+
     try:
         job_service = JobService(db)
-        job_ids = await job_service.create_and_store_job(payload.model_dump())
+        results = await job_service.create_and_store_job(payload.model_dump())
 
     except AssertionError as e:
         raise HTTPException(
@@ -63,7 +101,8 @@ async def upload_job(
 
     return {
         "message": "data successfully processed",
-        "job_id": job_ids,
+        "job_id": [result["job_id"] for result in results],
+        "results": results,
         "request": {
             "request_id": request_id,
             "payload": payload,
@@ -71,6 +110,160 @@ async def upload_job(
     }
 
 
+@job_router.get(
+    "/list",
+    summary="List stored job descriptions, newest first",
+)
+async def list_jobs(
+    request: Request,
+    resume_id: Optional[str] = Query(None, description="Only list jobs uploaded for this resume"),
+    limit: int = Query(50, ge=1, le=500, description="Page size"),
+    cursor: Optional[str] = Query(None, description="`next_cursor` of the previous page"),
+    fields: Optional[str] = Query(
+        None,
+        description="Comma-separated columns to return; defaults to job_id, resume_id, created_at",
+    ),
+    stream: bool = Query(False, description="Stream every remaining row as NDJSON"),
+    db: AsyncSession = Depends(get_db_session),
+):
+    """
+    Returns a page of jobs and the cursor of the next page (null on the last
+    page). Pagination is keyset-based, so deep pages are as cheap as the
+    first one. With `stream=true` all rows after `cursor` are streamed as
+    newline-delimited JSON instead.
+    """
+    return await listing_response(
+        request, db, "jobs", limit, cursor, fields, stream, resume_id=resume_id
+    )
+
+
+@job_router.get(
+    "/processed",
+    summary="List processed (structured) jobs, newest first",
+)
+async def list_processed_jobs(
+    request: Request,
+    limit: int = Query(50, ge=1, le=500, description="Page size"),
+    cursor: Optional[str] = Query(None, description="`next_cursor` of the previous page"),
+    fields: Optional[str] = Query(
+        None,
+        description=(
+            "Comma-separated columns to return; defaults to job_id, job_title, location, "
+            "employment_type, date_posted, processed_at"
+        ),
+    ),
+    stream: bool = Query(False, description="Stream every remaining row as NDJSON"),
+    db: AsyncSession = Depends(get_db_session),
+):
+    """
+    Returns a page of processed jobs and the cursor of the next page. Large
+    JSON fields (responsibilities, qualifications, ...) are only returned
+    when requested through `fields`.
+    """
+    return await listing_response(request, db, "processed_jobs", limit, cursor, fields, stream)
+
+
+@job_router.get(
+    "/by-keyword",
+    summary="Find processed jobs that mention the given keywords",
+)
+async def find_jobs_by_keyword(
+    request: Request,
+    keyword: List[str] = Query(..., description="Keyword to look for; repeat for several"),
+    match: Literal["any", "all"] = Query(
+        "any", description="Return jobs listing any or all of the keywords"
+    ),
+    limit: int = Query(50, ge=1, le=1000, description="Number of jobs to return"),
+    db: AsyncSession = Depends(get_db_session),
+):
+    """
+    Looks the keywords up in the keyword index (case and punctuation
+    insensitive) and returns the matching jobs, those matching the most
+    keywords first.
+    """
+    request_id = getattr(request.state, "request_id", str(uuid4()))
+    headers = {"X-Request-ID": request_id}
+
+    try:
+        jobs = await KeywordService(db).find_jobs(keyword, match=match, limit=limit)
+        return JSONResponse(
+            content={
+                "request_id": request_id,
+                "data": jobs,
+            },
+            headers=headers,
+        )
+    except Exception as e:
+        logger.error(f"Error finding jobs by keyword: {str(e)} - traceback: {traceback.format_exc()}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Error finding jobs by keyword",
+        )
+
+
+@job_router.get(
+    "/search",
+    summary="Find the stored jobs that best match a resume",
+)
+async def search_jobs(
+    request: Request,
+    resume_id: str = Query(..., description="Resume ID to match jobs against"),
+    top_k: int = Query(10, ge=1, le=1000, description="Number of jobs to return"),
+    scoring: Literal["embedding", "jaccard", "bm25"] = Query(
+        "embedding",
+        description="Rank by embedding similarity or by keyword overlap (no embedding calls)",
+    ),
+    prefilter: Optional[int] = Query(
+        None,
+        ge=1,
+        description="Shortlist this many jobs by BM25 keyword score before embedding ranking",
+    ),
+    db: AsyncSession = Depends(get_db_session),
+):
+    """
+    Returns the `top_k` jobs whose keyword embeddings are closest to the
+    resume, ranked by cosine similarity, or with `scoring=jaccard|bm25` the
+    jobs whose extracted keywords best overlap the resume's. `prefilter`
+    shortlists jobs by keyword score before the embedding ranking.
+
+    Raises:
+        HTTPException: If the resume is not found or if there's an error searching.
+    """
+    request_id = getattr(request.state, "request_id", str(uuid4()))
+    headers = {"X-Request-ID": request_id}
+
+    try:
+        job_service = JobService(db)
+        matches = await job_service.search_jobs(
+            resume_id=resume_id, top_k=top_k, scoring=scoring, prefilter=prefilter
+        )
+        return JSONResponse(
+            content={
+                "request_id": request_id,
+                "data": matches,
+            },
+            headers=headers,
+        )
+    except ResumeNotFoundError as e:
+        logger.error(str(e))
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=str(e),
+        )
+    except ResumeKeywordExtractionError as e:
+        logger.warning(str(e))
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=str(e),
+        )
+    except Exception as e:
+        logger.error(f"Error searching jobs: {str(e)} - traceback: {traceback.format_exc()}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Error searching jobs",
+        )
+
+
 @job_router.get(
     "",
     summary="Get job data from both job and processed_job models",
@@ -0,0 +1,65 @@
+import logging
+import traceback
+
+from uuid import uuid4
+from typing import Optional
+from sqlalchemy.ext.asyncio import AsyncSession
+from fastapi import HTTPException, Request, status
+from fastapi.responses import JSONResponse, StreamingResponse
+
+from app.services import ListingService
+
+logger = logging.getLogger(__name__)
+
+
+async def listing_response(
+    request: Request,
+    db: AsyncSession,
+    name: str,
+    limit: int,
+    cursor: Optional[str],
+    fields: Optional[str],
+    stream: bool,
+    **filters,
+):
+    """
+    Serves one page of a `ListingService` listing, or every remaining row as
+    NDJSON when `stream` is set. `fields` is a comma-separated column list.
+
+    Raises:
+        HTTPException: If the cursor or fields are invalid or listing fails.
+    """
+    request_id = getattr(request.state, "request_id", str(uuid4()))
+    headers = {"X-Request-ID": request_id}
+    field_list = [f.strip() for f in fields.split(",") if f.strip()] if fields else None
+
+    try:
+        if stream:
+            lines = ListingService.stream(
+                name, cursor=cursor, fields=field_list, **filters
+            )
+            return StreamingResponse(
+                lines, media_type="application/x-ndjson", headers=headers
+            )
+        page = await ListingService(db).page(
+            name, limit=limit, cursor=cursor, fields=field_list, **filters
+        )
+        return JSONResponse(
+            content={
+                "request_id": request_id,
+                "data": page,
+            },
+            headers=headers,
+        )
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e),
+        )
+    except Exception as e:
+        logger.error(f"Error listing {name}: {str(e)} - traceback: {traceback.format_exc()}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Error listing {name}",
+        )
+
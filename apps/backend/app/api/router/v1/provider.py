@@ -0,0 +1,27 @@
+from uuid import uuid4
+from fastapi import APIRouter, Request
+from fastapi.responses import JSONResponse
+
+from app.agent import provider_limiters
+
+provider_router = APIRouter()
+
+
+@provider_router.get(
+    "/limits",
+    summary="Current load and limits of the LLM and embedding providers",
+)
+async def get_provider_limits(request: Request):
+    """
+    Returns, per provider and model, the calls in flight and queued, the
+    current adaptive concurrency limit and counters of completed, failed,
+    throttled (429/overload) and rejected calls.
+    """
+    request_id = getattr(request.state, "request_id", str(uuid4()))
+    return JSONResponse(
+        content={
+            "request_id": request_id,
+            "data": provider_limiters.stats(),
+        },
+        headers={"X-Request-ID": request_id},
+    )
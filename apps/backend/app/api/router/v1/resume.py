@@ -2,6 +2,7 @@ import logging
 import traceback
 
 from uuid import uuid4
+from typing import List, Optional
 from sqlalchemy.ext.asyncio import AsyncSession
 from fastapi.responses import JSONResponse, StreamingResponse
 from fastapi import (
@@ -19,15 +20,19 @@ from app.core import get_db_session
 from app.services import (
     ResumeService,
     ScoreImprovementService,
+    KeywordService,
+    ingestion_queue,
     ResumeNotFoundError,
     ResumeParsingError,
     ResumeValidationError,
+    DocumentConversionError,
     JobNotFoundError,
     JobParsingError,
     ResumeKeywordExtractionError,
     JobKeywordExtractionError,
 )
-from app.schemas.pydantic import ResumeImprovementRequest
+from app.schemas.pydantic import ResumeImprovementRequest, ResumeScoreRequest
+from .listing import listing_response
 
 resume_router = APIRouter()
 logger = logging.getLogger(__name__)
@@ -41,9 +46,15 @@ async def upload_resume(
     request: Request,
     file: UploadFile = File(...),
     db: AsyncSession = Depends(get_db_session),
+    background: bool = Query(
+        False,
+        description="Queue the resume for background processing and return a task id immediately",
+    ),
 ):
     """
     Accepts a PDF or DOCX file, converts it to HTML/Markdown, and stores it in the database.
+    With `background=true` the file is queued instead; poll `/api/v1/tasks/{task_id}`
+    for the resulting resume_id.
 
     Raises:
         HTTPException: If the file type is not supported or if the file is empty.
@@ -68,6 +79,24 @@ async def upload_resume(
             detail="Empty file. Please upload a valid file.",
         )
 
+    if background:
+        task_id = await ingestion_queue.enqueue_resume(
+            db,
+            file_bytes=file_bytes,
+            file_type=file.content_type,
+            filename=file.filename,
+            content_type="md",
+        )
+        return JSONResponse(
+            status_code=status.HTTP_202_ACCEPTED,
+            content={
+                "message": f"File {file.filename} queued for processing",
+                "request_id": request_id,
+                "task_id": task_id,
+                "status": "queued",
+            },
+        )
+
     try:
         resume_service = ResumeService(db)
         resume_id = await resume_service.convert_and_store_resume(
@@ -82,6 +111,12 @@ async def upload_resume(
             status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
             detail=str(e),
         )
+    except DocumentConversionError as e:
+        logger.warning(str(e))
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=str(e),
+        )
     except Exception as e:
         logger.error(
             f"Error processing file: {str(e)} - traceback: {traceback.format_exc()}"
@@ -199,6 +234,138 @@ async def score_and_improve(
         )
 
 
+@resume_router.post(
+    "/score",
+    summary="Score a resume against many jobs and rank them",
+)
+async def score_against_jobs(
+    request: Request,
+    payload: ResumeScoreRequest,
+    db: AsyncSession = Depends(get_db_session),
+):
+    """
+    Scores a resume against a list of jobs (or every job linked to it) in one
+    call and returns the jobs ranked by similarity.
+
+    Raises:
+        HTTPException: If the resume is not found.
+    """
+    request_id = getattr(request.state, "request_id", str(uuid4()))
+    headers = {"X-Request-ID": request_id}
+
+    job_ids = (
+        [str(job_id) for job_id in payload.job_ids]
+        if payload.job_ids is not None
+        else None
+    )
+
+    try:
+        score_improvement_service = ScoreImprovementService(db=db)
+        scores = await score_improvement_service.score_jobs(
+            resume_id=str(payload.resume_id),
+            job_ids=job_ids,
+            scoring=payload.scoring,
+            prefilter=payload.prefilter,
+        )
+        return JSONResponse(
+            content={
+                "request_id": request_id,
+                "data": scores,
+            },
+            headers=headers,
+        )
+    except ResumeNotFoundError as e:
+        logger.error(str(e))
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=str(e),
+        )
+    except (ResumeParsingError, ResumeKeywordExtractionError) as e:
+        logger.warning(str(e))
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=str(e),
+        )
+    except Exception as e:
+        logger.error(f"Error: {str(e)} - traceback: {traceback.format_exc()}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="sorry, something went wrong!",
+        )
+
+
+@resume_router.get(
+    "/keyword-overlap",
+    summary="Rank jobs by the number of keywords they share with a resume",
+)
+async def keyword_overlap(
+    request: Request,
+    resume_id: str = Query(..., description="Resume ID to match jobs against"),
+    job_id: Optional[List[str]] = Query(
+        None, description="Only consider these jobs; repeat for several"
+    ),
+    limit: int = Query(50, ge=1, le=1000, description="Number of jobs to return"),
+    db: AsyncSession = Depends(get_db_session),
+):
+    """
+    Counts the extracted keywords each job shares with the resume using the
+    keyword index and returns the jobs with the largest overlap first.
+
+    Raises:
+        HTTPException: If the resume is not found.
+    """
+    request_id = getattr(request.state, "request_id", str(uuid4()))
+    headers = {"X-Request-ID": request_id}
+
+    try:
+        jobs = await KeywordService(db).keyword_overlap(
+            resume_id=resume_id, job_ids=job_id, limit=limit
+        )
+        return JSONResponse(
+            content={
+                "request_id": request_id,
+                "data": jobs,
+            },
+            headers=headers,
+        )
+    except ResumeNotFoundError as e:
+        logger.error(str(e))
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=str(e),
+        )
+    except Exception as e:
+        logger.error(f"Error: {str(e)} - traceback: {traceback.format_exc()}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="sorry, something went wrong!",
+        )
+
+
+@resume_router.get(
+    "/list",
+    summary="List stored resumes, newest first",
+)
+async def list_resumes(
+    request: Request,
+    limit: int = Query(50, ge=1, le=500, description="Page size"),
+    cursor: Optional[str] = Query(None, description="`next_cursor` of the previous page"),
+    fields: Optional[str] = Query(
+        None,
+        description="Comma-separated columns to return; defaults to resume_id, content_type, created_at",
+    ),
+    stream: bool = Query(False, description="Stream every remaining row as NDJSON"),
+    db: AsyncSession = Depends(get_db_session),
+):
+    """
+    Returns a page of resumes and the cursor of the next page (null on the
+    last page). The resume text is only returned when `content` is listed in
+    `fields`. With `stream=true` all rows after `cursor` are streamed as
+    newline-delimited JSON instead.
+    """
+    return await listing_response(request, db, "resumes", limit, cursor, fields, stream)
+
+
 @resume_router.get(
     "",
     summary="Get resume data from both resume and processed_resume models",
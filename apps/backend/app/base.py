@@ -11,19 +11,40 @@ from .api import health_check, v1_router, RequestIDMiddleware
 from .core import (
     settings,
     async_engine,
+    AsyncSessionLocal,
     setup_logging,
+    upgrade_schema,
     custom_http_exception_handler,
     validation_exception_handler,
     unhandled_exception_handler,
 )
 from .models import Base
+from .agent import provider_registry, embedding_cache, llm_response_cache
+from .prompt import load_tokenizer
+from .services import (
+    KeywordService,
+    job_vector_index,
+    ingestion_queue,
+    document_converter,
+)
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     async with async_engine.begin() as conn:
         await conn.run_sync(Base.metadata.create_all)
+        await conn.run_sync(upgrade_schema)
+    async with AsyncSessionLocal() as db:
+        await KeywordService(db).backfill()
+    await embedding_cache.prune()
+    await llm_response_cache.prune()
+    await load_tokenizer()
+    await ingestion_queue.start()
     yield
+    await ingestion_queue.stop()
+    document_converter.shutdown()
+    await job_vector_index.save()
+    await provider_registry.aclose()
     await async_engine.dispose()
 
 
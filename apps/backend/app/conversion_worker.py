@@ -0,0 +1,72 @@
+"""
+Document conversion entry points for `DocumentConverter`'s worker processes.
+
+Spawned workers import this module on their own, so it must only depend on
+markitdown and the standard library: importing `app.services` or `app.core`
+here would load the whole application and create database engines in every
+worker.
+"""
+
+import io
+import logging
+
+from typing import Optional
+from markitdown import MarkItDown, StreamInfo
+
+logger = logging.getLogger(__name__)
+
+# One MarkItDown instance per worker process, created by `init_worker` so
+# its converters are loaded once and reused for every document.
+_markitdown: Optional[MarkItDown] = None
+
+
+def init_worker(memory_limit_mb: int) -> None:
+    global _markitdown
+    if memory_limit_mb > 0:
+        try:
+            import resource
+
+            limit = memory_limit_mb * 1024 * 1024
+            resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+        except (ImportError, ValueError, OSError) as e:
+            # `resource` is POSIX-only; conversion still works without a cap.
+            logger.warning(f"Could not apply conversion memory limit: {e}")
+    _markitdown = MarkItDown(enable_plugins=False)
+
+
+def _convert(
+    data: bytes,
+    mimetype: Optional[str],
+    extension: Optional[str],
+    filename: Optional[str],
+) -> str:
+    global _markitdown
+    if _markitdown is None:
+        _markitdown = MarkItDown(enable_plugins=False)
+    stream_info = StreamInfo(mimetype=mimetype, extension=extension, filename=filename)
+    return _markitdown.convert_stream(
+        io.BytesIO(data), stream_info=stream_info
+    ).text_content
+
+
+def convert(
+    data: bytes,
+    mimetype: Optional[str] = None,
+    extension: Optional[str] = None,
+    filename: Optional[str] = None,
+) -> str:
+    """
+    Returns the Markdown text of the document in `data`.
+
+    Raises:
+        MemoryError: If the worker ran out of memory
+        RuntimeError: If conversion failed; markitdown's own exceptions
+            carry tracebacks that cannot be pickled back to the parent
+            process, so only their type and message are kept
+    """
+    try:
+        return _convert(data, mimetype, extension, filename)
+    except MemoryError:
+        raise
+    except Exception as e:
+        raise RuntimeError(f"{type(e).__name__}: {e}") from None
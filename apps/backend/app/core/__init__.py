@@ -1,5 +1,12 @@
-from .database import init_models, async_engine, get_db_session, get_sync_db_session
+from .database import (
+    init_models,
+    async_engine,
+    get_db_session,
+    get_sync_db_session,
+    AsyncSessionLocal,
+)
 from .config import settings, setup_logging
+from .migrations import upgrade_schema
 from .exceptions import (
     custom_http_exception_handler,
     validation_exception_handler,
@@ -14,6 +21,8 @@ __all__ = [
     "setup_logging",
     "get_db_session",
     "get_sync_db_session",
+    "AsyncSessionLocal",
+    "upgrade_schema",
     "custom_http_exception_handler",
     "validation_exception_handler",
     "unhandled_exception_handler",
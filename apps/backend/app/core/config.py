@@ -2,7 +2,7 @@ import os
 import sys
 import logging
 from pydantic_settings import BaseSettings, SettingsConfigDict
-from typing import List, Optional, Literal
+from typing import Dict, List, Optional, Literal
 
 
 class Settings(BaseSettings):
@@ -24,6 +24,95 @@ class Settings(BaseSettings):
     EMBEDDING_API_KEY: Optional[str] = None
     EMBEDDING_BASE_URL: Optional[str] = None
     EMBEDDING_MODEL: Optional[str] = "dengcao/Qwen3-Embedding-0.6B:Q8_0"
+    # Use the providers' native asyncio clients; False falls back to running
+    # the blocking SDK calls in the threadpool, where timed-out calls cannot be
+    # cancelled and keep running on the backend outside the rate limits.
+    PROVIDER_ASYNC_CLIENTS: bool = True
+    # Embeddings are cached in-process (LRU) and, optionally, in the database,
+    # which keeps the newest EMBEDDING_CACHE_DB_SIZE rows (0: unbounded).
+    EMBEDDING_CACHE_SIZE: int = 2048
+    EMBEDDING_CACHE_PERSIST: bool = True
+    EMBEDDING_CACHE_DB_SIZE: int = 100_000
+    # Responses to deterministic (temperature 0) prompts are cached in-process
+    # and, optionally, in the database; entries expire after LLM_CACHE_TTL
+    # seconds and the table keeps the newest LLM_CACHE_DB_SIZE rows.
+    LLM_CACHE_ENABLED: bool = True
+    LLM_CACHE_SIZE: int = 256
+    LLM_CACHE_TTL: int = 7 * 24 * 60 * 60
+    LLM_CACHE_PERSIST: bool = True
+    LLM_CACHE_DB_SIZE: int = 10_000
+    # Calls to each LLM/embedding provider and model are limited to
+    # *_MAX_CONCURRENCY in flight (halved on 429/overload responses and
+    # recovered gradually) and *_RPM requests / *_TPM tokens per minute
+    # (0 = unlimited). At most LLM_MAX_QUEUE calls wait for a slot, each for
+    # up to LLM_QUEUE_TIMEOUT seconds; beyond that calls fail fast.
+    LLM_MAX_CONCURRENCY: int = 4
+    LLM_RPM: int = 0
+    LLM_TPM: int = 0
+    EMBEDDING_MAX_CONCURRENCY: int = 8
+    EMBEDDING_RPM: int = 0
+    EMBEDDING_TPM: int = 0
+    LLM_MAX_QUEUE: int = 100
+    LLM_QUEUE_TIMEOUT: float = 120.0
+    # Each LLM call attempt times out after LLM_TIMEOUT seconds and is retried
+    # LLM_RETRIES times with jittered exponential backoff (starting around
+    # LLM_RETRY_BACKOFF seconds) before the next entry of LLM_FALLBACKS is
+    # tried, e.g. [{"provider": "openai", "model": "gpt-4o-mini",
+    # "api_key": "...", "base_url": "..."}]. With LLM_HEDGE, a call to a remote
+    # provider that runs past its recent p95 latency is duplicated and the
+    # first answer wins.
+    LLM_TIMEOUT: float = 300.0
+    LLM_RETRIES: int = 2
+    LLM_RETRY_BACKOFF: float = 1.0
+    LLM_HEDGE: bool = True
+    LLM_FALLBACKS: List[Dict[str, Optional[str]]] = []
+    # JSON responses are streamed and parsed as they arrive, so reading stops
+    # at the end of the JSON object. Hedging (LLM_HEDGE) only applies to
+    # non-streamed calls; set this to False to use it for JSON extraction.
+    LLM_STREAM_JSON: bool = True
+    # Pass the expected JSON schema to providers with a native structured-output
+    # mode (Ollama `format`, OpenAI json_schema, Gemini response schema). Turn
+    # off for models or servers that do not support it.
+    LLM_STRUCTURED_OUTPUT: bool = True
+    # The context size (Ollama num_ctx) of each call is sized to its prompt
+    # plus room for the response (at least LLM_OUTPUT_TOKENS), rounded up to a
+    # power of two between LLM_NUM_CTX_MIN and LLM_NUM_CTX_MAX.
+    LLM_NUM_CTX_MIN: int = 4096
+    LLM_NUM_CTX_MAX: int = 20000
+    LLM_OUTPUT_TOKENS: int = 2048
+    # Resume improvement: "sequential" retries one LLM attempt at a time, each
+    # at a higher temperature up to IMPROVEMENT_MAX_TEMPERATURE, "parallel"
+    # generates IMPROVEMENT_CANDIDATES candidates concurrently at
+    # temperatures spread up to IMPROVEMENT_MAX_TEMPERATURE and keeps the best.
+    # With IMPROVEMENT_TARGET_SCORE set, outstanding candidates are cancelled
+    # as soon as one reaches it.
+    IMPROVEMENT_MODE: Literal["sequential", "parallel"] = "sequential"
+    IMPROVEMENT_CANDIDATES: int = 3
+    IMPROVEMENT_CONCURRENCY: int = 3
+    IMPROVEMENT_MAX_TEMPERATURE: float = 0.8
+    IMPROVEMENT_TARGET_SCORE: Optional[float] = None
+    # PDF/DOCX conversion runs in CONVERSION_WORKERS processes (0 converts in
+    # a thread instead); each document gets CONVERSION_TIMEOUT seconds and
+    # each worker CONVERSION_MEMORY_LIMIT_MB of address space (0 = no cap).
+    CONVERSION_WORKERS: int = 2
+    CONVERSION_TIMEOUT: float = 60.0
+    CONVERSION_MEMORY_LIMIT_MB: int = 2048
+    # Uploads made with `?background=true` are queued in the database and
+    # processed by INGESTION_WORKERS background workers, which also poll for
+    # queued tasks every INGESTION_POLL_INTERVAL seconds. A running task whose
+    # process stopped sending heartbeats for INGESTION_LEASE_SECONDS is
+    # requeued, and failed once it has been started INGESTION_MAX_ATTEMPTS
+    # times.
+    INGESTION_WORKERS: int = 2
+    INGESTION_POLL_INTERVAL: float = 2.0
+    INGESTION_LEASE_SECONDS: float = 60.0
+    INGESTION_MAX_ATTEMPTS: int = 3
+    # Maximum number of job descriptions extracted concurrently per upload.
+    JOB_INGEST_CONCURRENCY: int = 4
+    # Base path (without extension) of the on-disk job vector index used by
+    # /jobs/search; unset keeps the index in memory only. A relative path is
+    # taken relative to the SQLite database file (or apps/backend).
+    JOB_INDEX_PATH: Optional[str] = "job_index"
 
     model_config = SettingsConfigDict(
         env_file=os.path.join(os.path.dirname(__file__), os.pardir, os.pardir, ".env"),
@@ -15,6 +15,7 @@ from sqlalchemy.ext.asyncio import (
 
 from .config import settings
 from ..models.base import Base
+from .migrations import upgrade_schema
 
 
 class _DatabaseSettings:
@@ -130,3 +131,4 @@ async def get_db_session() -> AsyncGenerator[AsyncSession, None]:
 async def init_models(Base: Base) -> None:
     async with async_engine.begin() as conn:
         await conn.run_sync(Base.metadata.create_all)
+        await conn.run_sync(upgrade_schema)
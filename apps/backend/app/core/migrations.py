@@ -0,0 +1,197 @@
+from __future__ import annotations
+
+import json
+import logging
+
+from datetime import datetime, timezone
+from typing import Callable, List, Tuple
+from sqlalchemy import (
+    JSON,
+    Column,
+    DateTime,
+    MetaData,
+    String,
+    Table,
+    cast,
+    insert,
+    inspect,
+    or_,
+    select,
+    text,
+    update,
+)
+from sqlalchemy.engine import Connection
+from sqlalchemy.schema import DDLElement
+from sqlalchemy.ext.compiler import compiles
+
+from ..models.base import Base
+
+logger = logging.getLogger(__name__)
+
+# Records the one-time data migrations already applied to this database. It
+# is bookkeeping for this module, not a model, so it has its own metadata.
+_applied_migrations = Table(
+    "schema_migrations",
+    MetaData(),
+    Column("name", String, primary_key=True),
+    Column("applied_at", DateTime(timezone=True), nullable=False),
+)
+
+
+class _AddColumn(DDLElement):
+    def __init__(self, table, column):
+        self.table = table
+        self.column = column
+
+
+@compiles(_AddColumn)
+def _compile_add_column(element: _AddColumn, compiler, **kw) -> str:
+    return "ALTER TABLE %s ADD COLUMN %s" % (
+        compiler.preparer.format_table(element.table),
+        compiler.get_column_specification(element.column),
+    )
+
+
+def upgrade_schema(conn: Connection) -> None:
+    """
+    Brings tables created by an older version up to date with the models.
+
+    `create_all` only creates missing tables, so columns and indexes added to
+    existing models later are added here. Only additive changes are handled:
+    new columns must be nullable or have a server default. Data migrations
+    that have not been applied to this database yet then run once each (see
+    `_DATA_MIGRATIONS`).
+    Run it right after `Base.metadata.create_all`.
+    """
+    inspector = inspect(conn)
+    for table in Base.metadata.sorted_tables:
+        if not inspector.has_table(table.name):
+            continue
+
+        existing_columns = {column["name"] for column in inspector.get_columns(table.name)}
+        for column in table.columns:
+            if column.name in existing_columns:
+                continue
+            if not column.nullable and column.server_default is None:
+                logger.warning(
+                    f"Cannot add non-nullable column {table.name}.{column.name} without a server default"
+                )
+                continue
+            logger.info(f"Adding column {table.name}.{column.name}")
+            conn.execute(_AddColumn(table, column))
+
+        existing_indexes = {index["name"] for index in inspector.get_indexes(table.name)}
+        for index in table.indexes:
+            if index.name not in existing_indexes:
+                logger.info(f"Creating index {index.name}")
+                index.create(conn)
+
+        _convert_text_to_json(conn, inspector, table)
+
+    _run_data_migrations(conn)
+
+
+def _run_data_migrations(conn: Connection) -> None:
+    """
+    Applies each entry of `_DATA_MIGRATIONS` not yet recorded in the
+    `schema_migrations` table, in order, and records it. Migrations run in
+    the caller's transaction, so a failed one is retried on the next start.
+    """
+    _applied_migrations.create(conn, checkfirst=True)
+    applied = set(conn.execute(select(_applied_migrations.c.name)).scalars())
+    for name, migration in _DATA_MIGRATIONS:
+        if name in applied:
+            continue
+        logger.info(f"Applying data migration {name}")
+        migration(conn)
+        conn.execute(
+            insert(_applied_migrations).values(
+                name=name, applied_at=datetime.now(timezone.utc)
+            )
+        )
+
+
+def _convert_text_to_json(conn: Connection, inspector, table) -> None:
+    """
+    Columns that used to be text holding a JSON document are now JSON
+    columns. SQLite stores both as text, so only PostgreSQL needs the column
+    type changed.
+    """
+    if conn.dialect.name != "postgresql":
+        return
+    reflected = {column["name"]: column["type"] for column in inspector.get_columns(table.name)}
+    preparer = conn.dialect.identifier_preparer
+    for column in table.columns:
+        if not isinstance(column.type, JSON) or column.name not in reflected:
+            continue
+        if isinstance(reflected[column.name], JSON):
+            continue
+        logger.info(f"Converting {table.name}.{column.name} to JSON")
+        name = preparer.quote(column.name)
+        conn.execute(
+            text(
+                f"ALTER TABLE {preparer.format_table(table)} "
+                f"ALTER COLUMN {name} TYPE JSON USING {name}::json"
+            )
+        )
+
+
+# Tables whose JSON columns older versions filled with encoded strings.
+_LEGACY_JSON_TABLES = ("processed_resumes", "processed_jobs")
+
+
+def _unwrap_legacy_json(conn: Connection) -> None:
+    """
+    Older versions stored `json.dumps(...)` strings in the JSON columns of
+    the processed resume and job tables, often wrapped in a single-key object
+    named after the column (`skills` held the string '{"skills": [...]}').
+    Such values are decoded and unwrapped so the columns hold the plain
+    structure.
+
+    Encoded values are JSON strings, whose serialized form starts with a
+    quote; only those rows are read.
+    """
+    for name in _LEGACY_JSON_TABLES:
+        table = Base.metadata.tables.get(name)
+        if table is not None:
+            _unwrap_legacy_json_table(conn, table)
+
+
+def _unwrap_legacy_json_table(conn: Connection, table: Table) -> None:
+    json_columns = [column for column in table.columns if isinstance(column.type, JSON)]
+    if not json_columns:
+        return
+    primary_key = list(table.primary_key.columns)
+    rows = conn.execute(
+        select(*primary_key, *json_columns).where(
+            or_(*(cast(column, String).like('"%') for column in json_columns))
+        )
+    ).all()
+    for row in rows:
+        values = {}
+        for column in json_columns:
+            value = row._mapping[column]
+            if not isinstance(value, str):
+                continue
+            try:
+                value = json.loads(value)
+            except ValueError:
+                continue
+            if isinstance(value, dict) and list(value) == [column.name]:
+                value = value[column.name]
+            values[column.name] = value
+        if values:
+            conn.execute(
+                update(table)
+                .where(*(column == row._mapping[column] for column in primary_key))
+                .values(**values)
+            )
+    if rows:
+        logger.info(f"Unwrapped legacy JSON in {len(rows)} {table.name} rows")
+
+
+# One-time data migrations, applied in order and recorded by name in
+# `schema_migrations`. Append new entries; never rename or reorder them.
+_DATA_MIGRATIONS: List[Tuple[str, Callable[[Connection], None]]] = [
+    ("0001_unwrap_legacy_json", _unwrap_legacy_json),
+]
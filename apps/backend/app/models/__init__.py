@@ -3,6 +3,10 @@ from .resume import ProcessedResume, Resume
 from .user import User
 from .job import ProcessedJob, Job
 from .association import job_resume_association
+from .cache import EmbeddingCacheEntry, LLMResponseCacheEntry
+from .embedding import ResumeEmbedding, JobEmbedding
+from .task import IngestionTask
+from .keyword import Keyword, job_keyword_association, resume_keyword_association
 
 __all__ = [
     "Base",
@@ -12,4 +16,12 @@ __all__ = [
     "User",
     "Job",
     "job_resume_association",
+    "EmbeddingCacheEntry",
+    "LLMResponseCacheEntry",
+    "ResumeEmbedding",
+    "JobEmbedding",
+    "IngestionTask",
+    "Keyword",
+    "job_keyword_association",
+    "resume_keyword_association",
 ]
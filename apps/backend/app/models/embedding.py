@@ -0,0 +1,63 @@
+from sqlalchemy import Column, String, Integer, LargeBinary, ForeignKey, DateTime, Index, text
+
+from .base import Base
+
+
+class ResumeEmbedding(Base):
+    __tablename__ = "resume_embeddings"
+
+    resume_id = Column(
+        String,
+        ForeignKey("resumes.resume_id", ondelete="CASCADE"),
+        primary_key=True,
+        index=True,
+    )
+    provider = Column(String, nullable=False)
+    model = Column(String, nullable=False)
+    dimension = Column(Integer, nullable=False)
+    # float32, little-endian
+    vector = Column(LargeBinary, nullable=False)
+    created_at = Column(
+        DateTime(timezone=True),
+        server_default=text("CURRENT_TIMESTAMP"),
+        nullable=False,
+    )
+
+
+class JobEmbedding(Base):
+    """
+    Embedding of the job's extracted keywords, which is what resumes are
+    scored against.
+    """
+
+    __tablename__ = "job_embeddings"
+    # Covers the per-model row count and latest update the vector index
+    # checks for freshness on every search.
+    __table_args__ = (
+        Index(
+            "ix_job_embeddings_provider_model_updated_at",
+            "provider",
+            "model",
+            "updated_at",
+        ),
+    )
+
+    job_id = Column(
+        String,
+        ForeignKey("processed_jobs.job_id", ondelete="CASCADE"),
+        primary_key=True,
+        index=True,
+    )
+    provider = Column(String, nullable=False)
+    model = Column(String, nullable=False)
+    dimension = Column(Integer, nullable=False)
+    # float32, little-endian
+    vector = Column(LargeBinary, nullable=False)
+    created_at = Column(
+        DateTime(timezone=True),
+        server_default=text("CURRENT_TIMESTAMP"),
+        nullable=False,
+    )
+    # Set on every write, so a process's job vector index can tell when
+    # another process added or recomputed vectors. NULL on older rows.
+    updated_at = Column(DateTime(timezone=True), nullable=True, index=True)
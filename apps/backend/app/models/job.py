@@ -1,6 +1,6 @@
 from sqlalchemy.types import JSON
 from sqlalchemy.orm import relationship
-from sqlalchemy import Column, String, Text, Integer, ForeignKey, DateTime, text
+from sqlalchemy import Column, String, Text, Integer, ForeignKey, DateTime, Index, text
 
 from .base import Base
 from .association import job_resume_association
@@ -8,6 +8,10 @@ from .association import job_resume_association
 
 class ProcessedJob(Base):
     __tablename__ = "processed_jobs"
+    # keyset pagination order for listings
+    __table_args__ = (
+        Index("ix_processed_jobs_processed_at_job_id", "processed_at", "job_id"),
+    )
 
     job_id = Column(
         String,
@@ -16,8 +20,8 @@ class ProcessedJob(Base):
         index=True,
     )
     job_title = Column(String, nullable=False)
-    company_profile = Column(Text, nullable=True)
-    location = Column(String, nullable=True)
+    company_profile = Column(JSON, nullable=True)
+    location = Column(JSON, nullable=True)
     date_posted = Column(String, nullable=True)
     employment_type = Column(String, nullable=True)
     job_summary = Column(Text, nullable=False)
@@ -48,11 +52,15 @@ class ProcessedJob(Base):
 
 class Job(Base):
     __tablename__ = "jobs"
+    # keyset pagination order for listings
+    __table_args__ = (Index("ix_jobs_created_at_id", "created_at", "id"),)
 
     id = Column(Integer, primary_key=True, index=True)
     job_id = Column(String, unique=True, nullable=False)
     resume_id = Column(String, ForeignKey("resumes.resume_id"), nullable=False)
     content = Column(Text, nullable=False)
+    # sha256 of the normalized job description, used to recognise re-uploads
+    content_hash = Column(String(64), nullable=True, index=True)
     created_at = Column(
         DateTime(timezone=True),
         server_default=text("CURRENT_TIMESTAMP"),
@@ -0,0 +1,54 @@
+from sqlalchemy import Column, String, Integer, ForeignKey, Index, Table
+
+from .base import Base
+
+
+class Keyword(Base):
+    """
+    One normalized extracted keyword (see `normalize_keyword`), shared by
+    every resume and job that lists it.
+    """
+
+    __tablename__ = "keywords"
+
+    id = Column(Integer, primary_key=True)
+    keyword = Column(String, unique=True, nullable=False)
+
+
+# keyword -> job lookups go through the (keyword_id, job_id) index; the
+# primary key covers job -> keywords.
+job_keyword_association = Table(
+    "job_keywords",
+    Base.metadata,
+    Column(
+        "job_id",
+        String,
+        ForeignKey("processed_jobs.job_id", ondelete="CASCADE"),
+        primary_key=True,
+    ),
+    Column(
+        "keyword_id",
+        Integer,
+        ForeignKey("keywords.id", ondelete="CASCADE"),
+        primary_key=True,
+    ),
+    Index("ix_job_keywords_keyword_id_job_id", "keyword_id", "job_id"),
+)
+
+resume_keyword_association = Table(
+    "resume_keywords",
+    Base.metadata,
+    Column(
+        "resume_id",
+        String,
+        ForeignKey("processed_resumes.resume_id", ondelete="CASCADE"),
+        primary_key=True,
+    ),
+    Column(
+        "keyword_id",
+        Integer,
+        ForeignKey("keywords.id", ondelete="CASCADE"),
+        primary_key=True,
+    ),
+    Index("ix_resume_keywords_keyword_id_resume_id", "keyword_id", "resume_id"),
+)
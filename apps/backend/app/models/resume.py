@@ -1,6 +1,6 @@
 from sqlalchemy.types import JSON
 from sqlalchemy.orm import relationship
-from sqlalchemy import Column, String, Integer, ForeignKey, Text, DateTime, text
+from sqlalchemy import Column, String, Integer, ForeignKey, Text, DateTime, Index, text
 
 from .base import Base
 from .association import job_resume_association
@@ -43,11 +43,17 @@ class ProcessedResume(Base):
 
 class Resume(Base):
     __tablename__ = "resumes"
+    # keyset pagination order for listings
+    __table_args__ = (Index("ix_resumes_created_at_id", "created_at", "id"),)
 
     id = Column(Integer, primary_key=True, index=True)
     resume_id = Column(String, unique=True, nullable=False)
     content = Column(Text, nullable=False)
     content_type = Column(String, nullable=False)
+    # sha256 of the uploaded file and of the normalized converted text, used
+    # to recognise re-uploads
+    file_hash = Column(String(64), nullable=True, index=True)
+    content_hash = Column(String(64), nullable=True, index=True)
     created_at = Column(
         DateTime(timezone=True),
         server_default=text("CURRENT_TIMESTAMP"),
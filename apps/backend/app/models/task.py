@@ -0,0 +1,37 @@
+from sqlalchemy.types import JSON
+from sqlalchemy import Column, String, Text, Integer, LargeBinary, DateTime, text
+
+from .base import Base
+
+
+class IngestionTask(Base):
+    """
+    A resume or job upload queued for background processing.
+    """
+
+    __tablename__ = "ingestion_tasks"
+
+    task_id = Column(String, primary_key=True, index=True)
+    # "resume" or "job"
+    kind = Column(String, nullable=False)
+    # queued -> running -> completed | failed
+    status = Column(String, nullable=False, default="queued", index=True)
+    # request parameters; for resumes the uploaded file is kept in `file_bytes`
+    # until the task finishes
+    payload = Column(JSON, nullable=False)
+    file_bytes = Column(LargeBinary, nullable=True)
+    result = Column(JSON, nullable=True)
+    error = Column(Text, nullable=True)
+    attempts = Column(Integer, nullable=False, default=0)
+    # The queue instance running the task and when it last reported progress;
+    # a running task whose heartbeat is older than the lease is requeued.
+    owner = Column(String, nullable=True)
+    heartbeat_at = Column(DateTime(timezone=True), nullable=True)
+    created_at = Column(
+        DateTime(timezone=True),
+        server_default=text("CURRENT_TIMESTAMP"),
+        nullable=False,
+        index=True,
+    )
+    started_at = Column(DateTime(timezone=True), nullable=True)
+    finished_at = Column(DateTime(timezone=True), nullable=True)
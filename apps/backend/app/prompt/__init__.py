@@ -1,4 +1,21 @@
 from .base import PromptFactory
+from .builder import (
+    BuiltPrompt,
+    PromptBuilder,
+    compact_text,
+    count_tokens,
+    dedupe_keywords,
+    load_tokenizer,
+)
 
 prompt_factory = PromptFactory()
-__all__ = ["prompt_factory"]
+prompt_builder = PromptBuilder(prompt_factory)
+__all__ = [
+    "prompt_factory",
+    "prompt_builder",
+    "BuiltPrompt",
+    "compact_text",
+    "count_tokens",
+    "dedupe_keywords",
+    "load_tokenizer",
+]
@@ -12,7 +12,7 @@ class PromptFactory:
 
     def _discover(self) -> None:
         for finder, module_name, ispkg in pkgutil.iter_modules(prompt_pkg_path):
-            if module_name.startswith("_") or module_name == "base":
+            if module_name.startswith("_") or module_name in ("base", "builder"):
                 continue
 
             module = importlib.import_module(f"app.prompt.{module_name}")
@@ -0,0 +1,171 @@
+import re
+import json
+import logging
+
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Any, Callable, Iterable, List, Mapping, Optional
+from fastapi.concurrency import run_in_threadpool
+
+from app.core import settings
+from .base import PromptFactory
+
+logger = logging.getLogger(__name__)
+
+# Paragraphs at least this long that occur twice verbatim are conversion
+# artifacts (repeated page headers/footers, a posting pasted twice), not
+# content; shorter ones may legitimately repeat (e.g. a job title).
+_MIN_DUPLICATE_PARAGRAPH = 80
+_TOKENIZER = "o200k_base"
+_INLINE_SPACE = re.compile(r"(?<=\S)[ \t\u00a0]{2,}")
+_BLANK_LINES = re.compile(r"\n{3,}")
+# Set by `load_tokenizer`; token counts are estimated until then.
+_encode: Optional[Callable[[str], List[int]]] = None
+
+
+@dataclass(frozen=True)
+class BuiltPrompt:
+    """
+    A rendered prompt with its token count and the context size (Ollama
+    `num_ctx`) to request for it.
+    """
+
+    text: str
+    tokens: int
+    num_ctx: int
+
+
+def minify_json(value: Any) -> str:
+    """
+    Serializes a schema without the indentation, which is about a third of
+    the tokens of `json.dumps(schema, indent=2)` and carries no meaning.
+    """
+    return json.dumps(value, separators=(",", ":"), ensure_ascii=False)
+
+
+@lru_cache(maxsize=64)
+def compact_text(text: str) -> str:
+    """
+    Normalizes whitespace (keeping line structure and indentation), collapses
+    blank-line runs and drops consecutive duplicate lines and repeated long
+    paragraphs.
+    """
+    text = text.replace("\r\n", "\n").replace("\r", "\n")
+    lines: List[str] = []
+    for line in text.split("\n"):
+        line = _INLINE_SPACE.sub(" ", line.rstrip())
+        if line and lines and line == lines[-1]:
+            continue
+        lines.append(line)
+
+    seen = set()
+    paragraphs = []
+    for paragraph in _BLANK_LINES.sub("\n\n", "\n".join(lines)).split("\n\n"):
+        key = " ".join(paragraph.split())
+        if len(key) >= _MIN_DUPLICATE_PARAGRAPH:
+            if key in seen:
+                continue
+            seen.add(key)
+        paragraphs.append(paragraph)
+    return "\n\n".join(paragraphs).strip()
+
+
+def dedupe_keywords(keywords: str | Iterable[str]) -> str:
+    """
+    Returns the keywords (a list or a comma-separated string) without
+    case-insensitive duplicates, comma-separated, in their original order.
+    """
+    if isinstance(keywords, str):
+        keywords = keywords.split(",")
+    unique = {}
+    for keyword in keywords:
+        keyword = " ".join(str(keyword).split())
+        if keyword:
+            unique.setdefault(keyword.casefold(), keyword)
+    return ", ".join(unique.values())
+
+
+def _load_encoder() -> Optional[Callable[[str], List[int]]]:
+    try:
+        import tiktoken
+
+        return tiktoken.get_encoding(_TOKENIZER).encode
+    except Exception as e:
+        logger.info(f"tiktoken unavailable ({e}); estimating prompt tokens")
+        return None
+
+
+async def load_tokenizer() -> None:
+    """
+    Loads the tiktoken vocabulary, if tiktoken is installed. tiktoken
+    downloads it on first use, so this runs in a worker thread at startup
+    rather than on the event loop inside the first prompt build.
+    """
+    global _encode
+    if _encode is None:
+        _encode = await run_in_threadpool(_load_encoder)
+
+
+def count_tokens(text: str) -> int:
+    """
+    Counts tokens with tiktoken once `load_tokenizer` has loaded it. Local
+    models use other vocabularies, so this is an approximation either way;
+    without tiktoken the estimate leans high (three characters per token),
+    which only ever costs a larger context bucket.
+    """
+    if _encode is None:
+        return len(text) // 3 + 1
+    return len(_encode(text))
+
+
+def context_size(prompt_tokens: int, output_tokens: Optional[int] = None) -> int:
+    """
+    Picks the context size for a prompt: room for the prompt and the
+    response (by default as long as the prompt, and at least
+    LLM_OUTPUT_TOKENS), rounded up to a power-of-two bucket between
+    LLM_NUM_CTX_MIN and LLM_NUM_CTX_MAX. Bucketing keeps the number of
+    distinct sizes, and so of model reloads and cached clients, small.
+    """
+    if output_tokens is None:
+        output_tokens = max(settings.LLM_OUTPUT_TOKENS, prompt_tokens)
+    needed = prompt_tokens + output_tokens
+    size = max(1, settings.LLM_NUM_CTX_MIN)
+    while size < needed and size < settings.LLM_NUM_CTX_MAX:
+        size *= 2
+    return min(size, settings.LLM_NUM_CTX_MAX)
+
+
+class PromptBuilder:
+    """
+    Renders `prompt_factory` templates with compacted inputs: mappings and
+    lists (schemas) are minified JSON, strings go through `compact_text`.
+    Everything else is formatted as is.
+    """
+
+    def __init__(self, factory: PromptFactory) -> None:
+        self.factory = factory
+
+    @staticmethod
+    def _compact(value: Any) -> Any:
+        if isinstance(value, str):
+            return compact_text(value)
+        if isinstance(value, (Mapping, list, tuple)):
+            return minify_json(value)
+        return value
+
+    def build(
+        self,
+        name: str,
+        *args: Any,
+        output_tokens: Optional[int] = None,
+        **kwargs: Any,
+    ) -> BuiltPrompt:
+        template = self.factory.get(name)
+        text = template.format(
+            *(self._compact(arg) for arg in args),
+            **{key: self._compact(value) for key, value in kwargs.items()},
+        ).strip()
+        tokens = count_tokens(text)
+        num_ctx = context_size(tokens, output_tokens)
+        logger.debug(f"Prompt '{name}': {tokens} tokens, num_ctx {num_ctx}")
+        return BuiltPrompt(text=text, tokens=tokens, num_ctx=num_ctx)
@@ -2,7 +2,7 @@ from .job import JobUploadRequest
 from .structured_job import StructuredJobModel
 from .resume_preview import ResumePreviewerModel
 from .structured_resume import StructuredResumeModel
-from .resume_improvement import ResumeImprovementRequest
+from .resume_improvement import ResumeImprovementRequest, ResumeScoreRequest
 
 __all__ = [
     "JobUploadRequest",
@@ -10,4 +10,5 @@ __all__ = [
     "StructuredResumeModel",
     "StructuredJobModel",
     "ResumeImprovementRequest",
+    "ResumeScoreRequest",
 ]
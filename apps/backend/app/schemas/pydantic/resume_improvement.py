@@ -1,7 +1,25 @@
 from uuid import UUID
+from typing import List, Literal, Optional
 from pydantic import BaseModel, Field
 
 
 class ResumeImprovementRequest(BaseModel):
     job_id: UUID = Field(..., description="DB UUID reference to the job")
     resume_id: UUID = Field(..., description="DB UUID reference to the resume")
+
+
+class ResumeScoreRequest(BaseModel):
+    resume_id: UUID = Field(..., description="DB UUID reference to the resume")
+    job_ids: Optional[List[UUID]] = Field(
+        None,
+        description="Jobs to score; defaults to every job linked to the resume",
+    )
+    scoring: Literal["embedding", "jaccard", "bm25"] = Field(
+        "embedding",
+        description="Rank by embedding similarity or by keyword overlap (no embedding calls)",
+    )
+    prefilter: Optional[int] = Field(
+        None,
+        ge=1,
+        description="Shortlist this many jobs by BM25 keyword score before embedding ranking",
+    )
@@ -1,5 +1,12 @@
 from .job_service import JobService
+from .embedding_service import EmbeddingService
 from .resume_service import ResumeService
+from .listing_service import ListingService
+from .conversion import DocumentConverter, document_converter
+from .vector_index import JobVectorIndex, job_vector_index
+from .keyword_index import JobKeywordIndex, job_keyword_index
+from .keyword_service import KeywordService
+from .ingestion_queue import IngestionQueue, ingestion_queue
 from .score_improvement_service import ScoreImprovementService
 from .exceptions import (
     ResumeNotFoundError,
@@ -9,11 +16,24 @@ from .exceptions import (
     JobParsingError,
     ResumeKeywordExtractionError,
     JobKeywordExtractionError,
+    TaskNotFoundError,
+    DocumentConversionError,
 )
 
 __all__ = [
     "JobService",
+    "EmbeddingService",
     "ResumeService",
+    "ListingService",
+    "JobVectorIndex",
+    "job_vector_index",
+    "JobKeywordIndex",
+    "job_keyword_index",
+    "KeywordService",
+    "DocumentConverter",
+    "document_converter",
+    "IngestionQueue",
+    "ingestion_queue",
     "JobParsingError",
     "JobNotFoundError",
     "ResumeParsingError",
@@ -21,5 +41,7 @@ __all__ = [
     "ResumeValidationError",
     "ResumeKeywordExtractionError",
     "JobKeywordExtractionError",
+    "TaskNotFoundError",
+    "DocumentConversionError",
     "ScoreImprovementService",
 ]
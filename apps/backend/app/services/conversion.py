@@ -0,0 +1,132 @@
+import asyncio
+import logging
+import multiprocessing
+
+from typing import Optional
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from fastapi.concurrency import run_in_threadpool
+
+from app.core import settings
+from app.conversion_worker import convert as _convert, init_worker
+from .exceptions import DocumentConversionError
+
+logger = logging.getLogger(__name__)
+
+
+class DocumentConverter:
+    """
+    Converts uploaded documents to Markdown off the event loop.
+
+    Documents are converted from memory through MarkItDown's stream API,
+    using the upload's MIME type and extension as hints.
+
+    PDF/DOCX parsing is CPU-bound, so documents are converted in a
+    `ProcessPoolExecutor` whose workers each keep a warm `MarkItDown`
+    instance and run under an address-space cap. A conversion that exceeds
+    `timeout` has its pool torn down (killing the stuck worker) and a new
+    pool is started for the next document. With `workers` set to 0 the
+    conversion runs in the threadpool instead, without the memory cap.
+
+    The workers only import `app.conversion_worker`, which depends on
+    markitdown alone.
+    """
+
+    def __init__(
+        self,
+        workers: int = settings.CONVERSION_WORKERS,
+        timeout: float = settings.CONVERSION_TIMEOUT,
+        memory_limit_mb: int = settings.CONVERSION_MEMORY_LIMIT_MB,
+    ) -> None:
+        self.workers = workers
+        self.timeout = timeout
+        self.memory_limit_mb = memory_limit_mb
+        self._pool: Optional[ProcessPoolExecutor] = None
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        if self._pool is None:
+            # "spawn" avoids forking a process that is running the event
+            # loop and its threads.
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=init_worker,
+                initargs=(self.memory_limit_mb,),
+            )
+        return self._pool
+
+    def _discard_pool(self) -> None:
+        pool, self._pool = self._pool, None
+        if pool is None:
+            return
+        # shutdown() alone would wait for the stuck conversion to finish.
+        processes = list((pool._processes or {}).values())
+        pool.shutdown(wait=False, cancel_futures=True)
+        for process in processes:
+            if process.is_alive():
+                process.kill()
+
+    async def convert(
+        self,
+        data: bytes,
+        mimetype: Optional[str] = None,
+        extension: Optional[str] = None,
+        filename: Optional[str] = None,
+    ) -> str:
+        """
+        Returns the Markdown text of the document in `data`.
+
+        Raises:
+            DocumentConversionError: If conversion fails, times out or the
+                worker runs out of memory
+        """
+        if self.workers <= 0:
+            try:
+                return await asyncio.wait_for(
+                    run_in_threadpool(_convert, data, mimetype, extension, filename),
+                    self.timeout,
+                )
+            except asyncio.TimeoutError as e:
+                raise DocumentConversionError(
+                    message=f"Document conversion timed out after {self.timeout}s"
+                ) from e
+            except Exception as e:
+                raise DocumentConversionError(message=f"Document conversion failed: {e}") from e
+
+        loop = asyncio.get_running_loop()
+        try:
+            return await asyncio.wait_for(
+                loop.run_in_executor(
+                    self._get_pool(), _convert, data, mimetype, extension, filename
+                ),
+                self.timeout,
+            )
+        except asyncio.TimeoutError as e:
+            logger.warning(f"Document conversion timed out after {self.timeout}s, restarting pool")
+            self._discard_pool()
+            raise DocumentConversionError(
+                message=f"Document conversion timed out after {self.timeout}s"
+            ) from e
+        except BrokenProcessPool as e:
+            logger.warning("Document conversion worker died, restarting pool")
+            self._discard_pool()
+            raise DocumentConversionError(
+                message="Document conversion failed: the document could not be processed"
+            ) from e
+        except MemoryError as e:
+            raise DocumentConversionError(
+                message=f"Document conversion exceeded the {self.memory_limit_mb} MB memory limit"
+            ) from e
+        except Exception as e:
+            raise DocumentConversionError(message=f"Document conversion failed: {e}") from e
+
+    def shutdown(self) -> None:
+        """
+        Stops the worker processes.
+        """
+        pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=True, cancel_futures=True)
+
+
+document_converter = DocumentConverter()
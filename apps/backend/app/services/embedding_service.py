@@ -0,0 +1,131 @@
+import logging
+import numpy as np
+
+from datetime import datetime, timezone
+from typing import Dict
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.agent import EmbeddingManager
+from app.agent.cache import embedding_to_bytes, embedding_from_bytes
+from app.models import ResumeEmbedding, JobEmbedding
+from .vector_index import job_vector_index
+
+logger = logging.getLogger(__name__)
+
+
+class EmbeddingService:
+    """
+    Persists resume and job-keyword embeddings at ingest time so scoring can
+    read them back instead of calling the embedding provider. Stored vectors
+    are only reused while they match the configured embedding provider and
+    model; otherwise they are recomputed and overwritten.
+
+    The `store_*` methods leave committing to the caller. The `get_*` methods
+    commit vectors they had to recompute straight away, so the session does
+    not hold a write transaction while other sessions (e.g. the embedding
+    cache) write.
+    """
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+        self.embedding_manager = EmbeddingManager()
+
+    def _is_current(self, row: ResumeEmbedding | JobEmbedding) -> bool:
+        return (
+            row.provider == self.embedding_manager.model_provider
+            and row.model == self.embedding_manager.model
+        )
+
+    async def store_resume_embedding(
+        self, resume_id: str, resume_text: str
+    ) -> np.ndarray:
+        """
+        Embeds the resume text and stores the vector for the resume.
+        """
+        embedding = await self.embedding_manager.embed(resume_text)
+        await self.db.merge(
+            ResumeEmbedding(
+                resume_id=resume_id,
+                provider=self.embedding_manager.model_provider,
+                model=self.embedding_manager.model,
+                dimension=embedding.shape[0],
+                vector=embedding_to_bytes(embedding),
+            )
+        )
+        return embedding
+
+    async def store_job_embeddings(
+        self, job_keywords: Dict[str, str]
+    ) -> Dict[str, np.ndarray]:
+        """
+        Embeds the keyword text of every job in one batch and stores the vectors.
+
+        Args:
+            job_keywords: mapping of job_id to its joined extracted keywords
+        """
+        if not job_keywords:
+            return {}
+        job_ids = list(job_keywords)
+        matrix = await self.embedding_manager.embed_many(
+            [job_keywords[job_id] for job_id in job_ids]
+        )
+        updated_at = datetime.now(timezone.utc)
+        for job_id, embedding in zip(job_ids, matrix):
+            await self.db.merge(
+                JobEmbedding(
+                    job_id=job_id,
+                    provider=self.embedding_manager.model_provider,
+                    model=self.embedding_manager.model,
+                    dimension=embedding.shape[0],
+                    vector=embedding_to_bytes(embedding),
+                    updated_at=updated_at,
+                )
+            )
+        return dict(zip(job_ids, matrix))
+
+    async def get_resume_embedding(
+        self, resume_id: str, resume_text: str
+    ) -> np.ndarray:
+        """
+        Returns the stored resume embedding, computing it if missing or stale.
+        """
+        row = await self.db.get(ResumeEmbedding, resume_id)
+        if row is not None and self._is_current(row):
+            return embedding_from_bytes(row.vector)
+        embedding = await self.store_resume_embedding(resume_id, resume_text)
+        await self.db.commit()
+        return embedding
+
+    async def get_job_embeddings(
+        self, job_keywords: Dict[str, str]
+    ) -> Dict[str, np.ndarray]:
+        """
+        Returns stored job-keyword embeddings, computing any that are missing
+        or stale in a single batch.
+        """
+        if not job_keywords:
+            return {}
+        rows = await self.db.scalars(
+            select(JobEmbedding).where(JobEmbedding.job_id.in_(list(job_keywords)))
+        )
+        embeddings = {
+            row.job_id: embedding_from_bytes(row.vector)
+            for row in rows
+            if self._is_current(row)
+        }
+        missing = {
+            job_id: text
+            for job_id, text in job_keywords.items()
+            if job_id not in embeddings
+        }
+        if missing:
+            logger.info(f"Computing {len(missing)} job embeddings not found in store")
+            computed = await self.store_job_embeddings(missing)
+            await self.db.commit()
+            embeddings.update(computed)
+            if job_vector_index.is_current(
+                self.embedding_manager.model_provider, self.embedding_manager.model
+            ):
+                job_vector_index.add(computed)
+        return embeddings
@@ -108,3 +108,26 @@ class JobKeywordExtractionError(Exception):
             message = "Job keyword extraction failed. Cannot improve resume without job requirements."
         super().__init__(message)
         self.job_id = job_id
+
+
+class TaskNotFoundError(Exception):
+    """
+    Exception raised when an ingestion task is not found in the database.
+    """
+
+    def __init__(self, task_id: Optional[str] = None, message: Optional[str] = None):
+        if task_id and not message:
+            message = f"Ingestion task with ID {task_id} not found."
+        elif not message:
+            message = "Ingestion task not found."
+        super().__init__(message)
+        self.task_id = task_id
+
+
+class DocumentConversionError(Exception):
+    """
+    Exception raised when an uploaded document cannot be converted to text.
+    """
+
+    def __init__(self, message: Optional[str] = None):
+        super().__init__(message or "Document conversion failed.")
@@ -0,0 +1,18 @@
+import hashlib
+import unicodedata
+
+
+def hash_bytes(data: bytes) -> str:
+    """
+    sha256 hex digest of raw uploaded bytes.
+    """
+    return hashlib.sha256(data).hexdigest()
+
+
+def hash_text(text: str) -> str:
+    """
+    sha256 hex digest of the text after unicode normalization and whitespace
+    collapsing, so cosmetic differences hash the same.
+    """
+    normalized = " ".join(unicodedata.normalize("NFC", text).split())
+    return hashlib.sha256(normalized.encode("utf-8")).hexdigest()
@@ -0,0 +1,357 @@
+import uuid
+import asyncio
+import logging
+
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional
+from sqlalchemy import and_, or_, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core import settings, AsyncSessionLocal
+from app.models import IngestionTask
+from .job_service import JobService
+from .resume_service import ResumeService
+from .exceptions import TaskNotFoundError
+
+logger = logging.getLogger(__name__)
+
+
+class IngestionQueue:
+    """
+    Database-backed queue for resume and job uploads.
+
+    Upload endpoints enqueue an `IngestionTask` and return its id straight
+    away; a pool of worker coroutines started with the application claims
+    queued tasks and runs the usual `ResumeService`/`JobService` ingestion,
+    each in its own session. Workers are woken on enqueue and additionally
+    poll the table, so tasks queued by other processes are picked up too.
+
+    Several processes may share the table. A claimed task is leased to its
+    queue (`owner`), which renews `heartbeat_at` while it runs; only tasks
+    whose lease expired (their process died or hung) are requeued, and a
+    task that has already been started `max_attempts` times is marked failed
+    instead, so a document that crashes its process is not retried forever.
+    """
+
+    def __init__(
+        self,
+        workers: int = settings.INGESTION_WORKERS,
+        poll_interval: float = settings.INGESTION_POLL_INTERVAL,
+        lease_seconds: float = settings.INGESTION_LEASE_SECONDS,
+        max_attempts: int = settings.INGESTION_MAX_ATTEMPTS,
+    ) -> None:
+        self.workers = workers
+        self.poll_interval = poll_interval
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max(1, max_attempts)
+        self.owner = str(uuid.uuid4())
+        self._tasks: List[asyncio.Task] = []
+        self._wakeup = asyncio.Event()
+
+    @staticmethod
+    def _now() -> datetime:
+        return datetime.now(timezone.utc)
+
+    @staticmethod
+    def _to_dict(task: IngestionTask) -> Dict[str, Any]:
+        return {
+            "task_id": task.task_id,
+            "kind": task.kind,
+            "status": task.status,
+            "result": task.result,
+            "error": task.error,
+            "attempts": task.attempts,
+            "created_at": task.created_at.isoformat() if task.created_at else None,
+            "started_at": task.started_at.isoformat() if task.started_at else None,
+            "finished_at": task.finished_at.isoformat() if task.finished_at else None,
+        }
+
+    async def enqueue_resume(
+        self,
+        db: AsyncSession,
+        file_bytes: bytes,
+        file_type: str,
+        filename: str,
+        content_type: str = "md",
+    ) -> str:
+        """
+        Queues a resume upload and returns the task id.
+        """
+        return await self._enqueue(
+            db,
+            kind="resume",
+            payload={
+                "file_type": file_type,
+                "filename": filename,
+                "content_type": content_type,
+            },
+            file_bytes=file_bytes,
+        )
+
+    async def enqueue_job(self, db: AsyncSession, job_data: Dict[str, Any]) -> str:
+        """
+        Queues a job upload and returns the task id. The resume is checked
+        up front so a bad resume_id is rejected at upload time.
+        """
+        resume_id = str(job_data.get("resume_id"))
+        if not await JobService(db)._is_resume_available(resume_id):
+            raise AssertionError(
+                f"resume corresponding to resume_id: {resume_id} not found"
+            )
+        return await self._enqueue(db, kind="job", payload=job_data)
+
+    async def _enqueue(
+        self,
+        db: AsyncSession,
+        kind: str,
+        payload: Dict[str, Any],
+        file_bytes: Optional[bytes] = None,
+    ) -> str:
+        task_id = str(uuid.uuid4())
+        db.add(
+            IngestionTask(
+                task_id=task_id,
+                kind=kind,
+                status="queued",
+                payload=payload,
+                file_bytes=file_bytes,
+                attempts=0,
+            )
+        )
+        await db.commit()
+        self._wakeup.set()
+        return task_id
+
+    async def get_task(self, db: AsyncSession, task_id: str) -> Dict[str, Any]:
+        """
+        Returns the status of a task.
+
+        Raises:
+            TaskNotFoundError: If the task is not found
+        """
+        task = await db.get(IngestionTask, task_id)
+        if task is None:
+            raise TaskNotFoundError(task_id=task_id)
+        return self._to_dict(task)
+
+    async def _recover_stale(self) -> None:
+        """
+        Requeues running tasks whose lease expired, or fails them once they
+        have used up their attempts.
+        """
+        now = self._now()
+        cutoff = now - timedelta(seconds=self.lease_seconds)
+        stale = and_(
+            IngestionTask.status == "running",
+            or_(
+                IngestionTask.heartbeat_at < cutoff,
+                and_(
+                    IngestionTask.heartbeat_at.is_(None),
+                    IngestionTask.started_at < cutoff,
+                ),
+            ),
+        )
+        async with AsyncSessionLocal() as db:
+            failed = await db.execute(
+                update(IngestionTask)
+                .where(stale, IngestionTask.attempts >= self.max_attempts)
+                .values(
+                    status="failed",
+                    error=f"Interrupted {self.max_attempts} times, giving up",
+                    file_bytes=None,
+                    finished_at=now,
+                )
+            )
+            requeued = await db.execute(
+                update(IngestionTask)
+                .where(stale)
+                .values(status="queued", owner=None, heartbeat_at=None)
+            )
+            await db.commit()
+        if failed.rowcount:
+            logger.warning(f"Gave up on {failed.rowcount} repeatedly interrupted ingestion tasks")
+        if requeued.rowcount:
+            logger.info(f"Requeued {requeued.rowcount} interrupted ingestion tasks")
+
+    async def start(self) -> None:
+        """
+        Recovers tasks abandoned by dead processes and starts the worker pool.
+        """
+        if self._tasks:
+            return
+        await self._recover_stale()
+        self._tasks = [
+            asyncio.create_task(self._worker(), name=f"ingestion-worker-{i}")
+            for i in range(max(1, self.workers))
+        ]
+
+    async def stop(self) -> None:
+        """
+        Cancels the worker pool and hands the tasks it was running back to
+        the queue; a graceful stop does not count as an attempt.
+        """
+        tasks, self._tasks = self._tasks, []
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        async with AsyncSessionLocal() as db:
+            await db.execute(
+                update(IngestionTask)
+                .where(
+                    IngestionTask.status == "running",
+                    IngestionTask.owner == self.owner,
+                )
+                .values(
+                    status="queued",
+                    owner=None,
+                    heartbeat_at=None,
+                    attempts=IngestionTask.attempts - 1,
+                )
+            )
+            await db.commit()
+
+    async def _worker(self) -> None:
+        last_recovery = asyncio.get_running_loop().time()
+        while True:
+            now = asyncio.get_running_loop().time()
+            if now - last_recovery >= self.lease_seconds:
+                last_recovery = now
+                try:
+                    await self._recover_stale()
+                except Exception as e:
+                    logger.warning(f"Could not recover stale ingestion tasks: {e}")
+
+            try:
+                task_id = await self._claim()
+            except Exception as e:
+                logger.warning(f"Could not claim ingestion task: {e}")
+                task_id = None
+
+            if task_id is None:
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), self.poll_interval)
+                except asyncio.TimeoutError:
+                    pass
+                self._wakeup.clear()
+                continue
+
+            try:
+                await self._process(task_id)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                # The lease lapses and recovery requeues the task.
+                logger.error(f"Ingestion task {task_id} was not finished: {e}")
+
+    async def _claim(self) -> Optional[str]:
+        """
+        Marks the oldest queued task as running and returns its id. The
+        conditional update makes sure only one worker wins a task.
+        """
+        async with AsyncSessionLocal() as db:
+            while True:
+                task_id = await db.scalar(
+                    select(IngestionTask.task_id)
+                    .where(IngestionTask.status == "queued")
+                    .order_by(IngestionTask.created_at, IngestionTask.task_id)
+                    .limit(1)
+                )
+                if task_id is None:
+                    return None
+                result = await db.execute(
+                    update(IngestionTask)
+                    .where(
+                        IngestionTask.task_id == task_id,
+                        IngestionTask.status == "queued",
+                    )
+                    .values(
+                        status="running",
+                        owner=self.owner,
+                        started_at=self._now(),
+                        heartbeat_at=self._now(),
+                        attempts=IngestionTask.attempts + 1,
+                    )
+                )
+                await db.commit()
+                if result.rowcount == 1:
+                    return task_id
+
+    async def _heartbeat(self, task_id: str) -> None:
+        while True:
+            await asyncio.sleep(self.lease_seconds / 3)
+            try:
+                async with AsyncSessionLocal() as db:
+                    renewed = await db.execute(
+                        update(IngestionTask)
+                        .where(
+                            IngestionTask.task_id == task_id,
+                            IngestionTask.owner == self.owner,
+                            IngestionTask.status == "running",
+                        )
+                        .values(heartbeat_at=self._now())
+                    )
+                    await db.commit()
+            except Exception as e:
+                # Try again on the next beat; the lease outlasts a few misses.
+                logger.warning(f"Could not renew the lease on ingestion task {task_id}: {e}")
+                continue
+            if not renewed.rowcount:
+                logger.warning(f"Lost the lease on ingestion task {task_id}")
+                return
+
+    async def _process(self, task_id: str) -> None:
+        status, result, error = "completed", None, None
+        heartbeat = asyncio.create_task(self._heartbeat(task_id))
+        try:
+            async with AsyncSessionLocal() as db:
+                task = await db.get(IngestionTask, task_id)
+                kind, payload, file_bytes = task.kind, task.payload, task.file_bytes
+                match kind:
+                    case "resume":
+                        resume_id = await ResumeService(db).convert_and_store_resume(
+                            file_bytes=file_bytes,
+                            file_type=payload["file_type"],
+                            filename=payload["filename"],
+                            content_type=payload.get("content_type", "md"),
+                        )
+                        result = {"resume_id": resume_id}
+                    case "job":
+                        results = await JobService(db).create_and_store_job(payload)
+                        result = {
+                            "job_id": [item["job_id"] for item in results],
+                            "results": results,
+                        }
+                    case _:
+                        raise ValueError(f"unknown ingestion task kind: {kind}")
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"Ingestion task {task_id} failed: {e}")
+            status, error = "failed", str(e)
+        finally:
+            heartbeat.cancel()
+
+        try:
+            async with AsyncSessionLocal() as db:
+                # A task whose lease was lost belongs to whoever reclaimed it.
+                await db.execute(
+                    update(IngestionTask)
+                    .where(
+                        IngestionTask.task_id == task_id,
+                        IngestionTask.owner == self.owner,
+                    )
+                    .values(
+                        status=status,
+                        result=result,
+                        error=error,
+                        file_bytes=None,
+                        finished_at=self._now(),
+                    )
+                )
+                await db.commit()
+        except Exception as e:
+            # Left running, the task is requeued once its lease expires.
+            logger.error(f"Could not record the outcome of ingestion task {task_id}: {e}")
+
+
+ingestion_queue = IngestionQueue()
@@ -1,18 +1,25 @@
 import uuid
-import json
+import asyncio
 import logging
 
 from typing import List, Dict, Any, Optional
 from pydantic import ValidationError
 from sqlalchemy import select
+from sqlalchemy.orm import joinedload
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core import settings
 from app.agent import AgentManager
-from app.prompt import prompt_factory
+from app.prompt import prompt_builder
 from app.schemas.json import json_schema_factory
 from app.models import Job, Resume, ProcessedJob
 from app.schemas.pydantic import StructuredJobModel
-from .exceptions import JobNotFoundError
+from .embedding_service import EmbeddingService
+from .vector_index import job_vector_index
+from .keyword_index import ScoringMethod, job_keyword_index
+from .keyword_service import KeywordService
+from .hashing import hash_text
+from .exceptions import JobNotFoundError, ResumeNotFoundError, ResumeKeywordExtractionError
 
 logger = logging.getLogger(__name__)
 
@@ -21,10 +28,25 @@ class JobService:
     def __init__(self, db: AsyncSession):
         self.db = db
         self.json_agent_manager = AgentManager()
+        self.embedding_service = EmbeddingService(db)
 
-    async def create_and_store_job(self, job_data: dict) -> List[str]:
+    async def create_and_store_job(self, job_data: dict) -> List[Dict[str, Any]]:
         """
-        Stores job data in the database and returns a list of job IDs.
+        Stores job data in the database and reports the outcome per job.
+
+        Structured extraction of all job descriptions runs concurrently,
+        bounded by `JOB_INGEST_CONCURRENCY`; the jobs and their processed
+        data are then written in a single transaction. A failed extraction
+        does not fail the batch: the raw job is still stored and reported
+        with status "failed".
+
+        Descriptions already processed for the same resume (matched by a
+        hash of the normalized text) are not stored again; they are reported
+        with the existing job_id and status "duplicate".
+
+        Returns:
+            One {"job_id", "status", "error"} dict per job description, in
+            input order
         """
         resume_id = str(job_data.get("resume_id"))
 
@@ -33,24 +55,133 @@ class JobService:
                 f"resume corresponding to resume_id: {resume_id} not found"
             )
 
-        job_ids = []
-        for job_description in job_data.get("job_descriptions", []):
+        job_descriptions = job_data.get("job_descriptions", [])
+        content_hashes = [hash_text(job_description) for job_description in job_descriptions]
+        existing_job_ids = await self._find_processed_jobs(resume_id, content_hashes)
+
+        # Only descriptions not yet processed for this resume are extracted,
+        # each distinct one once.
+        pending: Dict[str, str] = {}
+        for job_description, content_hash in zip(job_descriptions, content_hashes):
+            if content_hash not in existing_job_ids:
+                pending.setdefault(content_hash, job_description)
+
+        semaphore = asyncio.Semaphore(max(1, settings.JOB_INGEST_CONCURRENCY))
+
+        async def extract(job_description: str) -> Dict[str, Any] | None:
+            async with semaphore:
+                return await self._extract_structured_json(job_description)
+
+        structured_jobs = await asyncio.gather(
+            *(extract(job_description) for job_description in pending.values()),
+            return_exceptions=True,
+        )
+        # return_exceptions also collects cancellation (and other
+        # BaseExceptions) from the extraction tasks; those must propagate
+        # rather than be recorded as failed jobs.
+        for structured_job in structured_jobs:
+            if isinstance(structured_job, BaseException) and not isinstance(
+                structured_job, Exception
+            ):
+                raise structured_job
+
+        outcomes: Dict[str, Dict[str, Any]] = {}
+        job_keywords = {}
+        keyword_lists = {}
+        for (content_hash, job_description), structured_job in zip(
+            pending.items(), structured_jobs
+        ):
             job_id = str(uuid.uuid4())
-            job = Job(
-                job_id=job_id,
-                resume_id=str(resume_id),
-                content=job_description,
+            self.db.add(
+                Job(
+                    job_id=job_id,
+                    resume_id=str(resume_id),
+                    content=job_description,
+                    content_hash=content_hash,
+                )
             )
-            self.db.add(job)
 
-            await self._extract_and_store_structured_job(
-                job_id=job_id, job_description_text=job_description
-            )
+            error = None
+            if isinstance(structured_job, BaseException):
+                logger.warning(f"Structured job extraction failed for {job_id}: {structured_job}")
+                error = str(structured_job)
+            elif not structured_job:
+                logger.info("Structured job extraction failed.")
+                error = "structured job extraction failed"
+            else:
+                self.db.add(self._build_processed_job(job_id, structured_job))
+                extracted_keywords = structured_job.get("extracted_keywords")
+                if extracted_keywords:
+                    job_keywords[job_id] = ", ".join(extracted_keywords)
+                    keyword_lists[job_id] = extracted_keywords
+
             logger.info(f"Job ID: {job_id}")
-            job_ids.append(job_id)
+            outcomes[content_hash] = {
+                "job_id": job_id,
+                "status": "failed" if error else "processed",
+                "error": error,
+            }
 
+        results = []
+        for content_hash in content_hashes:
+            if content_hash in existing_job_ids:
+                results.append(
+                    {
+                        "job_id": existing_job_ids[content_hash],
+                        "status": "duplicate",
+                        "error": None,
+                    }
+                )
+            else:
+                results.append(dict(outcomes[content_hash]))
+
+        await KeywordService(self.db).link_job_keywords(keyword_lists)
         await self.db.commit()
-        return job_ids
+        if job_keyword_index.loaded:
+            for job_id, keywords in keyword_lists.items():
+                job_keyword_index.add(job_id, keywords)
+        await self._store_job_embeddings(job_keywords)
+        return results
+
+    async def _find_processed_jobs(
+        self, resume_id: str, content_hashes: List[str]
+    ) -> Dict[str, str]:
+        """
+        Maps each content hash to the newest successfully processed job of
+        the resume with that hash.
+        """
+        if not content_hashes:
+            return {}
+        query = (
+            select(Job.content_hash, Job.job_id)
+            .join(ProcessedJob, ProcessedJob.job_id == Job.job_id)
+            .where(
+                Job.resume_id == resume_id,
+                Job.content_hash.in_(set(content_hashes)),
+            )
+            .order_by(Job.created_at)
+        )
+        result = await self.db.execute(query)
+        return dict(result.all())
+
+    async def _store_job_embeddings(self, job_keywords: Dict[str, str]) -> None:
+        """
+        Stores the keyword embeddings of freshly processed jobs in one batch.
+        Failures are not fatal: embeddings are computed on first use instead.
+        """
+        try:
+            embeddings = await self.embedding_service.store_job_embeddings(job_keywords)
+            await self.db.commit()
+        except Exception as e:
+            logger.warning(f"Could not store job embeddings: {e}")
+            await self.db.rollback()
+            return
+
+        embedding_manager = self.embedding_service.embedding_manager
+        if job_vector_index.is_current(
+            embedding_manager.model_provider, embedding_manager.model
+        ):
+            job_vector_index.add(embeddings)
 
     async def _is_resume_available(self, resume_id: str) -> bool:
         """
@@ -60,58 +191,27 @@ class JobService:
         result = await self.db.scalar(query)
         return result is not None
 
-    async def _extract_and_store_structured_job(
-        self, job_id, job_description_text: str
-    ):
+    def _build_processed_job(
+        self, job_id: str, structured_job: Dict[str, Any]
+    ) -> ProcessedJob:
         """
-        extract and store structured job data in the database
+        Maps the structured job returned by the LLM onto a ProcessedJob row.
         """
-        structured_job = await self._extract_structured_json(job_description_text)
-        if not structured_job:
-            logger.info("Structured job extraction failed.")
-            return None
-
-        processed_job = ProcessedJob(
+        return ProcessedJob(
             job_id=job_id,
             job_title=structured_job.get("job_title"),
-            company_profile=json.dumps(structured_job.get("company_profile"))
-            if structured_job.get("company_profile")
-            else None,
-            location=json.dumps(structured_job.get("location"))
-            if structured_job.get("location")
-            else None,
+            company_profile=structured_job.get("company_profile") or None,
+            location=structured_job.get("location") or None,
             date_posted=structured_job.get("date_posted"),
             employment_type=structured_job.get("employment_type"),
             job_summary=structured_job.get("job_summary"),
-            key_responsibilities=json.dumps(
-                {"key_responsibilities": structured_job.get("key_responsibilities", [])}
-            )
-            if structured_job.get("key_responsibilities")
-            else None,
-            qualifications=json.dumps(structured_job.get("qualifications", []))
-            if structured_job.get("qualifications")
-            else None,
-            compensation_and_benfits=json.dumps(
-                structured_job.get("compensation_and_benfits", [])
-            )
-            if structured_job.get("compensation_and_benfits")
-            else None,
-            application_info=json.dumps(structured_job.get("application_info", []))
-            if structured_job.get("application_info")
-            else None,
-            extracted_keywords=json.dumps(
-                {"extracted_keywords": structured_job.get("extracted_keywords", [])}
-            )
-            if structured_job.get("extracted_keywords")
-            else None,
+            key_responsibilities=structured_job.get("key_responsibilities") or None,
+            qualifications=structured_job.get("qualifications") or None,
+            compensation_and_benfits=structured_job.get("compensation_and_benfits") or None,
+            application_info=structured_job.get("application_info") or None,
+            extracted_keywords=structured_job.get("extracted_keywords") or None,
         )
 
-        self.db.add(processed_job)
-        await self.db.flush()
-        await self.db.commit()
-
-        return job_id
-
     async def _extract_structured_json(
         self, job_description_text: str
     ) -> Dict[str, Any] | None:
@@ -119,13 +219,17 @@ class JobService:
         Uses the AgentManager+JSONWrapper to ask the LLM to
         return the data in exact JSON schema we need.
         """
-        prompt_template = prompt_factory.get("structured_job")
-        prompt = prompt_template.format(
-            json.dumps(json_schema_factory.get("structured_job"), indent=2),
+        prompt = prompt_builder.build(
+            "structured_job",
+            json_schema_factory.get("structured_job"),
             job_description_text,
         )
-        logger.info(f"Structured Job Prompt: {prompt}")
-        raw_output = await self.json_agent_manager.run(prompt=prompt)
+        logger.info(f"Structured Job Prompt ({prompt.tokens} tokens): {prompt.text}")
+        raw_output = await self.json_agent_manager.run(
+            prompt=prompt.text,
+            response_model=StructuredJobModel,
+            num_ctx=prompt.num_ctx,
+        )
 
         try:
             structured_job: StructuredJobModel = StructuredJobModel.model_validate(
@@ -149,16 +253,18 @@ class JobService:
         Raises:
             JobNotFoundError: If the job is not found
         """
-        job_query = select(Job).where(Job.job_id == job_id)
+        job_query = (
+            select(Job)
+            .options(joinedload(Job.raw_job_association))
+            .where(Job.job_id == job_id)
+        )
         job_result = await self.db.execute(job_query)
         job = job_result.scalars().first()
 
         if not job:
             raise JobNotFoundError(job_id=job_id)
 
-        processed_query = select(ProcessedJob).where(ProcessedJob.job_id == job_id)
-        processed_result = await self.db.execute(processed_query)
-        processed_job = processed_result.scalars().first()
+        processed_job = job.raw_job_association
 
         combined_data = {
             "job_id": job.job_id,
@@ -174,17 +280,94 @@ class JobService:
         if processed_job:
             combined_data["processed_job"] = {
                 "job_title": processed_job.job_title,
-                "company_profile": json.loads(processed_job.company_profile) if processed_job.company_profile else None,
-                "location": json.loads(processed_job.location) if processed_job.location else None,
+                "company_profile": processed_job.company_profile,
+                "location": processed_job.location,
                 "date_posted": processed_job.date_posted,
                 "employment_type": processed_job.employment_type,
                 "job_summary": processed_job.job_summary,
-                "key_responsibilities": json.loads(processed_job.key_responsibilities).get("key_responsibilities", []) if processed_job.key_responsibilities else None,
-                "qualifications": json.loads(processed_job.qualifications).get("qualifications", []) if processed_job.qualifications else None,
-                "compensation_and_benfits": json.loads(processed_job.compensation_and_benfits).get("compensation_and_benfits", []) if processed_job.compensation_and_benfits else None,
-                "application_info": json.loads(processed_job.application_info).get("application_info", []) if processed_job.application_info else None,
-                "extracted_keywords": json.loads(processed_job.extracted_keywords).get("extracted_keywords", []) if processed_job.extracted_keywords else None,
+                "key_responsibilities": processed_job.key_responsibilities,
+                "qualifications": processed_job.qualifications,
+                "compensation_and_benfits": processed_job.compensation_and_benfits,
+                "application_info": processed_job.application_info,
+                "extracted_keywords": processed_job.extracted_keywords,
                 "processed_at": processed_job.processed_at.isoformat() if processed_job.processed_at else None,
             }
 
         return combined_data
+
+    async def search_jobs(
+        self,
+        resume_id: str,
+        top_k: int = 10,
+        scoring: ScoringMethod = "embedding",
+        prefilter: Optional[int] = None,
+    ) -> List[Dict]:
+        """
+        Returns the `top_k` stored jobs closest to the resume, best first.
+
+        With `scoring="embedding"` jobs are ranked by cosine similarity using
+        the in-process job vector index; "jaccard" and "bm25" rank them by
+        keyword overlap with the resume's extracted keywords, without any
+        embedding calls. `prefilter` shortlists that many jobs by BM25 first
+        and only ranks the shortlist by embedding similarity.
+
+        Raises:
+            ResumeNotFoundError: If the resume is not found
+            ResumeKeywordExtractionError: If keyword scoring is requested and
+                the resume has no extracted keywords
+        """
+        resume = await self.db.scalar(
+            select(Resume)
+            .options(joinedload(Resume.raw_resume_association))
+            .where(Resume.resume_id == resume_id)
+        )
+        if not resume:
+            raise ResumeNotFoundError(resume_id=resume_id)
+
+        resume_keywords = None
+        if scoring != "embedding" or prefilter:
+            processed_resume = resume.raw_resume_association
+            if not processed_resume or not processed_resume.extracted_keywords:
+                raise ResumeKeywordExtractionError(resume_id=resume_id)
+            resume_keywords = processed_resume.extracted_keywords
+            await job_keyword_index.ensure_loaded(self.db)
+
+        if scoring != "embedding":
+            matches = job_keyword_index.search(
+                resume_keywords, top_k=top_k, scoring=scoring
+            )
+        else:
+            shortlist = None
+            if prefilter:
+                shortlist = [
+                    job_id
+                    for job_id, _ in job_keyword_index.search(
+                        resume_keywords, top_k=prefilter, scoring="bm25"
+                    )
+                ]
+            resume_embedding = await self.embedding_service.get_resume_embedding(
+                resume.resume_id, resume.content
+            )
+            embedding_manager = self.embedding_service.embedding_manager
+            await job_vector_index.ensure_loaded(
+                self.db, embedding_manager.model_provider, embedding_manager.model
+            )
+            matches = job_vector_index.search(
+                resume_embedding, top_k=top_k, job_ids=shortlist
+            )
+
+        result = await self.db.execute(
+            select(ProcessedJob.job_id, ProcessedJob.job_title).where(
+                ProcessedJob.job_id.in_([job_id for job_id, _ in matches])
+            )
+        )
+        job_titles = dict(result.all())
+        return [
+            {
+                "rank": rank,
+                "job_id": job_id,
+                "job_title": job_titles.get(job_id),
+                "score": score,
+            }
+            for rank, (job_id, score) in enumerate(matches, start=1)
+        ]
@@ -0,0 +1,234 @@
+import math
+import heapq
+import asyncio
+import logging
+import unicodedata
+
+from collections import defaultdict
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, Literal, Optional, Set, Tuple
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models import ProcessedJob
+
+logger = logging.getLogger(__name__)
+
+KeywordScoring = Literal["jaccard", "bm25"]
+# How jobs are ranked against a resume: by embedding similarity or lexically.
+ScoringMethod = Literal["embedding", "jaccard", "bm25"]
+
+# Stripped from both ends of a keyword; "+" and "#" are kept for C++/C#.
+_EDGE_PUNCTUATION = " \t\n.,;:!?'\"`()[]{}<>*-_/\\|"
+
+
+def normalize_keyword(keyword: str) -> str:
+    """
+    Canonical form of a keyword: NFKC, case-folded, whitespace collapsed and
+    surrounding punctuation removed, so "Kubernetes", " kubernetes." and
+    "KUBERNETES" compare equal.
+    """
+    keyword = unicodedata.normalize("NFKC", keyword).casefold()
+    return " ".join(keyword.split()).strip(_EDGE_PUNCTUATION)
+
+
+def normalize_keywords(keywords: Optional[Iterable[str]]) -> Set[str]:
+    """
+    Set of the normalized, non-empty `keywords`.
+    """
+    if not keywords:
+        return set()
+    normalized = (normalize_keyword(k) for k in keywords if isinstance(k, str))
+    return {keyword for keyword in normalized if keyword}
+
+
+def jaccard(a: Set[str], b: Set[str]) -> float:
+    """
+    |a ∩ b| / |a ∪ b| of two normalized keyword sets.
+    """
+    if not a or not b:
+        return 0.0
+    overlap = len(a & b)
+    return overlap / (len(a) + len(b) - overlap)
+
+
+class JobKeywordIndex:
+    """
+    Inverted index from normalized keyword to the jobs that list it, built
+    from `ProcessedJob.extracted_keywords`.
+
+    Scoring is purely lexical and needs no embedding calls: a query only
+    touches the posting lists of its own keywords, so shortlisting thousands
+    of jobs costs a few dictionary lookups per job. Two weightings are
+    available:
+
+    - "jaccard": keyword-set overlap, in [0, 1].
+    - "bm25": BM25 with every keyword counted once per job, so rare keywords
+      weigh more than ubiquitous ones and long keyword lists are damped.
+
+    The index is loaded from the database on first use and kept current by
+    `JobService` as jobs are processed. Jobs processed by other processes are
+    picked up by `ensure_loaded`, which compares the number of processed jobs
+    and the latest `processed_at` with what the index last saw.
+    """
+
+    def __init__(self, k1: float = 1.2, b: float = 0.75) -> None:
+        self.k1 = k1
+        self.b = b
+        self._postings: Dict[str, Set[str]] = defaultdict(set)
+        self._keywords: Dict[str, Set[str]] = {}
+        self._total_length = 0
+        self._lock = asyncio.Lock()
+        self._loaded = False
+        # Every job added, including those without keywords, and the
+        # (row count, latest processed_at) of `processed_jobs` last loaded.
+        self._seen: Set[str] = set()
+        self._state: Tuple[int, Optional[datetime]] = (0, None)
+
+    def __len__(self) -> int:
+        return len(self._keywords)
+
+    def __contains__(self, job_id: str) -> bool:
+        return job_id in self._keywords
+
+    @property
+    def loaded(self) -> bool:
+        return self._loaded
+
+    @staticmethod
+    async def _store_state(db: AsyncSession) -> Tuple[int, Optional[datetime]]:
+        count, processed_at = (
+            await db.execute(select(func.count(), func.max(ProcessedJob.processed_at)))
+        ).one()
+        return count, processed_at
+
+    async def _load(self, db: AsyncSession, since: Optional[datetime] = None) -> None:
+        query = select(ProcessedJob.job_id, ProcessedJob.extracted_keywords)
+        if since is not None:
+            # processed_at has one-second resolution (and SQLite stores server
+            # defaults in another format than bound datetimes), so re-read
+            # the last second; adding a job again is harmless.
+            query = query.where(ProcessedJob.processed_at >= since - timedelta(seconds=1))
+        for job_id, keywords in await db.execute(query):
+            self.add(job_id, keywords)
+
+    async def ensure_loaded(self, db: AsyncSession) -> None:
+        """
+        Builds the index from the processed jobs on first use, then adds jobs
+        processed since it last looked; it is rebuilt if jobs were deleted.
+        """
+        state = await self._store_state(db)
+        if self._loaded and state == self._state:
+            return
+        async with self._lock:
+            state = await self._store_state(db)
+            if self._loaded:
+                if state == self._state:
+                    return
+                await self._load(db, since=self._state[1])
+                if len(self._seen) == state[0]:
+                    self._state = state
+                    return
+            self._postings.clear()
+            self._keywords.clear()
+            self._seen.clear()
+            self._total_length = 0
+            self._state = state
+            await self._load(db)
+            self._loaded = True
+            logger.info(f"Built job keyword index over {len(self)} jobs")
+
+    def add(self, job_id: str, keywords: Optional[Iterable[str]]) -> None:
+        """
+        Inserts or replaces the keywords of a job.
+        """
+        self._seen.add(job_id)
+        self.remove(job_id)
+        normalized = normalize_keywords(keywords)
+        if not normalized:
+            return
+        self._keywords[job_id] = normalized
+        self._total_length += len(normalized)
+        for keyword in normalized:
+            self._postings[keyword].add(job_id)
+
+    def remove(self, job_id: str) -> None:
+        keywords = self._keywords.pop(job_id, None)
+        if keywords is None:
+            return
+        self._total_length -= len(keywords)
+        for keyword in keywords:
+            postings = self._postings[keyword]
+            postings.discard(job_id)
+            if not postings:
+                del self._postings[keyword]
+
+    def keywords(self, job_id: str) -> Set[str]:
+        return self._keywords.get(job_id, set())
+
+    def _idf(self, keyword: str) -> float:
+        count = len(self._keywords)
+        frequency = len(self._postings.get(keyword, ()))
+        return math.log(1.0 + (count - frequency + 0.5) / (frequency + 0.5))
+
+    def score(
+        self,
+        query: Iterable[str],
+        job_ids: Optional[Iterable[str]] = None,
+        scoring: KeywordScoring = "bm25",
+    ) -> Dict[str, float]:
+        """
+        Scores the jobs sharing at least one keyword with `query`, restricted
+        to `job_ids` if given. Jobs without any overlap are left out (their
+        score is 0).
+        """
+        query = normalize_keywords(query)
+        candidates = set(job_ids) if job_ids is not None else None
+
+        overlaps: Dict[str, int] = defaultdict(int)
+        weights: Dict[str, float] = defaultdict(float)
+        for keyword in query:
+            postings = self._postings.get(keyword)
+            if not postings:
+                continue
+            if candidates is not None:
+                postings = postings & candidates
+            idf = self._idf(keyword) if scoring == "bm25" else 0.0
+            for job_id in postings:
+                overlaps[job_id] += 1
+                weights[job_id] += idf
+
+        if scoring == "jaccard":
+            return {
+                job_id: overlap / (len(query) + len(self._keywords[job_id]) - overlap)
+                for job_id, overlap in overlaps.items()
+            }
+
+        average_length = self._total_length / max(1, len(self._keywords))
+        scores = {}
+        for job_id, weight in weights.items():
+            length = len(self._keywords[job_id])
+            norm = 1.0 - self.b + self.b * length / average_length
+            scores[job_id] = weight * (self.k1 + 1.0) / (1.0 + self.k1 * norm)
+        return scores
+
+    def search(
+        self,
+        query: Iterable[str],
+        top_k: int = 10,
+        job_ids: Optional[Iterable[str]] = None,
+        scoring: KeywordScoring = "bm25",
+    ) -> List[Tuple[str, float]]:
+        """
+        Returns up to `top_k` (job_id, score) pairs with a non-zero score,
+        best first.
+        """
+        if top_k <= 0:
+            return []
+        scores = self.score(query, job_ids=job_ids, scoring=scoring)
+        return heapq.nsmallest(
+            top_k, scores.items(), key=lambda item: (-item[1], item[0])
+        )
+
+
+job_keyword_index = JobKeywordIndex()
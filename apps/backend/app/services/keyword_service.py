@@ -0,0 +1,219 @@
+import logging
+
+from typing import Any, Dict, Iterable, List, Literal, Optional, Set
+from sqlalchemy import String, Table, cast, exists, func, insert, select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models import (
+    Keyword,
+    ProcessedJob,
+    ProcessedResume,
+    job_keyword_association,
+    resume_keyword_association,
+)
+from .keyword_index import normalize_keyword, normalize_keywords
+from .exceptions import ResumeNotFoundError
+
+logger = logging.getLogger(__name__)
+
+
+class KeywordService:
+    """
+    Maintains and queries the normalized `keywords` table and its
+    `job_keywords` / `resume_keywords` link tables.
+
+    The links are written alongside the processed job or resume, in the same
+    transaction, so keyword lookups and resume/job overlap counts run as
+    index scans in the database instead of loading and parsing every
+    `extracted_keywords` JSON document.
+    """
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def _insert_ignore(self, table: Table, rows: List[Dict[str, Any]]) -> None:
+        """
+        Inserts `rows`, skipping those that would violate a unique
+        constraint (another upload may be adding the same keyword).
+        """
+        if not rows:
+            return
+        dialect = self.db.get_bind().dialect.name
+        if dialect == "postgresql":
+            statement = postgresql.insert(table).on_conflict_do_nothing()
+        elif dialect == "sqlite":
+            statement = sqlite.insert(table).on_conflict_do_nothing()
+        else:
+            for row in rows:
+                try:
+                    async with self.db.begin_nested():
+                        await self.db.execute(insert(table), row)
+                except IntegrityError:
+                    pass
+            return
+        await self.db.execute(statement, rows)
+
+    async def _keyword_ids(self, keywords: Set[str]) -> Dict[str, int]:
+        """
+        Returns the ids of the normalized `keywords`, creating missing ones.
+        """
+        if not keywords:
+            return {}
+        await self._insert_ignore(
+            Keyword.__table__, [{"keyword": keyword} for keyword in sorted(keywords)]
+        )
+        result = await self.db.execute(
+            select(Keyword.keyword, Keyword.id).where(Keyword.keyword.in_(keywords))
+        )
+        return dict(result.all())
+
+    async def _link(
+        self, table: Table, owner_column: str, keywords_by_owner: Dict[str, Set[str]]
+    ) -> None:
+        keyword_ids = await self._keyword_ids(set().union(*keywords_by_owner.values()))
+        await self._insert_ignore(
+            table,
+            [
+                {owner_column: owner_id, "keyword_id": keyword_ids[keyword]}
+                for owner_id, keywords in keywords_by_owner.items()
+                for keyword in keywords
+            ],
+        )
+
+    async def link_job_keywords(self, job_keywords: Dict[str, Iterable[str]]) -> None:
+        """
+        Links processed jobs to their extracted keywords. Does not commit.
+        """
+        keywords_by_job = {
+            job_id: normalize_keywords(keywords) for job_id, keywords in job_keywords.items()
+        }
+        keywords_by_job = {job_id: kw for job_id, kw in keywords_by_job.items() if kw}
+        if keywords_by_job:
+            # The processed jobs must exist before rows can reference them.
+            await self.db.flush()
+            await self._link(job_keyword_association, "job_id", keywords_by_job)
+
+    async def link_resume_keywords(
+        self, resume_id: str, keywords: Optional[Iterable[str]]
+    ) -> None:
+        """
+        Links a processed resume to its extracted keywords. Does not commit.
+        """
+        normalized = normalize_keywords(keywords)
+        if normalized:
+            await self.db.flush()
+            await self._link(
+                resume_keyword_association, "resume_id", {resume_id: normalized}
+            )
+
+    async def backfill(self, batch_size: int = 500) -> int:
+        """
+        Links processed jobs and resumes stored before the keyword tables
+        existed. Only rows that have keywords but no links are read, so this
+        is cheap once everything is linked. Returns the number of rows linked.
+        """
+        linked = 0
+        for model, key, table, owner_column in (
+            (ProcessedJob, ProcessedJob.job_id, job_keyword_association, "job_id"),
+            (
+                ProcessedResume,
+                ProcessedResume.resume_id,
+                resume_keyword_association,
+                "resume_id",
+            ),
+        ):
+            keywords = model.extracted_keywords
+            result = await self.db.execute(
+                select(key, keywords).where(
+                    keywords.isnot(None),
+                    cast(keywords, String).notin_(["null", "[]"]),
+                    ~exists().where(table.c[owner_column] == key),
+                )
+            )
+            rows = result.all()
+            for start in range(0, len(rows), batch_size):
+                batch = {
+                    owner_id: normalize_keywords(values)
+                    for owner_id, values in rows[start : start + batch_size]
+                    if isinstance(values, list)
+                }
+                batch = {owner_id: kw for owner_id, kw in batch.items() if kw}
+                if batch:
+                    await self._link(table, owner_column, batch)
+                    linked += len(batch)
+            await self.db.commit()
+        if linked:
+            logger.info(f"Linked keywords of {linked} previously processed jobs and resumes")
+        return linked
+
+    async def find_jobs(
+        self,
+        keywords: List[str],
+        match: Literal["any", "all"] = "any",
+        limit: int = 50,
+    ) -> List[Dict[str, Any]]:
+        """
+        Returns the processed jobs that list any (or all) of `keywords`,
+        those matching the most keywords first.
+        """
+        normalized = {normalize_keyword(keyword) for keyword in keywords} - {""}
+        if not normalized:
+            return []
+        link = job_keyword_association
+        matched = func.count().label("matched")
+        query = (
+            select(link.c.job_id, ProcessedJob.job_title, matched)
+            .join(Keyword, Keyword.id == link.c.keyword_id)
+            .join(ProcessedJob, ProcessedJob.job_id == link.c.job_id)
+            .where(Keyword.keyword.in_(normalized))
+            .group_by(link.c.job_id, ProcessedJob.job_title)
+        )
+        if match == "all":
+            query = query.having(func.count() == len(normalized))
+        query = query.order_by(matched.desc(), link.c.job_id).limit(limit)
+        result = await self.db.execute(query)
+        return [
+            {"job_id": job_id, "job_title": job_title, "matched": count}
+            for job_id, job_title, count in result.all()
+        ]
+
+    async def keyword_overlap(
+        self,
+        resume_id: str,
+        job_ids: Optional[List[str]] = None,
+        limit: int = 50,
+    ) -> List[Dict[str, Any]]:
+        """
+        Returns the processed jobs sharing keywords with the resume, ranked
+        by the number of shared keywords, optionally restricted to `job_ids`.
+
+        Raises:
+            ResumeNotFoundError: If the resume has not been processed
+        """
+        processed = await self.db.scalar(
+            select(ProcessedResume.resume_id).where(ProcessedResume.resume_id == resume_id)
+        )
+        if processed is None:
+            raise ResumeNotFoundError(resume_id=resume_id)
+
+        job_link = job_keyword_association
+        resume_link = resume_keyword_association
+        overlap = func.count().label("overlap")
+        query = (
+            select(job_link.c.job_id, ProcessedJob.job_title, overlap)
+            .join(resume_link, resume_link.c.keyword_id == job_link.c.keyword_id)
+            .join(ProcessedJob, ProcessedJob.job_id == job_link.c.job_id)
+            .where(resume_link.c.resume_id == resume_id)
+            .group_by(job_link.c.job_id, ProcessedJob.job_title)
+            .order_by(overlap.desc(), job_link.c.job_id)
+            .limit(limit)
+        )
+        if job_ids is not None:
+            query = query.where(job_link.c.job_id.in_(job_ids))
+        result = await self.db.execute(query)
+        return [
+            {"job_id": job_id, "job_title": job_title, "overlap": count}
+            for job_id, job_title, count in result.all()
+        ]
@@ -0,0 +1,212 @@
+import json
+import base64
+import binascii
+
+from datetime import datetime
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+from sqlalchemy import and_, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core import AsyncSessionLocal
+from app.models import Resume, Job, ProcessedJob
+
+
+@dataclass(frozen=True)
+class _Listing:
+    model: Any
+    # ordering column and unique tie-breaker, newest first
+    sort_column: Any
+    key_column: Any
+    # returned when the caller doesn't ask for specific fields
+    default_fields: Tuple[str, ...]
+
+
+_LISTINGS: Dict[str, _Listing] = {
+    "resumes": _Listing(
+        model=Resume,
+        sort_column=Resume.created_at,
+        key_column=Resume.id,
+        default_fields=("resume_id", "content_type", "created_at"),
+    ),
+    "jobs": _Listing(
+        model=Job,
+        sort_column=Job.created_at,
+        key_column=Job.id,
+        default_fields=("job_id", "resume_id", "created_at"),
+    ),
+    "processed_jobs": _Listing(
+        model=ProcessedJob,
+        sort_column=ProcessedJob.processed_at,
+        key_column=ProcessedJob.job_id,
+        default_fields=(
+            "job_id",
+            "job_title",
+            "location",
+            "employment_type",
+            "date_posted",
+            "processed_at",
+        ),
+    ),
+}
+
+
+class ListingService:
+    """
+    Keyset-paginated listings of resumes, jobs and processed jobs, newest
+    first.
+
+    Pages are ordered by the (indexed) timestamp column with the primary key
+    as tie-breaker, and the cursor identifies the last row of the previous
+    page, so fetching any page costs the same no matter how deep it is.
+    Only the requested columns are selected; large text such as `content`
+    is skipped unless asked for.
+    """
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    @staticmethod
+    def encode_cursor(key: Any) -> str:
+        return base64.urlsafe_b64encode(json.dumps([key]).encode("utf-8")).decode("ascii")
+
+    @staticmethod
+    def decode_cursor(cursor: Optional[str]) -> Any:
+        """
+        Raises:
+            ValueError: If the cursor was not produced by `encode_cursor`
+        """
+        if not cursor:
+            return None
+        try:
+            (key,) = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+        except (binascii.Error, UnicodeError, ValueError, TypeError) as e:
+            raise ValueError(f"invalid cursor: {cursor}") from e
+        return key
+
+    @staticmethod
+    def _columns(listing: _Listing, fields: Optional[List[str]]) -> List[Any]:
+        """
+        Raises:
+            ValueError: If a field is not a column of the listed model
+        """
+        table = listing.model.__table__
+        names = list(fields) if fields else list(listing.default_fields)
+        unknown = [name for name in names if name not in table.columns]
+        if unknown:
+            raise ValueError(
+                f"unknown fields {unknown}; available: {sorted(table.columns.keys())}"
+            )
+        # The key column is needed for the cursor even if not requested.
+        if listing.key_column.name not in names:
+            names.append(listing.key_column.name)
+        return [table.columns[name] for name in dict.fromkeys(names)]
+
+    @staticmethod
+    def _serialize(row: Any, columns: List[Any], requested: set) -> Dict[str, Any]:
+        item = {}
+        for column in columns:
+            if column.name not in requested:
+                continue
+            value = row._mapping[column.name]
+            item[column.name] = value.isoformat() if isinstance(value, datetime) else value
+        return item
+
+    def _query(
+        self,
+        listing: _Listing,
+        columns: List[Any],
+        key: Any,
+        limit: int,
+        filters: Dict[str, Any],
+    ):
+        query = select(*columns)
+        for name, value in filters.items():
+            if value is not None:
+                query = query.where(listing.model.__table__.columns[name] == value)
+        if key is not None:
+            # Compare against the stored timestamp of the cursor row so the
+            # database does the comparison on its native representation.
+            anchor = (
+                select(listing.sort_column)
+                .where(listing.key_column == key)
+                .scalar_subquery()
+            )
+            query = query.where(
+                or_(
+                    listing.sort_column < anchor,
+                    and_(listing.sort_column == anchor, listing.key_column < key),
+                )
+            )
+        return query.order_by(
+            listing.sort_column.desc(), listing.key_column.desc()
+        ).limit(limit)
+
+    async def page(
+        self,
+        name: str,
+        limit: int = 50,
+        cursor: Optional[str] = None,
+        fields: Optional[List[str]] = None,
+        **filters: Any,
+    ) -> Dict[str, Any]:
+        """
+        Returns one page as {"items": [...], "next_cursor": str | None}.
+
+        Raises:
+            ValueError: If the cursor or a field is invalid
+        """
+        listing = _LISTINGS[name]
+        columns = self._columns(listing, fields)
+        requested = set(fields or listing.default_fields)
+        key = self.decode_cursor(cursor)
+
+        result = await self.db.execute(
+            self._query(listing, columns, key, limit + 1, filters)
+        )
+        rows = result.all()
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = self.encode_cursor(rows[-1]._mapping[listing.key_column.name])
+        return {
+            "items": [self._serialize(row, columns, requested) for row in rows],
+            "next_cursor": next_cursor,
+        }
+
+    @classmethod
+    def stream(
+        cls,
+        name: str,
+        cursor: Optional[str] = None,
+        fields: Optional[List[str]] = None,
+        page_size: int = 500,
+        **filters: Any,
+    ) -> AsyncIterator[str]:
+        """
+        Returns an iterator over every row after `cursor` as NDJSON lines,
+        read page by page in its own session so memory stays constant.
+        Arguments are validated before the iterator is returned.
+
+        Raises:
+            ValueError: If the cursor or a field is invalid
+        """
+        listing = _LISTINGS[name]
+        cls._columns(listing, fields)
+        cls.decode_cursor(cursor)
+
+        async def lines() -> AsyncIterator[str]:
+            next_cursor = cursor
+            async with AsyncSessionLocal() as db:
+                service = cls(db)
+                while True:
+                    page = await service.page(
+                        name, limit=page_size, cursor=next_cursor, fields=fields, **filters
+                    )
+                    for item in page["items"]:
+                        yield json.dumps(item) + "\n"
+                    next_cursor = page["next_cursor"]
+                    if next_cursor is None:
+                        return
+
+        return lines()
@@ -1,20 +1,21 @@
-import os
 import uuid
-import json
-import tempfile
 import logging
 
-from markitdown import MarkItDown
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
+from sqlalchemy.orm import joinedload
 from pydantic import ValidationError
 from typing import Dict, Optional
 
 from app.models import Resume, ProcessedResume
 from app.agent import AgentManager
-from app.prompt import prompt_factory
+from app.prompt import prompt_builder
 from app.schemas.json import json_schema_factory
 from app.schemas.pydantic import StructuredResumeModel
+from .embedding_service import EmbeddingService
+from .conversion import document_converter
+from .hashing import hash_bytes, hash_text
+from .keyword_service import KeywordService
 from .exceptions import ResumeNotFoundError, ResumeValidationError
 
 logger = logging.getLogger(__name__)
@@ -23,8 +24,8 @@ logger = logging.getLogger(__name__)
 class ResumeService:
     def __init__(self, db: AsyncSession):
         self.db = db
-        self.md = MarkItDown(enable_plugins=False)
         self.json_agent_manager = AgentManager()
+        self.embedding_service = EmbeddingService(db)
 
     async def convert_and_store_resume(
         self, file_bytes: bytes, file_type: str, filename: str, content_type: str = "md"
@@ -38,28 +39,48 @@ class ResumeService:
             filename: Original filename
             content_type: Output format ("md" for markdown or "html")
 
+        Re-uploads are recognised by a hash of the file bytes and, after
+        conversion, of the normalized text; if an already processed resume
+        matches, its resume_id is returned without converting or extracting
+        again.
+
         Returns:
-            None
+            The resume_id of the stored (or matching existing) resume
         """
-        with tempfile.NamedTemporaryFile(
-            delete=False, suffix=self._get_file_extension(file_type)
-        ) as temp_file:
-            temp_file.write(file_bytes)
-            temp_path = temp_file.name
+        file_hash = hash_bytes(file_bytes)
+        existing_resume_id = await self._find_processed_resume(
+            Resume.file_hash == file_hash, content_type
+        )
+        if existing_resume_id:
+            logger.info(f"Upload matches processed resume {existing_resume_id} by file hash")
+            return existing_resume_id
 
-        try:
-            result = self.md.convert(temp_path)
-            text_content = result.text_content
-            resume_id = await self._store_resume_in_db(text_content, content_type)
+        text_content = await document_converter.convert(
+            file_bytes,
+            mimetype=file_type,
+            extension=self._get_file_extension(file_type),
+            filename=filename,
+        )
+        content_hash = hash_text(text_content)
+        existing_resume_id = await self._find_processed_resume(
+            Resume.content_hash == content_hash, content_type
+        )
+        if existing_resume_id:
+            logger.info(f"Upload matches processed resume {existing_resume_id} by content hash")
+            return existing_resume_id
 
-            await self._extract_and_store_structured_resume(
-                resume_id=resume_id, resume_text=text_content
-            )
+        resume_id = await self._store_resume_in_db(
+            text_content, content_type, file_hash=file_hash
+        )
 
-            return resume_id
-        finally:
-            if os.path.exists(temp_path):
-                os.remove(temp_path)
+        await self._extract_and_store_structured_resume(
+            resume_id=resume_id, resume_text=text_content
+        )
+        await self._store_resume_embedding(
+            resume_id=resume_id, resume_text=text_content
+        )
+
+        return resume_id
 
     def _get_file_extension(self, file_type: str) -> str:
         """Returns the appropriate file extension based on MIME type"""
@@ -72,13 +93,35 @@ class ResumeService:
             return ".docx"
         return ""
 
-    async def _store_resume_in_db(self, text_content: str, content_type: str):
+    async def _find_processed_resume(
+        self, hash_clause, content_type: str
+    ) -> Optional[str]:
+        """
+        Returns the resume_id of the newest resume matching `hash_clause` that
+        was processed successfully, if any.
+        """
+        query = (
+            select(Resume.resume_id)
+            .join(ProcessedResume, ProcessedResume.resume_id == Resume.resume_id)
+            .where(hash_clause, Resume.content_type == content_type)
+            .order_by(Resume.created_at.desc())
+            .limit(1)
+        )
+        return await self.db.scalar(query)
+
+    async def _store_resume_in_db(
+        self, text_content: str, content_type: str, file_hash: Optional[str] = None
+    ):
         """
         Stores the parsed resume content in the database.
         """
         resume_id = str(uuid.uuid4())
         resume = Resume(
-            resume_id=resume_id, content=text_content, content_type=content_type
+            resume_id=resume_id,
+            content=text_content,
+            content_type=content_type,
+            file_hash=file_hash,
+            content_hash=hash_text(text_content),
         )
 
         self.db.add(resume)
@@ -87,6 +130,18 @@ class ResumeService:
 
         return resume_id
 
+    async def _store_resume_embedding(self, resume_id: str, resume_text: str) -> None:
+        """
+        Stores the resume embedding so scoring doesn't have to compute it.
+        Failures are not fatal: the embedding is computed on first use instead.
+        """
+        try:
+            await self.embedding_service.store_resume_embedding(resume_id, resume_text)
+            await self.db.commit()
+        except Exception as e:
+            logger.warning(f"Could not store embedding for resume {resume_id}: {e}")
+            await self.db.rollback()
+
     async def _extract_and_store_structured_resume(
         self, resume_id, resume_text: str
     ) -> None:
@@ -104,47 +159,20 @@ class ResumeService:
 
             processed_resume = ProcessedResume(
                 resume_id=resume_id,
-                personal_data=json.dumps(structured_resume.get("personal_data", {}))
-                if structured_resume.get("personal_data")
-                else None,
-                experiences=json.dumps(
-                    {"experiences": structured_resume.get("experiences", [])}
-                )
-                if structured_resume.get("experiences")
-                else None,
-                projects=json.dumps({"projects": structured_resume.get("projects", [])})
-                if structured_resume.get("projects")
-                else None,
-                skills=json.dumps({"skills": structured_resume.get("skills", [])})
-                if structured_resume.get("skills")
-                else None,
-                research_work=json.dumps(
-                    {"research_work": structured_resume.get("research_work", [])}
-                )
-                if structured_resume.get("research_work")
-                else None,
-                achievements=json.dumps(
-                    {"achievements": structured_resume.get("achievements", [])}
-                )
-                if structured_resume.get("achievements")
-                else None,
-                education=json.dumps(
-                    {"education": structured_resume.get("education", [])}
-                )
-                if structured_resume.get("education")
-                else None,
-                extracted_keywords=json.dumps(
-                    {
-                        "extracted_keywords": structured_resume.get(
-                            "extracted_keywords", []
-                        )
-                    }
-                    if structured_resume.get("extracted_keywords")
-                    else None
-                ),
+                personal_data=structured_resume.get("personal_data") or None,
+                experiences=structured_resume.get("experiences") or None,
+                projects=structured_resume.get("projects") or None,
+                skills=structured_resume.get("skills") or None,
+                research_work=structured_resume.get("research_work") or None,
+                achievements=structured_resume.get("achievements") or None,
+                education=structured_resume.get("education") or None,
+                extracted_keywords=structured_resume.get("extracted_keywords") or None,
             )
 
             self.db.add(processed_resume)
+            await KeywordService(self.db).link_resume_keywords(
+                resume_id, processed_resume.extracted_keywords
+            )
             await self.db.commit()
         except ResumeValidationError:
             # Re-raise validation errors to propagate to the upload endpoint
@@ -163,13 +191,17 @@ class ResumeService:
         Uses the AgentManager+JSONWrapper to ask the LLM to
         return the data in exact JSON schema we need.
         """
-        prompt_template = prompt_factory.get("structured_resume")
-        prompt = prompt_template.format(
-            json.dumps(json_schema_factory.get("structured_resume"), indent=2),
+        prompt = prompt_builder.build(
+            "structured_resume",
+            json_schema_factory.get("structured_resume"),
             resume_text,
         )
-        logger.info(f"Structured Resume Prompt: {prompt}")
-        raw_output = await self.json_agent_manager.run(prompt=prompt)
+        logger.info(f"Structured Resume Prompt ({prompt.tokens} tokens): {prompt.text}")
+        raw_output = await self.json_agent_manager.run(
+            prompt=prompt.text,
+            response_model=StructuredResumeModel,
+            num_ctx=prompt.num_ctx,
+        )
 
         try:
             structured_resume: StructuredResumeModel = (
@@ -204,18 +236,18 @@ class ResumeService:
         Raises:
             ResumeNotFoundError: If the resume is not found
         """
-        resume_query = select(Resume).where(Resume.resume_id == resume_id)
+        resume_query = (
+            select(Resume)
+            .options(joinedload(Resume.raw_resume_association))
+            .where(Resume.resume_id == resume_id)
+        )
         resume_result = await self.db.execute(resume_query)
         resume = resume_result.scalars().first()
 
         if not resume:
             raise ResumeNotFoundError(resume_id=resume_id)
 
-        processed_query = select(ProcessedResume).where(
-            ProcessedResume.resume_id == resume_id
-        )
-        processed_result = await self.db.execute(processed_query)
-        processed_resume = processed_result.scalars().first()
+        processed_resume = resume.raw_resume_association
 
         combined_data = {
             "resume_id": resume.resume_id,
@@ -232,38 +264,14 @@ class ResumeService:
 
         if processed_resume:
             combined_data["processed_resume"] = {
-                "personal_data": json.loads(processed_resume.personal_data)
-                if processed_resume.personal_data
-                else None,
-                "experiences": json.loads(processed_resume.experiences).get(
-                    "experiences", []
-                )
-                if processed_resume.experiences
-                else None,
-                "projects": json.loads(processed_resume.projects).get("projects", [])
-                if processed_resume.projects
-                else [],
-                "skills": json.loads(processed_resume.skills).get("skills", [])
-                if processed_resume.skills
-                else [],
-                "research_work": json.loads(processed_resume.research_work).get(
-                    "research_work", []
-                )
-                if processed_resume.research_work
-                else [],
-                "achievements": json.loads(processed_resume.achievements).get(
-                    "achievements", []
-                )
-                if processed_resume.achievements
-                else [],
-                "education": json.loads(processed_resume.education).get("education", [])
-                if processed_resume.education
-                else [],
-                "extracted_keywords": json.loads(
-                    processed_resume.extracted_keywords
-                ).get("extracted_keywords", [])
-                if processed_resume.extracted_keywords
-                else [],
+                "personal_data": processed_resume.personal_data,
+                "experiences": processed_resume.experiences,
+                "projects": processed_resume.projects or [],
+                "skills": processed_resume.skills or [],
+                "research_work": processed_resume.research_work or [],
+                "achievements": processed_resume.achievements or [],
+                "education": processed_resume.education or [],
+                "extracted_keywords": processed_resume.extracted_keywords or [],
                 "processed_at": processed_resume.processed_at.isoformat()
                 if processed_resume.processed_at
                 else None,
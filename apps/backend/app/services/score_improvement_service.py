@@ -6,15 +6,26 @@ import markdown
 import numpy as np
 
 from sqlalchemy.future import select
+from sqlalchemy.orm import joinedload
 from pydantic import ValidationError
 from sqlalchemy.ext.asyncio import AsyncSession
-from typing import Dict, Optional, Tuple, AsyncGenerator
-
-from app.prompt import prompt_factory
+from typing import Dict, List, Optional, Tuple, AsyncGenerator
+
+from app.core import settings
+from app.prompt import (
+    BuiltPrompt,
+    compact_text,
+    count_tokens,
+    dedupe_keywords,
+    prompt_builder,
+)
 from app.schemas.json import json_schema_factory
 from app.schemas.pydantic import ResumePreviewerModel
 from app.agent import EmbeddingManager, AgentManager
+from app.agent.strategies.wrapper import MDWrapper
 from app.models import Resume, Job, ProcessedResume, ProcessedJob
+from .embedding_service import EmbeddingService
+from .keyword_index import ScoringMethod, job_keyword_index
 from .exceptions import (
     ResumeNotFoundError,
     JobNotFoundError,
@@ -35,12 +46,20 @@ class ScoreImprovementService:
     the scoring process.
     """
 
-    def __init__(self, db: AsyncSession, max_retries: int = 5):
+    def __init__(
+        self,
+        db: AsyncSession,
+        max_retries: int = 5,
+        improvement_mode: str = settings.IMPROVEMENT_MODE,
+    ):
         self.db = db
         self.max_retries = max_retries
-        self.md_agent_manager = AgentManager(strategy="md")
+        self.improvement_mode = improvement_mode
+        # Every improvement attempt should be a fresh generation.
+        self.md_agent_manager = AgentManager(strategy="md", cache=False)
         self.json_agent_manager = AgentManager()
         self.embedding_manager = EmbeddingManager()
+        self.embedding_service = EmbeddingService(db)
 
     def _validate_resume_keywords(
         self, processed_resume: ProcessedResume, resume_id: str
@@ -52,14 +71,6 @@ class ScoreImprovementService:
         if not processed_resume.extracted_keywords:
             raise ResumeKeywordExtractionError(resume_id=resume_id)
 
-        try:
-            keywords_data = json.loads(processed_resume.extracted_keywords)
-            keywords = keywords_data.get("extracted_keywords", [])
-            if not keywords or len(keywords) == 0:
-                raise ResumeKeywordExtractionError(resume_id=resume_id)
-        except json.JSONDecodeError:
-            raise ResumeKeywordExtractionError(resume_id=resume_id)
-
     def _validate_job_keywords(self, processed_job: ProcessedJob, job_id: str) -> None:
         """
         Validates that keyword extraction was successful for a job.
@@ -68,30 +79,24 @@ class ScoreImprovementService:
         if not processed_job.extracted_keywords:
             raise JobKeywordExtractionError(job_id=job_id)
 
-        try:
-            keywords_data = json.loads(processed_job.extracted_keywords)
-            keywords = keywords_data.get("extracted_keywords", [])
-            if not keywords or len(keywords) == 0:
-                raise JobKeywordExtractionError(job_id=job_id)
-        except json.JSONDecodeError:
-            raise JobKeywordExtractionError(job_id=job_id)
-
     async def _get_resume(
         self, resume_id: str
     ) -> Tuple[Resume | None, ProcessedResume | None]:
         """
         Fetches the resume from the database.
         """
-        query = select(Resume).where(Resume.resume_id == resume_id)
+        query = (
+            select(Resume)
+            .options(joinedload(Resume.raw_resume_association))
+            .where(Resume.resume_id == resume_id)
+        )
         result = await self.db.execute(query)
         resume = result.scalars().first()
 
         if not resume:
             raise ResumeNotFoundError(resume_id=resume_id)
 
-        query = select(ProcessedResume).where(ProcessedResume.resume_id == resume_id)
-        result = await self.db.execute(query)
-        processed_resume = result.scalars().first()
+        processed_resume = resume.raw_resume_association
 
         if not processed_resume:
             raise ResumeParsingError(resume_id=resume_id)
@@ -104,16 +109,18 @@ class ScoreImprovementService:
         """
         Fetches the job from the database.
         """
-        query = select(Job).where(Job.job_id == job_id)
+        query = (
+            select(Job)
+            .options(joinedload(Job.raw_job_association))
+            .where(Job.job_id == job_id)
+        )
         result = await self.db.execute(query)
         job = result.scalars().first()
 
         if not job:
             raise JobNotFoundError(job_id=job_id)
 
-        query = select(ProcessedJob).where(ProcessedJob.job_id == job_id)
-        result = await self.db.execute(query)
-        processed_job = result.scalars().first()
+        processed_job = job.raw_job_association
 
         if not processed_job:
             raise JobParsingError(job_id=job_id)
@@ -122,6 +129,21 @@ class ScoreImprovementService:
 
         return job, processed_job
 
+    async def _get_embeddings(
+        self, resume: Resume, job_id: str, extracted_job_keywords: str
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Returns the resume and job-keyword embeddings, read from the ones
+        stored at ingest time whenever they are still current.
+        """
+        resume_embedding = await self.embedding_service.get_resume_embedding(
+            resume.resume_id, resume.content
+        )
+        job_embeddings = await self.embedding_service.get_job_embeddings(
+            {job_id: extracted_job_keywords}
+        )
+        return resume_embedding, job_embeddings[job_id]
+
     def calculate_cosine_similarity(
         self,
         extracted_job_keywords_embedding: np.ndarray,
@@ -138,6 +160,43 @@ class ScoreImprovementService:
 
         return float(np.dot(ejk, re) / (np.linalg.norm(ejk) * np.linalg.norm(re)))
 
+    def calculate_cosine_similarities(
+        self,
+        embeddings: np.ndarray,
+        extracted_job_keywords_embedding: np.ndarray,
+    ) -> np.ndarray:
+        """
+        Calculates the cosine similarity of every row in `embeddings` against
+        one embedding with a single matrix-vector product.
+        """
+        matrix = np.atleast_2d(np.asarray(embeddings, dtype=np.float32))
+        vector = np.asarray(extracted_job_keywords_embedding, dtype=np.float32).reshape(-1)
+        norms = np.linalg.norm(matrix, axis=1) * np.linalg.norm(vector)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            scores = (matrix @ vector) / norms
+        return np.nan_to_num(scores)
+
+    def _improvement_prompt(
+        self,
+        resume: str,
+        extracted_resume_keywords: str,
+        job: str,
+        extracted_job_keywords: str,
+        cosine_similarity_score: float,
+    ) -> BuiltPrompt:
+        # The response is a rewrite of the resume, so its length follows the
+        # resume rather than the whole prompt.
+        resume = compact_text(resume)
+        return prompt_builder.build(
+            "resume_improvement",
+            output_tokens=max(settings.LLM_OUTPUT_TOKENS, 2 * count_tokens(resume)),
+            raw_job_description=job,
+            extracted_job_keywords=dedupe_keywords(extracted_job_keywords),
+            raw_resume=resume,
+            extracted_resume_keywords=dedupe_keywords(extracted_resume_keywords),
+            current_cosine_similarity=cosine_similarity_score,
+        )
+
     async def improve_score_with_llm(
         self,
         resume: str,
@@ -147,21 +206,36 @@ class ScoreImprovementService:
         previous_cosine_similarity_score: float,
         extracted_job_keywords_embedding: np.ndarray,
     ) -> Tuple[str, float]:
-        prompt_template = prompt_factory.get("resume_improvement")
+        if self.improvement_mode == "parallel":
+            return await self._improve_score_in_parallel(
+                resume=resume,
+                extracted_resume_keywords=extracted_resume_keywords,
+                job=job,
+                extracted_job_keywords=extracted_job_keywords,
+                previous_cosine_similarity_score=previous_cosine_similarity_score,
+                extracted_job_keywords_embedding=extracted_job_keywords_embedding,
+            )
+
         best_resume, best_score = resume, previous_cosine_similarity_score
+        # A failed attempt leaves the prompt unchanged, so each retry samples
+        # at a higher temperature instead of repeating the same generation.
+        temperatures = self._candidate_temperatures(self.max_retries)[: self.max_retries]
 
-        for attempt in range(1, self.max_retries + 1):
+        for attempt, temperature in enumerate(temperatures, start=1):
             logger.info(
-                f"Attempt {attempt}/{self.max_retries} to improve resume score."
+                f"Attempt {attempt}/{self.max_retries} to improve resume score "
+                f"at temperature {temperature}."
             )
-            prompt = prompt_template.format(
-                raw_job_description=job,
-                extracted_job_keywords=extracted_job_keywords,
-                raw_resume=best_resume,
+            prompt = self._improvement_prompt(
+                resume=best_resume,
                 extracted_resume_keywords=extracted_resume_keywords,
-                current_cosine_similarity=best_score,
+                job=job,
+                extracted_job_keywords=extracted_job_keywords,
+                cosine_similarity_score=best_score,
+            )
+            improved = await self.md_agent_manager.run(
+                prompt.text, temperature=temperature, num_ctx=prompt.num_ctx
             )
-            improved = await self.md_agent_manager.run(prompt)
             emb = await self.embedding_manager.embed(text=improved)
             score = self.calculate_cosine_similarity(
                 emb, extracted_job_keywords_embedding
@@ -176,17 +250,230 @@ class ScoreImprovementService:
 
         return best_resume, best_score
 
+    def _candidate_temperatures(self, count: int) -> list[float]:
+        """
+        Spreads candidate temperatures evenly from 0 to the configured maximum
+        so parallel candidates (and sequential retries) explore different
+        rewrites.
+        """
+        if count <= 1:
+            return [0.0]
+        step = settings.IMPROVEMENT_MAX_TEMPERATURE / (count - 1)
+        return [round(i * step, 2) for i in range(count)]
+
+    async def _improve_score_in_parallel(
+        self,
+        resume: str,
+        extracted_resume_keywords: str,
+        job: str,
+        extracted_job_keywords: str,
+        previous_cosine_similarity_score: float,
+        extracted_job_keywords_embedding: np.ndarray,
+    ) -> Tuple[str, float]:
+        """
+        Generates several improvement candidates concurrently and keeps the
+        best scoring one.
+
+        Without a target score all candidates are awaited and embedded in one
+        batch. With IMPROVEMENT_TARGET_SCORE set, candidates are scored as
+        they finish and the remaining ones are cancelled once one reaches it.
+        """
+        prompt = self._improvement_prompt(
+            resume=resume,
+            extracted_resume_keywords=extracted_resume_keywords,
+            job=job,
+            extracted_job_keywords=extracted_job_keywords,
+            cosine_similarity_score=previous_cosine_similarity_score,
+        )
+        target_score = settings.IMPROVEMENT_TARGET_SCORE
+        semaphore = asyncio.Semaphore(max(1, settings.IMPROVEMENT_CONCURRENCY))
+
+        async def generate(temperature: float) -> str:
+            async with semaphore:
+                return await self.md_agent_manager.run(
+                    prompt.text, temperature=temperature, num_ctx=prompt.num_ctx
+                )
+
+        temperatures = self._candidate_temperatures(settings.IMPROVEMENT_CANDIDATES)
+        logger.info(f"Generating {len(temperatures)} improvement candidates at {temperatures}")
+        pending = {asyncio.create_task(generate(t)) for t in temperatures}
+        best_resume, best_score = resume, previous_cosine_similarity_score
+        errors = []
+
+        try:
+            while pending:
+                done, pending = await asyncio.wait(
+                    pending,
+                    return_when=asyncio.ALL_COMPLETED
+                    if target_score is None
+                    else asyncio.FIRST_COMPLETED,
+                )
+                candidates = []
+                for task in done:
+                    try:
+                        candidates.append(task.result())
+                    except Exception as e:
+                        logger.warning(f"Improvement candidate failed: {e}")
+                        errors.append(e)
+                if not candidates:
+                    continue
+
+                embeddings = await self.embedding_manager.embed_many(candidates)
+                scores = self.calculate_cosine_similarities(
+                    embeddings, extracted_job_keywords_embedding
+                )
+                logger.info(f"Improvement candidate scores: {scores.tolist()}")
+                top = int(np.argmax(scores))
+                if scores[top] > best_score:
+                    best_resume, best_score = candidates[top], float(scores[top])
+                if target_score is not None and best_score >= target_score:
+                    break
+        finally:
+            for task in pending:
+                task.cancel()
+
+        if len(errors) == len(temperatures):
+            raise errors[0]
+        return best_resume, best_score
+
+    async def score_jobs(
+        self,
+        resume_id: str,
+        job_ids: Optional[List[str]] = None,
+        scoring: ScoringMethod = "embedding",
+        prefilter: Optional[int] = None,
+    ) -> Dict:
+        """
+        Scores one resume against many jobs and returns them ranked. Without
+        `job_ids`, every job linked to the resume is scored.
+
+        With `scoring="embedding"` jobs are ranked by cosine similarity;
+        embeddings come from the ingest-time store and all scores are
+        computed with a single matrix-vector product. "jaccard" and "bm25"
+        rank by keyword overlap with the resume's extracted keywords and make
+        no embedding calls. `prefilter` first shortlists that many jobs by
+        BM25 and only embeds and ranks the shortlist; the other jobs are left
+        out of the results.
+
+        Jobs that are unknown or have no extracted keywords are reported in
+        `skipped_job_ids` instead of failing the whole batch.
+        """
+        result = await self.db.execute(
+            select(Resume)
+            .options(joinedload(Resume.raw_resume_association))
+            .where(Resume.resume_id == resume_id)
+        )
+        resume = result.scalars().first()
+        if not resume:
+            raise ResumeNotFoundError(resume_id=resume_id)
+
+        if job_ids is None:
+            result = await self.db.execute(
+                select(Job.job_id).where(Job.resume_id == resume_id)
+            )
+            job_ids = list(result.scalars().all())
+        job_ids = list(dict.fromkeys(job_ids))
+
+        result = await self.db.execute(
+            select(ProcessedJob).where(ProcessedJob.job_id.in_(job_ids))
+        )
+        processed_jobs = {job.job_id: job for job in result.scalars().all()}
+
+        job_keywords: Dict[str, str] = {}
+        job_titles: Dict[str, str] = {}
+        skipped_job_ids: List[str] = []
+        for job_id in job_ids:
+            processed_job = processed_jobs.get(job_id)
+            try:
+                if processed_job is None:
+                    raise JobNotFoundError(job_id=job_id)
+                self._validate_job_keywords(processed_job, job_id)
+            except (JobNotFoundError, JobKeywordExtractionError) as e:
+                logger.warning(str(e))
+                skipped_job_ids.append(job_id)
+                continue
+            job_keywords[job_id] = ", ".join(processed_job.extracted_keywords)
+            job_titles[job_id] = processed_job.job_title
+
+        results = []
+        if job_keywords:
+            scored_ids = list(job_keywords)
+            if scoring != "embedding" or prefilter:
+                processed_resume = resume.raw_resume_association
+                if not processed_resume:
+                    raise ResumeParsingError(resume_id=resume_id)
+                self._validate_resume_keywords(processed_resume, resume_id)
+                await job_keyword_index.ensure_loaded(self.db)
+                for job_id in scored_ids:
+                    if job_id not in job_keyword_index:
+                        job_keyword_index.add(
+                            job_id, processed_jobs[job_id].extracted_keywords
+                        )
+
+            if scoring != "embedding":
+                keyword_scores = job_keyword_index.score(
+                    processed_resume.extracted_keywords,
+                    job_ids=scored_ids,
+                    scoring=scoring,
+                )
+                scores = np.array(
+                    [keyword_scores.get(job_id, 0.0) for job_id in scored_ids]
+                )
+            else:
+                if prefilter:
+                    scored_ids = [
+                        job_id
+                        for job_id, _ in job_keyword_index.search(
+                            processed_resume.extracted_keywords,
+                            top_k=prefilter,
+                            job_ids=scored_ids,
+                        )
+                    ]
+                scores = np.empty(0)
+                if scored_ids:
+                    resume_embedding = await self.embedding_service.get_resume_embedding(
+                        resume.resume_id, resume.content
+                    )
+                    job_embeddings = await self.embedding_service.get_job_embeddings(
+                        {job_id: job_keywords[job_id] for job_id in scored_ids}
+                    )
+                    scores = self.calculate_cosine_similarities(
+                        np.vstack([job_embeddings[job_id] for job_id in scored_ids]),
+                        resume_embedding,
+                    )
+
+            for rank, index in enumerate(np.argsort(-scores, kind="stable"), start=1):
+                job_id = scored_ids[index]
+                results.append(
+                    {
+                        "rank": rank,
+                        "job_id": job_id,
+                        "job_title": job_titles[job_id],
+                        "score": float(scores[index]),
+                    }
+                )
+
+        return {
+            "resume_id": resume_id,
+            "results": results,
+            "skipped_job_ids": skipped_job_ids,
+        }
+
     async def get_resume_for_previewer(self, updated_resume: str) -> Dict:
         """
         Returns the updated resume in a format suitable for the dashboard.
         """
-        prompt_template = prompt_factory.get("structured_resume")
-        prompt = prompt_template.format(
-            json.dumps(json_schema_factory.get("resume_preview"), indent=2),
+        prompt = prompt_builder.build(
+            "structured_resume",
+            json_schema_factory.get("resume_preview"),
             updated_resume,
         )
-        logger.info(f"Structured Resume Prompt: {prompt}")
-        raw_output = await self.json_agent_manager.run(prompt=prompt)
+        logger.info(f"Structured Resume Prompt ({prompt.tokens} tokens): {prompt.text}")
+        raw_output = await self.json_agent_manager.run(
+            prompt=prompt.text,
+            response_model=ResumePreviewerModel,
+            num_ctx=prompt.num_ctx,
+        )
 
         try:
             resume_preview: ResumePreviewerModel = ResumePreviewerModel.model_validate(
@@ -205,24 +492,16 @@ class ScoreImprovementService:
         resume, processed_resume = await self._get_resume(resume_id)
         job, processed_job = await self._get_job(job_id)
 
-        extracted_job_keywords = ", ".join(
-            json.loads(processed_job.extracted_keywords).get("extracted_keywords", [])
-        )
+        extracted_job_keywords = ", ".join(processed_job.extracted_keywords)
 
-        extracted_resume_keywords = ", ".join(
-            json.loads(processed_resume.extracted_keywords).get(
-                "extracted_keywords", []
-            )
-        )
+        extracted_resume_keywords = ", ".join(processed_resume.extracted_keywords)
 
-        resume_embedding_task = asyncio.create_task(
-            self.embedding_manager.embed(resume.content)
-        )
-        job_kw_embedding_task = asyncio.create_task(
-            self.embedding_manager.embed(extracted_job_keywords)
-        )
-        resume_embedding, extracted_job_keywords_embedding = await asyncio.gather(
-            resume_embedding_task, job_kw_embedding_task
+        resume_embedding, extracted_job_keywords_embedding = (
+            await self._get_embeddings(
+                resume=resume,
+                job_id=job_id,
+                extracted_job_keywords=extracted_job_keywords,
+            )
         )
 
         cosine_similarity_score = self.calculate_cosine_similarity(
@@ -256,59 +535,89 @@ class ScoreImprovementService:
 
         return execution
 
+    @staticmethod
+    def _sse(payload: Dict) -> str:
+        return f"data: {json.dumps(payload)}\n\n"
+
     async def run_and_stream(self, resume_id: str, job_id: str) -> AsyncGenerator:
         """
-        Main method to run the scoring and improving process and return dict.
+        Main method to run the scoring and improving process and stream
+        progress as Server-Sent Events.
+
+        Stage events are sent as soon as each stage finishes. In sequential
+        mode every LLM token is forwarded as a `suggestion` event, followed by
+        an `attempt_scored` event; a rejected attempt is followed by the
+        tokens of the next one.
         """
 
-        yield f"data: {json.dumps({'status': 'starting', 'message': 'Analyzing resume and job description...'})}\n\n"
-        await asyncio.sleep(2)
+        yield self._sse({'status': 'starting', 'message': 'Analyzing resume and job description...'})
 
         resume, processed_resume = await self._get_resume(resume_id)
         job, processed_job = await self._get_job(job_id)
 
-        yield f"data: {json.dumps({'status': 'parsing', 'message': 'Parsing resume content...'})}\n\n"
-        await asyncio.sleep(2)
+        yield self._sse({'status': 'parsing', 'message': 'Parsing resume content...'})
 
-        extracted_job_keywords = ", ".join(
-            json.loads(processed_job.extracted_keywords).get("extracted_keywords", [])
-        )
+        extracted_job_keywords = ", ".join(processed_job.extracted_keywords)
 
-        extracted_resume_keywords = ", ".join(
-            json.loads(processed_resume.extracted_keywords).get(
-                "extracted_keywords", []
-            )
-        )
-
-        resume_embedding = await self.embedding_manager.embed(text=resume.content)
-        extracted_job_keywords_embedding = await self.embedding_manager.embed(
-            text=extracted_job_keywords
-        )
+        extracted_resume_keywords = ", ".join(processed_resume.extracted_keywords)
 
-        yield f"data: {json.dumps({'status': 'scoring', 'message': 'Calculating compatibility score...'})}\n\n"
-        await asyncio.sleep(3)
+        yield self._sse({'status': 'scoring', 'message': 'Calculating compatibility score...'})
 
+        resume_embedding, extracted_job_keywords_embedding = (
+            await self._get_embeddings(
+                resume=resume,
+                job_id=job_id,
+                extracted_job_keywords=extracted_job_keywords,
+            )
+        )
         cosine_similarity_score = self.calculate_cosine_similarity(
             extracted_job_keywords_embedding, resume_embedding
         )
 
-        yield f"data: {json.dumps({'status': 'scored', 'score': cosine_similarity_score})}\n\n"
+        yield self._sse({'status': 'scored', 'score': cosine_similarity_score})
 
-        yield f"data: {json.dumps({'status': 'improving', 'message': 'Generating improvement suggestions...'})}\n\n"
-        await asyncio.sleep(3)
+        yield self._sse({'status': 'improving', 'message': 'Generating improvement suggestions...'})
 
-        updated_resume, updated_score = await self.improve_score_with_llm(
-            resume=resume.content,
-            extracted_resume_keywords=extracted_resume_keywords,
-            job=job.content,
-            extracted_job_keywords=extracted_job_keywords,
-            previous_cosine_similarity_score=cosine_similarity_score,
-            extracted_job_keywords_embedding=extracted_job_keywords_embedding,
-        )
-
-        for i, suggestion in enumerate(updated_resume):
-            yield f"data: {json.dumps({'status': 'suggestion', 'index': i, 'text': suggestion})}\n\n"
-            await asyncio.sleep(0.2)
+        updated_resume, updated_score = resume.content, cosine_similarity_score
+        if self.improvement_mode == "parallel":
+            updated_resume, updated_score = await self.improve_score_with_llm(
+                resume=resume.content,
+                extracted_resume_keywords=extracted_resume_keywords,
+                job=job.content,
+                extracted_job_keywords=extracted_job_keywords,
+                previous_cosine_similarity_score=cosine_similarity_score,
+                extracted_job_keywords_embedding=extracted_job_keywords_embedding,
+            )
+            yield self._sse({'status': 'suggestion', 'attempt': 1, 'index': 0, 'text': updated_resume})
+        else:
+            temperatures = self._candidate_temperatures(self.max_retries)[: self.max_retries]
+            for attempt, temperature in enumerate(temperatures, start=1):
+                prompt = self._improvement_prompt(
+                    resume=resume.content,
+                    extracted_resume_keywords=extracted_resume_keywords,
+                    job=job.content,
+                    extracted_job_keywords=extracted_job_keywords,
+                    cosine_similarity_score=updated_score,
+                )
+                chunks = []
+                async for token in self.md_agent_manager.stream(
+                    prompt.text, temperature=temperature, num_ctx=prompt.num_ctx
+                ):
+                    yield self._sse({'status': 'suggestion', 'attempt': attempt, 'index': len(chunks), 'text': token})
+                    chunks.append(token)
+
+                # The same post-processing MDWrapper applies to non-streamed
+                # responses, so both paths score and return the same text.
+                improved = MDWrapper.format("".join(chunks).strip())
+                emb = await self.embedding_manager.embed(text=improved)
+                score = self.calculate_cosine_similarity(
+                    emb, extracted_job_keywords_embedding
+                )
+                accepted = score > updated_score
+                yield self._sse({'status': 'attempt_scored', 'attempt': attempt, 'score': score, 'accepted': accepted})
+                if accepted:
+                    updated_resume, updated_score = improved, score
+                    break
 
         final_result = {
             "resume_id": resume_id,
@@ -318,4 +627,4 @@ class ScoreImprovementService:
             "updated_resume": markdown.markdown(text=updated_resume),
         }
 
-        yield f"data: {json.dumps({'status': 'completed', 'result': final_result})}\n\n"
+        yield self._sse({'status': 'completed', 'result': final_result})
@@ -0,0 +1,312 @@
+import os
+import json
+import asyncio
+import logging
+import numpy as np
+
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+from sqlalchemy import func, select
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession
+from fastapi.concurrency import run_in_threadpool
+
+from app.core import settings
+from app.agent.cache import embedding_from_bytes
+from app.models import JobEmbedding
+
+logger = logging.getLogger(__name__)
+
+# (number of stored rows, latest `updated_at`) of the embeddings of one model
+StoreState = Tuple[int, Optional[datetime]]
+
+
+def _data_dir() -> str:
+    """
+    The directory of the SQLite database file, or the backend directory
+    (where `.env` lives) for other databases.
+    """
+    url = settings.ASYNC_DATABASE_URL or settings.SYNC_DATABASE_URL
+    if url:
+        try:
+            parsed = make_url(url)
+        except Exception:
+            parsed = None
+        if (
+            parsed is not None
+            and parsed.get_backend_name() == "sqlite"
+            and parsed.database
+            and parsed.database != ":memory:"
+        ):
+            return os.path.dirname(os.path.abspath(parsed.database))
+    return os.path.abspath(
+        os.path.join(os.path.dirname(__file__), os.pardir, os.pardir)
+    )
+
+
+def resolve_index_path(path: Optional[str]) -> Optional[str]:
+    """
+    Anchors a relative JOB_INDEX_PATH to the data directory, so the index is
+    found regardless of the working directory the server was started from.
+    """
+    if not path or os.path.isabs(path):
+        return path
+    return os.path.join(_data_dir(), path)
+
+
+class JobVectorIndex:
+    """
+    In-process index over the stored job-keyword embeddings.
+
+    Vectors are L2-normalized and kept in one contiguous float32 matrix, so a
+    query is a single matrix-vector product followed by `argpartition` for
+    the top-k. The matrix grows geometrically, which keeps incremental
+    inserts amortized O(1).
+
+    The index belongs to one embedding (provider, model). It is loaded
+    lazily: from `path` when the file matches the configured model and the
+    state of the stored embeddings, otherwise rebuilt from the
+    `job_embeddings` table. `save` writes it back; it runs after a rebuild
+    and on shutdown.
+
+    Other processes may write embeddings too, so `ensure_loaded` compares the
+    table's row count and latest `updated_at` with what the index last saw
+    before each search, fetches rows written since, and rebuilds if rows
+    disappeared.
+    """
+
+    def __init__(self, path: Optional[str] = settings.JOB_INDEX_PATH):
+        self.path = resolve_index_path(path)
+        self.provider: Optional[str] = None
+        self.model: Optional[str] = None
+        self._matrix = np.empty((0, 0), dtype=np.float32)
+        self._ids: List[str] = []
+        self._rows: Dict[str, int] = {}
+        self._lock = asyncio.Lock()
+        self._loaded = False
+        self._dirty = False
+        self._state: StoreState = (0, None)
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def is_current(self, provider: Optional[str], model: Optional[str]) -> bool:
+        """
+        Whether the index is loaded for `provider`/`model`; vectors of that
+        model computed in this process can then be `add`ed to it.
+        """
+        return self._loaded and (self.provider, self.model) == (provider, model)
+
+    @staticmethod
+    def _model_filter(provider: Optional[str], model: Optional[str]):
+        return JobEmbedding.provider == provider, JobEmbedding.model == model
+
+    async def _store_state(
+        self, db: AsyncSession, provider: Optional[str], model: Optional[str]
+    ) -> StoreState:
+        count, updated_at = (
+            await db.execute(
+                select(func.count(), func.max(JobEmbedding.updated_at)).where(
+                    *self._model_filter(provider, model)
+                )
+            )
+        ).one()
+        return count, updated_at
+
+    @staticmethod
+    def _normalize(matrix: np.ndarray) -> np.ndarray:
+        matrix = np.atleast_2d(np.asarray(matrix, dtype=np.float32))
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return matrix / norms
+
+    async def ensure_loaded(
+        self, db: AsyncSession, provider: Optional[str], model: Optional[str]
+    ) -> None:
+        """
+        Makes the index serve `provider`/`model` and match the stored
+        embeddings: loads it from disk or rebuilds it from the database, or
+        picks up rows added or recomputed since it was last checked.
+        """
+        state = await self._store_state(db, provider, model)
+        if self.is_current(provider, model) and state == self._state:
+            return
+        async with self._lock:
+            state = await self._store_state(db, provider, model)
+            if self.is_current(provider, model):
+                if state == self._state:
+                    return
+                await self._refresh(db, provider, model)
+                if len(self) == state[0]:
+                    self._state = state
+                    return
+            self._state = state
+            if not await run_in_threadpool(self._load, provider, model, state):
+                await self._rebuild(db, provider, model)
+                await self.save()
+            self._loaded = True
+
+    async def _refresh(
+        self, db: AsyncSession, provider: Optional[str], model: Optional[str]
+    ) -> None:
+        """
+        Adds the rows written since the latest `updated_at` the index saw.
+        """
+        since = self._state[1]
+        result = await db.execute(
+            select(JobEmbedding.job_id, JobEmbedding.vector).where(
+                *self._model_filter(provider, model),
+                JobEmbedding.updated_at.is_not(None)
+                if since is None
+                else JobEmbedding.updated_at > since,
+            )
+        )
+        self.add({job_id: embedding_from_bytes(vector) for job_id, vector in result})
+
+    async def _rebuild(
+        self, db: AsyncSession, provider: Optional[str], model: Optional[str]
+    ) -> None:
+        logger.info(f"Rebuilding job vector index for {provider}/{model}")
+        result = await db.execute(
+            select(JobEmbedding.job_id, JobEmbedding.vector).where(
+                *self._model_filter(provider, model)
+            )
+        )
+        self._reset(provider, model)
+        self.add({job_id: embedding_from_bytes(vector) for job_id, vector in result})
+
+    def _reset(self, provider: Optional[str], model: Optional[str]) -> None:
+        self.provider, self.model = provider, model
+        self._matrix = np.empty((0, 0), dtype=np.float32)
+        self._ids, self._rows = [], {}
+        self._dirty = True
+
+    def _reserve(self, rows: int, dimension: int) -> None:
+        if self._matrix.shape[1] != dimension:
+            if self._ids:
+                raise ValueError(
+                    f"embedding dimension {dimension} does not match index dimension {self._matrix.shape[1]}"
+                )
+            self._matrix = np.empty((0, dimension), dtype=np.float32)
+        capacity = self._matrix.shape[0]
+        if rows <= capacity:
+            return
+        grown = np.empty((max(rows, 2 * capacity, 1024), dimension), dtype=np.float32)
+        grown[: len(self._ids)] = self._matrix[: len(self._ids)]
+        self._matrix = grown
+
+    def add(self, embeddings: Dict[str, np.ndarray]) -> None:
+        """
+        Inserts or replaces the vectors of the given jobs.
+        """
+        if not embeddings:
+            return
+        job_ids = list(embeddings)
+        vectors = self._normalize(np.vstack([embeddings[job_id] for job_id in job_ids]))
+        new_ids = [job_id for job_id in job_ids if job_id not in self._rows]
+        self._reserve(len(self._ids) + len(new_ids), vectors.shape[1])
+        for job_id in new_ids:
+            self._rows[job_id] = len(self._ids)
+            self._ids.append(job_id)
+        self._matrix[[self._rows[job_id] for job_id in job_ids]] = vectors
+        self._dirty = True
+
+    def search(
+        self,
+        query: np.ndarray,
+        top_k: int = 10,
+        job_ids: Optional[List[str]] = None,
+    ) -> List[Tuple[str, float]]:
+        """
+        Returns up to `top_k` (job_id, cosine similarity) pairs, best first.
+        With `job_ids`, only those jobs (e.g. a keyword shortlist) are scored.
+        """
+        if job_ids is None:
+            rows = None
+            count = len(self._ids)
+        else:
+            rows = np.fromiter(
+                (self._rows[job_id] for job_id in job_ids if job_id in self._rows),
+                dtype=np.intp,
+            )
+            count = len(rows)
+        if count == 0 or top_k <= 0:
+            return []
+        matrix = self._matrix[: len(self._ids)] if rows is None else self._matrix[rows]
+        scores = matrix @ self._normalize(query)[0]
+        k = min(top_k, count)
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top], kind="stable")]
+        if rows is not None:
+            return [(self._ids[rows[i]], float(scores[i])) for i in top]
+        return [(self._ids[i], float(scores[i])) for i in top]
+
+    def _files(self) -> Tuple[str, str]:
+        return f"{self.path}.npy", f"{self.path}.json"
+
+    @staticmethod
+    def _stamp(updated_at: Optional[datetime]) -> Optional[str]:
+        return updated_at.isoformat() if updated_at is not None else None
+
+    def _load(
+        self, provider: Optional[str], model: Optional[str], expected: StoreState
+    ) -> bool:
+        if not self.path:
+            return False
+        matrix_file, meta_file = self._files()
+        try:
+            with open(meta_file, encoding="utf-8") as f:
+                meta = json.load(f)
+            if (meta.get("provider"), meta.get("model")) != (provider, model):
+                return False
+            ids = meta.get("ids", [])
+            if len(ids) != expected[0]:
+                return False
+            if meta.get("updated_at") != self._stamp(expected[1]):
+                return False
+            matrix = np.load(matrix_file)
+        except (OSError, ValueError) as e:
+            logger.info(f"Job vector index not loaded from {self.path}: {e}")
+            return False
+        if matrix.shape[0] != len(ids):
+            return False
+        self._reset(provider, model)
+        self._matrix = np.ascontiguousarray(matrix, dtype=np.float32)
+        self._ids = list(ids)
+        self._rows = {job_id: row for row, job_id in enumerate(self._ids)}
+        self._dirty = False
+        return True
+
+    async def save(self) -> None:
+        """
+        Writes the index to `path` if it changed since the last save.
+        """
+        if not self.path or not self._dirty:
+            return
+        matrix = self._matrix[: len(self._ids)].copy()
+        meta = {
+            "provider": self.provider,
+            "model": self.model,
+            "updated_at": self._stamp(self._state[1]),
+            "ids": list(self._ids),
+        }
+        self._dirty = False
+        try:
+            await run_in_threadpool(self._write, matrix, meta)
+        except OSError as e:
+            self._dirty = True
+            logger.warning(f"Could not save job vector index to {self.path}: {e}")
+
+    def _write(self, matrix: np.ndarray, meta: Dict) -> None:
+        matrix_file, meta_file = self._files()
+        directory = os.path.dirname(os.path.abspath(matrix_file))
+        os.makedirs(directory, exist_ok=True)
+        with open(f"{matrix_file}.tmp", "wb") as f:
+            np.save(f, matrix)
+        with open(f"{meta_file}.tmp", "w", encoding="utf-8") as f:
+            json.dump(meta, f)
+        os.replace(f"{matrix_file}.tmp", matrix_file)
+        os.replace(f"{meta_file}.tmp", meta_file)
+
+
+job_vector_index = JobVectorIndex()